@@ -11,7 +11,7 @@ wavelengths = np.concatenate((
 frequencies = mspt.nm_to_eV(wavelengths)
 
 print(f"\nCalculating gold permittivities from {wavelengths.min()} nm to {wavelengths.max()} nm")
-permittivities = np.array([mspt.permittivity_ridx(freq, material='Au') for freq in frequencies])
+permittivities = mspt.permittivity_ridx(frequencies, material='Au')
 print(" Done")
 
 frohlich_wavelength = wavelengths[np.argmin(np.abs(permittivities + 2))]
@@ -1,4 +1,17 @@
 import numpy as np
+from .tools.parallel_tools import run_row_blocks
+
+try:
+    from .tools import numba_kernels
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba_kernels = None
+    NUMBA_AVAILABLE = False
+
+BACKENDS = ('numpy', 'numba')
+
+# Number of particle pairs handled at once by the NumPy Green's tensor product, which bounds its temporaries.
+MATVEC_BLOCK_PAIRS = 2**20
 
 def G_0_function(r: float, wave_number: float) -> complex:
     """
@@ -110,7 +123,124 @@ def v_cross_derivative(r_vec: np.ndarray, coordinate: int) -> np.ndarray:
 
     return der_R_cross
 
-def construct_green_tensor(positions : np.ndarray, wave_number: float) -> np.ndarray:
+def resolve_backend(backend: str = 'auto') -> str:
+    """
+    Resolve the backend used to build Green's tensors.
+
+    Parameters
+    ----------
+    backend :
+        Either 'auto', 'numpy' or 'numba'. 'auto' selects 'numba' when Numba is importable and 'numpy' otherwise.
+
+    Returns
+    -------
+    str
+        The resolved backend name.
+    """
+
+    if backend == 'auto':
+        return 'numba' if NUMBA_AVAILABLE else 'numpy'
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend: {}. Expected 'auto' or one of {}".format(backend, BACKENDS))
+    if backend == 'numba' and not NUMBA_AVAILABLE:
+        raise ValueError("The 'numba' backend was requested but Numba is not installed.")
+    return backend
+
+def _pair_green_blocks(R_vec: np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Vectorized pair Green's tensors for an array of separation vectors of shape (..., dimension).
+    """
+
+    dimensions = R_vec.shape[-1]
+    r = np.linalg.norm(R_vec, axis=-1)
+
+    g_0 = G_0_function(r, wave_number)
+    g_1 = G_1_function(r, wave_number)
+    R_cross = R_vec[..., :, None] * R_vec[..., None, :]
+
+    return g_0[..., None, None] * np.eye(dimensions) + g_1[..., None, None] * R_cross
+
+def _pair_green_derivative_blocks(R_vec: np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Vectorized pair Green's tensor derivatives for an array of separation vectors of shape (..., dimension).
+
+    The result has shape (..., dimension, dimension, dimension) with the derivative coordinate first.
+    """
+
+    dimensions = R_vec.shape[-1]
+    identity = np.eye(dimensions)
+    r = np.linalg.norm(R_vec, axis=-1)
+
+    g_1 = G_1_function(r, wave_number)
+    radial = R_vec / r[..., None]
+    der_g_0 = G_0_derivative_function(r, wave_number)[..., None] * radial
+    der_g_1 = G_1_derivative_function(r, wave_number)[..., None] * radial
+    R_cross = R_vec[..., :, None] * R_vec[..., None, :]
+    der_R_cross = identity[:, :, None] * R_vec[..., None, None, :] + identity[:, None, :] * R_vec[..., None, :, None]
+
+    return der_g_0[..., :, None, None] * identity \
+        + der_g_1[..., :, None, None] * R_cross[..., None, :, :] \
+        + g_1[..., None, None, None] * der_R_cross
+
+def _upper_pairs(num_particles: int, row_start: int, row_stop: int) -> tuple:
+    """
+    Indices (i, j), j > i, of the pairs owned by the rows in [row_start, row_stop).
+    """
+
+    rows = np.arange(row_start, row_stop)
+    counts = num_particles - 1 - rows
+    i_index = np.repeat(rows, counts)
+    row_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    j_index = np.arange(i_index.shape[0]) - row_offsets + i_index + 1
+    return i_index, j_index
+
+def _green_tensor_rows_numpy(positions: np.ndarray, wave_number: float, row_start: int, row_stop: int, out: np.ndarray) -> None:
+    i_index, j_index = _upper_pairs(positions.shape[0], row_start, row_stop)
+    blocks = _pair_green_blocks(positions[i_index] - positions[j_index], wave_number)
+    out[i_index, j_index] = blocks
+    out[j_index, i_index] = blocks
+
+def _green_tensor_gradient_rows_numpy(positions: np.ndarray, wave_number: float, row_start: int, row_stop: int, out: np.ndarray) -> None:
+    i_index, j_index = _upper_pairs(positions.shape[0], row_start, row_stop)
+    blocks = _pair_green_derivative_blocks(positions[i_index] - positions[j_index], wave_number)
+    out[i_index, j_index] = blocks
+    out[j_index, i_index] = -blocks
+
+def _green_tensor_selected_rows_numpy(positions: np.ndarray, rows: np.ndarray) -> tuple:
+    """
+    Separation vectors positions[rows[r]] - positions[j] and the mask of the self pairs, whose vectors are set to 1.
+    """
+
+    R_vec = positions[rows, None, :] - positions[None, :, :]
+    self_pairs = rows[:, None] == np.arange(positions.shape[0])[None, :]
+    R_vec[self_pairs] = 1.0
+    return R_vec, self_pairs
+
+def _green_tensor_gradient_selected_rows_numpy(positions: np.ndarray, rows: np.ndarray, wave_number: float, row_start: int, row_stop: int, out: np.ndarray) -> None:
+    R_vec, self_pairs = _green_tensor_selected_rows_numpy(positions, rows[row_start:row_stop])
+    blocks = _pair_green_derivative_blocks(R_vec, wave_number)
+    blocks[self_pairs] = 0
+    out[row_start:row_stop] = blocks
+
+def _green_tensor_matvec_rows_numpy(positions: np.ndarray, dipole_moments: np.ndarray, wave_number: float, row_start: int, row_stop: int, out: np.ndarray) -> None:
+    block_rows = max(1, MATVEC_BLOCK_PAIRS // positions.shape[0])
+    for block_start in range(row_start, row_stop, block_rows):
+        _green_tensor_matvec_block_numpy(positions, dipole_moments, wave_number, block_start, min(block_start + block_rows, row_stop), out)
+
+def _green_tensor_matvec_block_numpy(positions: np.ndarray, dipole_moments: np.ndarray, wave_number: float, row_start: int, row_stop: int, out: np.ndarray) -> None:
+    rows = np.arange(row_start, row_stop)
+    R_vec = positions[rows, None, :] - positions[None, :, :]
+    r = np.linalg.norm(R_vec, axis=-1)
+    self_pairs = rows[:, None] == np.arange(positions.shape[0])[None, :]
+    r[self_pairs] = 1.0
+
+    g_0 = np.where(self_pairs, 0, G_0_function(r, wave_number))
+    g_1 = np.where(self_pairs, 0, G_1_function(r, wave_number))
+    projection = np.einsum('ijn,jn->ij', R_vec, dipole_moments)
+
+    out[row_start:row_stop] = g_0 @ dipole_moments + np.einsum('ij,ijm->im', g_1 * projection, R_vec)
+
+def construct_green_tensor(positions : np.ndarray, wave_number: float, backend: str = 'auto', num_workers: int | None = 1) -> np.ndarray:
     """
     Constructs the Green's tensor for a given set of positions and wave number.
 
@@ -120,6 +250,10 @@ def construct_green_tensor(positions : np.ndarray, wave_number: float) -> np.nda
         Array of shape (num_particles, dimension) containing the positions of the particles.
     wave_number : float
         The wave number.
+    backend : str, optional
+        Either 'auto', 'numpy' or 'numba'. The default 'auto' uses the compiled kernels when Numba is installed.
+    num_workers : int, optional
+        Number of threads working concurrently on row blocks. None uses all the available cores. Default is 1.
 
     Returns
     -------
@@ -127,15 +261,54 @@ def construct_green_tensor(positions : np.ndarray, wave_number: float) -> np.nda
         Green's tensor of shape (num_particles, num_particles, dimension, dimension).
     """
     
+    positions = np.asarray(positions, dtype=np.float64)
     num_particles, dimensions = positions.shape
     green_tensor = np.zeros((num_particles, num_particles, dimensions, dimensions), dtype=np.complex128)
 
-    for i in range(num_particles):
-        for j in range(i + 1, num_particles):
-            green_tensor[i, j, :, :] = pair_green_tensor(positions[i], positions[j], wave_number)
-            green_tensor[j, i, :, :] = green_tensor[i, j, :, :]
+    kernel = numba_kernels.green_tensor_kernel if resolve_backend(backend) == 'numba' else _green_tensor_rows_numpy
+    run_row_blocks(lambda row_start, row_stop: kernel(positions, wave_number, row_start, row_stop, green_tensor),
+                   num_particles, num_workers, triangular=True)
     return green_tensor
 
+def green_tensor_matvec(positions: np.ndarray, dipole_moments: np.ndarray, wave_number: float, backend: str = 'auto', num_workers: int | None = 1) -> np.ndarray:
+    """
+    Computes the product of the Green's tensor with a set of dipole moments without storing the Green's tensor.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Array of shape (num_particles, dimension) containing the positions of the particles.
+    dipole_moments : np.ndarray
+        Array of shape (num_particles, dimension) containing the dipole moments of the particles.
+    wave_number : float
+        The wave number.
+    backend : str, optional
+        Either 'auto', 'numpy' or 'numba'. The default 'auto' uses the compiled kernels when Numba is installed.
+    num_workers : int, optional
+        Number of threads working concurrently on row blocks. None uses all the available cores. Default is 1.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (num_particles, dimension) with the sum over j of G_ij p_j.
+
+    Notes
+    -----
+    The Numba kernel needs no temporaries beyond the result. The NumPy backend builds (rows, N, 3) temporaries
+    over blocks of at most MATVEC_BLOCK_PAIRS particle pairs per thread, a few hundred bytes per pair, so its
+    memory is bounded by a few hundred megabytes per thread instead of growing with N².
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    dipole_moments = np.asarray(dipole_moments, dtype=np.complex128)
+    num_particles = positions.shape[0]
+    result = np.zeros(dipole_moments.shape, dtype=np.complex128)
+
+    kernel = numba_kernels.green_tensor_matvec_kernel if resolve_backend(backend) == 'numba' else _green_tensor_matvec_rows_numpy
+    run_row_blocks(lambda row_start, row_stop: kernel(positions, dipole_moments, wave_number, row_start, row_stop, result),
+                   num_particles, num_workers)
+    return result
+
 def pair_green_tensor(pos_i: np.ndarray, pos_j: np.ndarray, wave_number: float) -> np.ndarray:
     """
     Constructs the pair Green's tensor for two particles at positions pos_i and pos_j.
@@ -200,7 +373,7 @@ def pair_green_tensor_derivative(pos_i: np.ndarray, pos_j: np.ndarray, coordinat
     
     return derivative_tensor 
 
-def construct_green_tensor_gradient(positions : np.ndarray, wave_number: float) -> np.ndarray:
+def construct_green_tensor_gradient(positions : np.ndarray, wave_number: float, backend: str = 'auto', num_workers: int | None = 1, rows: np.ndarray | None = None) -> np.ndarray:
     """
     Constructs the derivative of the Green's tensor for a given set of positions and wave number.
 
@@ -210,6 +383,13 @@ def construct_green_tensor_gradient(positions : np.ndarray, wave_number: float)
         Array of shape (num_particles, dimension) containing the positions of the particles.
     wave_number : float
         The wave number.
+    backend : str, optional
+        Either 'auto', 'numpy' or 'numba'. The default 'auto' uses the compiled kernels when Numba is installed.
+    num_workers : int, optional
+        Number of threads working concurrently on row blocks. None uses all the available cores. Default is 1.
+    rows : np.ndarray, optional
+        Indices of the particles whose rows are computed, possibly negative. If given, only these M rows are built and
+        the result has shape (M, num_particles, dimension, dimension, dimension).
 
     Returns
     -------
@@ -217,13 +397,147 @@ def construct_green_tensor_gradient(positions : np.ndarray, wave_number: float)
         Derivative of Green's tensor of shape (num_particles, num_particles, dimension, dimension, dimension).
     """
     
+    positions = np.asarray(positions, dtype=np.float64)
     num_particles, dimensions = positions.shape
+
+    if rows is not None:
+        # Negative indices are wrapped and out-of-range ones raise an IndexError before reaching the kernels.
+        rows = np.arange(num_particles)[np.asarray(rows, dtype=np.int64).reshape(-1)]
+        green_tensor_derivative = np.zeros((rows.shape[0], num_particles, dimensions, dimensions, dimensions), dtype=np.complex128)
+        kernel = numba_kernels.green_tensor_gradient_rows_kernel if resolve_backend(backend) == 'numba' else _green_tensor_gradient_selected_rows_numpy
+        run_row_blocks(lambda row_start, row_stop: kernel(positions, rows, wave_number, row_start, row_stop, green_tensor_derivative),
+                       rows.shape[0], num_workers)
+        return green_tensor_derivative
+
     green_tensor_derivative = np.zeros((num_particles, num_particles, dimensions, dimensions, dimensions), dtype=np.complex128)
 
-    for i in range(num_particles):
-        for j in range(i + 1, num_particles):
-            for coord in range(dimensions):
-                green_tensor_derivative[i, j, coord, :, :] = pair_green_tensor_derivative(positions[i], positions[j], coord, wave_number)
-                green_tensor_derivative[j, i, coord, :, :] = -green_tensor_derivative[i, j, coord, :, :]
+    kernel = numba_kernels.green_tensor_gradient_kernel if resolve_backend(backend) == 'numba' else _green_tensor_gradient_rows_numpy
+    run_row_blocks(lambda row_start, row_stop: kernel(positions, wave_number, row_start, row_stop, green_tensor_derivative),
+                   num_particles, num_workers, triangular=True)
+    return green_tensor_derivative
+
+def update_green_tensor(green_tensor: np.ndarray, positions: np.ndarray, moved: np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Recompute in place the rows and columns of a Green's tensor that involve the particles that moved.
+
+    Parameters
+    ----------
+    green_tensor : np.ndarray
+        Green's tensor of shape (num_particles, num_particles, dimension, dimension) of the previous positions.
+    positions : np.ndarray
+        Array of shape (num_particles, dimension) containing the new positions of the particles.
+    moved : np.ndarray
+        Indices of the M particles whose positions changed.
+    wave_number : float
+        The wave number.
+
+    Returns
+    -------
+    np.ndarray
+        The updated Green's tensor, which is the input array.
+
+    Notes
+    -----
+    The cost scales with M·N instead of N², so this is cheaper than construct_green_tensor while fewer
+    than half of the particles moved.
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    moved = np.asarray(moved, dtype=np.int64).reshape(-1)
+    if moved.shape[0] == 0:
+        return green_tensor
+
+    R_vec, self_pairs = _green_tensor_selected_rows_numpy(positions, moved)
+    blocks = _pair_green_blocks(R_vec, wave_number)
+    blocks[self_pairs] = 0
+    green_tensor[moved] = blocks
+    green_tensor[:, moved] = blocks.swapaxes(0, 1)
+    return green_tensor
+
+def update_green_tensor_gradient(green_tensor_derivative: np.ndarray, positions: np.ndarray, moved: np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Recompute in place the rows and columns of a Green's tensor derivative that involve the particles that moved.
+
+    Parameters
+    ----------
+    green_tensor_derivative : np.ndarray
+        Derivative of the Green's tensor of shape (num_particles, num_particles, dimension, dimension, dimension)
+        of the previous positions.
+    positions : np.ndarray
+        Array of shape (num_particles, dimension) containing the new positions of the particles.
+    moved : np.ndarray
+        Indices of the M particles whose positions changed.
+    wave_number : float
+        The wave number.
+
+    Returns
+    -------
+    np.ndarray
+        The updated derivative, which is the input array.
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    moved = np.asarray(moved, dtype=np.int64).reshape(-1)
+    if moved.shape[0] == 0:
+        return green_tensor_derivative
+
+    R_vec, self_pairs = _green_tensor_selected_rows_numpy(positions, moved)
+    blocks = _pair_green_derivative_blocks(R_vec, wave_number)
+    blocks[self_pairs] = 0
+    green_tensor_derivative[moved] = blocks
+    green_tensor_derivative[:, moved] = -blocks.swapaxes(0, 1)
+    return green_tensor_derivative
+
+def construct_green_tensor_batched(positions : np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Constructs the Green's tensors of a batch of configurations of the same number of particles.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Array of shape (batch, num_particles, dimension) containing the positions of the particles.
+    wave_number : float
+        The wave number.
+
+    Returns
+    -------
+    np.ndarray
+        Green's tensors of shape (batch, num_particles, num_particles, dimension, dimension).
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    batch, num_particles, dimensions = positions.shape
+    green_tensor = np.zeros((batch, num_particles, num_particles, dimensions, dimensions), dtype=np.complex128)
+
+    i_index, j_index = _upper_pairs(num_particles, 0, num_particles)
+    blocks = _pair_green_blocks(positions[:, i_index] - positions[:, j_index], wave_number)
+    green_tensor[:, i_index, j_index] = blocks
+    green_tensor[:, j_index, i_index] = blocks
+    return green_tensor
+
+def construct_green_tensor_gradient_batched(positions : np.ndarray, wave_number: float) -> np.ndarray:
+    """
+    Constructs the derivatives of the Green's tensors of a batch of configurations of the same number of particles.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Array of shape (batch, num_particles, dimension) containing the positions of the particles.
+    wave_number : float
+        The wave number.
+
+    Returns
+    -------
+    np.ndarray
+        Derivatives of the Green's tensors of shape (batch, num_particles, num_particles, dimension, dimension, dimension).
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    batch, num_particles, dimensions = positions.shape
+    green_tensor_derivative = np.zeros((batch, num_particles, num_particles, dimensions, dimensions, dimensions), dtype=np.complex128)
+
+    i_index, j_index = _upper_pairs(num_particles, 0, num_particles)
+    blocks = _pair_green_derivative_blocks(positions[:, i_index] - positions[:, j_index], wave_number)
+    green_tensor_derivative[:, i_index, j_index] = blocks
+    green_tensor_derivative[:, j_index, i_index] = -blocks
     return green_tensor_derivative
-    
\ No newline at end of file
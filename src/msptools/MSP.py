@@ -3,7 +3,8 @@ try:
 except:
     import numpy as np
 
-from msptools.dipole_moments import calculate_dipole_moments_linear, polarizability_to_matrix
+from msptools.dipole_moments import calculate_dipole_moments_linear, polarizability_array, apply_polarizability
+from msptools.GreenTensor_Electric import green_tensor_matvec
 
 def solve_MSP_from_arrays(polarizability,
                           external_field : np.ndarray,
@@ -27,6 +28,8 @@ def solve_MSP_from_arrays(polarizability,
         Green's tensor for the system.
     method :
         Method to solve the MSP, either 'Iterative' or 'Inverse'. The default is 'Iterative'.
+    **kwargs :
+        Options of the iterative method: num_iterations, tolerance and initial_field.
 
     Returns
     -------
@@ -43,11 +46,8 @@ def solve_MSP_from_arrays(polarizability,
         raise ValueError("The third dimension of green_tensor must match the system dimensionality. Expected {}, got {}".format(external_field.shape[1], green_tensor.shape[2]))
 
     if method == 'Iterative':
-        if 'tolerance' in kwargs:
-            tolerance = kwargs['tolerance']
-            return array_MSP_iterative(polarizability, external_field, wave_number, green_tensor, tolerance=tolerance)
-        else:
-            return array_MSP_iterative(polarizability, external_field, wave_number, green_tensor)
+        iterative_options = {name: kwargs[name] for name in ('num_iterations', 'tolerance', 'initial_field') if name in kwargs}
+        return array_MSP_iterative(polarizability, external_field, wave_number, green_tensor, **iterative_options)
     elif method == 'Inverse':
         return array_MSP_inverse(polarizability, external_field, wave_number, green_tensor)
     else:
@@ -58,7 +58,8 @@ def array_MSP_iterative(polarizability : np.ndarray,
                           wave_number : float,
                           green_tensor : np.ndarray,
                           num_iterations : int = 500,
-                          tolerance : float = 1e-6) -> np.ndarray:
+                          tolerance : float = 1e-6,
+                          initial_field : np.ndarray | None = None) -> np.ndarray:
     
     """
     Solve the MSP using an iterative method.
@@ -77,6 +78,8 @@ def array_MSP_iterative(polarizability : np.ndarray,
         Maximum number of iterations for the iterative method. Default is 500.
     tolerance : optional
         Convergence tolerance for the iterative method. Default is 1e-6.
+    initial_field : optional
+        Initial guess of the total field, e.g. the solution of a nearby configuration. Default is the external field.
 
     Returns
     -------
@@ -84,15 +87,77 @@ def array_MSP_iterative(polarizability : np.ndarray,
         The solution to the MSP.
     """
 
-    old_field = external_field.copy()
+    scatter = lambda dipole_moments: np.einsum('ijmn,jn->im', green_tensor, dipole_moments)
+
+    return _MSP_fixed_point(polarizability, external_field, wave_number, scatter, num_iterations, tolerance, initial_field)
+
+def array_MSP_matrix_free(polarizability : np.ndarray,
+                          external_field : np.ndarray,
+                          wave_number : float,
+                          positions : np.ndarray,
+                          num_iterations : int = 500,
+                          tolerance : float = 1e-6,
+                          backend : str = 'auto',
+                          num_workers : int | None = 1,
+                          initial_field : np.ndarray | None = None) -> np.ndarray:
+    """
+    Solve the MSP iteratively without storing the Green's tensor.
+
+    Parameters
+    ----------
+    polarizability :
+        Polarizability of the particles.
+    external_field :
+        External field on particles positions.
+    wave_number :
+        Wave number of the incident wave.
+    positions :
+        Positions of the particles, in units consistent with the wave number.
+    num_iterations : optional
+        Maximum number of iterations for the iterative method. Default is 500.
+    tolerance : optional
+        Convergence tolerance for the iterative method. Default is 1e-6.
+    backend : optional
+        Backend of the Green's tensor product, either 'auto', 'numpy' or 'numba'. Default is 'auto'.
+    num_workers : optional
+        Number of threads computing the Green's tensor product over row blocks. Default is 1.
+    initial_field : optional
+        Initial guess of the total field. Default is the external field.
+
+    Returns
+    -------
+    np.ndarray
+        The solution to the MSP.
+
+    Notes
+    -----
+    The Green's tensor blocks are recomputed at every iteration instead of storing the N² Green's tensor. The
+    Numba backend then needs O(N) memory. The NumPy backend also holds the temporaries of blocks of pairs, see
+    green_tensor_matvec.
+    """
+
+    scatter = lambda dipole_moments: green_tensor_matvec(positions, dipole_moments, wave_number, backend=backend, num_workers=num_workers)
+
+    return _MSP_fixed_point(polarizability, external_field, wave_number, scatter, num_iterations, tolerance, initial_field)
+
+def _MSP_fixed_point(polarizability, external_field, wave_number, scatter, num_iterations, tolerance, initial_field=None):
+    """
+    Fixed-point iteration E = E_0 + k^2 G alpha E, with the Green's tensor product given by scatter.
+    """
+
+    # Converted once, so each iteration only broadcasts or contracts the polarizabilities.
+    if not isinstance(polarizability, (complex, float, int)):
+        polarizability = polarizability_array(polarizability, external_field.shape[0], external_field.shape[1])
+    old_field = external_field.copy() if initial_field is None else np.array(initial_field, dtype=np.complex128)
+    external_norm = np.linalg.norm(external_field)
 
     for iteration in range(num_iterations):
         
         dipole_moments = calculate_dipole_moments_linear(polarizability, old_field)
-        scattered_field = wave_number**2 * np.einsum('ijmn,jn->im', green_tensor, dipole_moments)
+        scattered_field = wave_number**2 * scatter(dipole_moments)
         new_field = external_field + scattered_field
 
-        if np.any(np.abs(new_field)/np.abs(external_field) > 1e6 ):
+        if np.linalg.norm(new_field) > 1e6 * external_norm:
             raise ValueError("The new field is significantly larger than the external field, indicating potential divergence in the iterative method.")
 
         if np.allclose(new_field, old_field, rtol=tolerance):
@@ -128,18 +193,56 @@ def array_MSP_inverse(polarizability : np.ndarray,
             The solution to the MSP.
         """
         
-        num_particles = external_field.shape[0]
-        dimensions = external_field.shape[1]
-
-        green_tensor_matrix = green_tensor.transpose(0,2,1,3).reshape(num_particles * dimensions, num_particles * dimensions)
-        external_field_array = external_field.reshape(num_particles * dimensions, 1)
-        polarizability_matrix = polarizability_to_matrix(polarizability, num_particles, dimensions)
+        num_particles, dimensions = external_field.shape
 
-        MSP_matrix = np.eye(num_particles * dimensions) - wave_number**2 * green_tensor_matrix @ polarizability_matrix
-        MSP_matrix_inv = np.linalg.inv(MSP_matrix)
-        total_field = MSP_matrix_inv @ external_field_array
+        MSP_matrix = _MSP_matrix(polarizability, wave_number, green_tensor)
+        total_field = np.linalg.solve(MSP_matrix, external_field.reshape(num_particles * dimensions))
         return total_field.reshape(num_particles, dimensions)
 
+def array_MSP_inverse_batched(polarizability : np.ndarray,
+                              external_field : np.ndarray,
+                              wave_number : float,
+                              green_tensor : np.ndarray) -> np.ndarray:
+    """
+    Solve the MSP for a batch of configurations with a direct solver vectorized over the leading axis.
+
+    Parameters
+    ----------
+    polarizability :
+        Polarizability of the particles, a scalar, an array of shape (N,) or an array of shape (N, d, d),
+        shared by the whole batch.
+    external_field :
+        External field on particles positions, of shape (B, N, d).
+    wave_number :
+        Wave number of the incident wave.
+    green_tensor :
+        Green's tensors of the batch, of shape (B, N, N, d, d).
+
+    Returns
+    -------
+    np.ndarray
+        The solutions to the MSP, of shape (B, N, d).
+    """
+
+    batch, num_particles, dimensions = external_field.shape
+
+    MSP_matrix = _MSP_matrix(polarizability, wave_number, green_tensor)
+    total_field = np.linalg.solve(MSP_matrix, external_field.reshape(batch, num_particles * dimensions, 1))
+    return total_field.reshape(batch, num_particles, dimensions)
+
+def _MSP_matrix(polarizability, wave_number, green_tensor):
+    """
+    The matrix I - k^2 G alpha of shape (..., N d, N d) for Green's tensors of shape (..., N, N, d, d).
+    """
+
+    num_particles, dimensions = green_tensor.shape[-3], green_tensor.shape[-1]
+    size = num_particles * dimensions
+    polarizability = polarizability_array(polarizability, num_particles, dimensions)
+
+    scattering_blocks = apply_polarizability(green_tensor, polarizability)
+    scattering_matrix = np.swapaxes(scattering_blocks, -3, -2).reshape(green_tensor.shape[:-4] + (size, size))
+    return np.eye(size) - wave_number**2 * scattering_matrix
+
 def MSP_gradient_from_arrays(dipole_moments: np.ndarray,
                              external_gradient : np.ndarray,
                              wave_number : float,
@@ -168,9 +271,10 @@ def MSP_gradient_from_arrays(dipole_moments: np.ndarray,
     Notes
     -----
     The gradient is returned as an array of shape (N, d, d) where N is the number of particles and d is the dimensionality.
+    Leading batch axes of the dipole moments, external gradient and Green's tensor derivative are broadcast.
     """
 
-    scattered_gradient = wave_number**2 * np.einsum('ijcmn,jn->icm', green_tensor_derivative, dipole_moments)
+    scattered_gradient = wave_number**2 * np.einsum('...ijcmn,...jn->...icm', green_tensor_derivative, dipole_moments)
     
     MSP_gradient = external_gradient + scattered_gradient
 
@@ -15,6 +15,7 @@ def calculate_forces_eppgrad(medium_permittivity: float, dipole_moments: np.ndar
     field_gradient :
         An array representing the electric field gradient at the location of the dipoles. 
         Shape should be (N, d, d), where N is the number of dipoles and d is the dimensionality.
+        Leading batch axes, e.g. (B, N, d) and (B, N, d, d), are also supported.
 
     Returns
     -------
@@ -28,7 +29,7 @@ def calculate_forces_eppgrad(medium_permittivity: float, dipole_moments: np.ndar
     where ε is the medium permittivity, p is the dipole moment, and ∇E* is the complex conjugate of the electric field gradient.
     """
 
-    forces = (medium_permittivity / 2) * np.real(np.einsum('im,inm->in', dipole_moments, np.conj(field_gradient)))
+    forces = (medium_permittivity / 2) * np.real(np.einsum('...im,...inm->...in', dipole_moments, np.conj(field_gradient)))
 
     return forces
 
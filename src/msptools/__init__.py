@@ -3,13 +3,24 @@ import types
 from .OFO_calculations import *
 from .dipole_moments import *
 from .polarizability_mod import *
+from .polarizability_table_mod import *
 from .particle_types import *
 from .particles_mod import *
+from .spatial_mod import *
+from .io_mod import *
 from .permittivity import *
+from .dispersion_mod import *
 from .field_mod import *
 from .tools.unit_calcs import *
 from .GreenTensor_Electric import *
 from .MSP import *
+from .sweep_mod import *
+from .streaming_mod import *
+from .dynamics_mod import *
+from .relaxation_mod import *
+from .force_map_mod import *
+from .pair_table_mod import *
+from .particles_mod import _read_only
 from typing import List
 
 
@@ -17,21 +28,32 @@ __all__ = [
     "OFO_calculations",
     "dipole_moments",
     "polarizability_mod",
+    "polarizability_table_mod",
     "particle_types",
     "particles_mod",
+    "spatial_mod",
+    "io_mod",
     "permittivity",
+    "dispersion_mod",
     "field_mod",
     "unit_calcs",
     "GreenTensor_Electric",
-    "MSP"
+    "MSP",
+    "sweep_mod",
+    "streaming_mod",
+    "dynamics_mod",
+    "relaxation_mod",
+    "force_map_mod",
+    "pair_table_mod"
 ]
 
 class System:
     """Class representing a Optical_Forces physical system containing particles."""
 
-    def __init__(self, particle_types : ParticleType | List[ParticleType], field: Field, positions_unit: str, medium_permittivity: float = 1.0) -> None:
+    def __init__(self, particle_types : ParticleType | List[ParticleType], field: Field, positions_unit: str, medium_permittivity: float = 1.0, num_workers: int | None = 1) -> None:
         """
         Initialize a System object by specifying the particle types, the field and the medium permittivity.
+        The Green's tensors are built by num_workers threads over row blocks (None uses all the available cores).
         """
         if not isinstance(particle_types, list):
             particle_types = [particle_types]
@@ -41,14 +63,139 @@ class System:
         self.medium_permittivity = medium_permittivity
         self.positions_unit = positions_unit
         self.particles = Particles()
-        self.medium_wave_number_nm = frequency_to_wavenumber_nm(self.field.get_frequency()) * np.sqrt(self.medium_permittivity)
+        self.num_workers = num_workers
+        self._cache = {}
 
         for ptype in self.particle_types:
             ptype.compute_polarizability(frequency = self.field.get_frequency(), medium_permittivity=self.medium_permittivity)
+
+    @property
+    def medium_wave_number_nm(self) -> float:
+        """Wave number of the field in the medium in inverse nanometers (1/nm)."""
+        return frequency_to_wavenumber_nm(self.field.get_frequency()) * np.sqrt(self.medium_permittivity)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+
+    def clear_cache(self) -> None:
+        """
+        Discard all the cached intermediate results.
+        """
+        self._cache = {}
+
+    def _field_key(self) -> tuple:
+        """
+        Hashable description of every field parameter except the amplitude.
+        """
+        items = []
+        for name, value in sorted(vars(self.field).items()):
+            if name == 'amplitude':
+                continue
+            if isinstance(value, np.ndarray):
+                value = (value.dtype.str, value.shape, value.tobytes())
+            items.append((name, value))
+        return (type(self.field), self.medium_permittivity, tuple(items))
+
+    def _field_amplitude(self) -> float | complex:
+        return getattr(self.field, 'amplitude', 1.0)
+
+    def _cached(self, stage: str, dependencies: tuple, compute, scales_with_amplitude: bool = False):
+        """
+        Return the cached result of a stage, recomputing it only if its dependencies changed.
+
+        Results that are linear in the field amplitude are stored with the amplitude they were computed for
+        and rescaled when only the amplitude changed. Cached arrays are returned as read-only views, so that
+        callers cannot modify later results in place.
+        """
+        amplitude = self._field_amplitude() if scales_with_amplitude else None
+        entry = self._cache.get(stage)
+        if entry is None or entry[0] != dependencies or (scales_with_amplitude and entry[2] == 0):
+            entry = (dependencies, _read_only(compute()), amplitude)
+            self._cache[stage] = entry
+        if not scales_with_amplitude or amplitude == entry[2]:
+            return entry[1]
+        return entry[1] * (amplitude / entry[2])
+
+    def _is_cached(self, stage: str, dependencies: tuple) -> bool:
+        entry = self._cache.get(stage)
+        return entry is not None and entry[0] == dependencies
+
+    def _geometry_dependencies(self) -> tuple:
+        return (self.particles, self.particles.positions_version, self.medium_wave_number_nm)
+
+    def _response_dependencies(self) -> tuple:
+        return (self.particles, self.particles.positions_version, self.particles.polarizabilities_version, self._field_key())
+
+    def _cached_geometry(self, stage: str, construct, update):
+        """
+        Return the cached result of a geometry stage.
+
+        The positions it was computed for are stored with it. When the same particles are at new positions
+        and fewer than half of them moved, only the rows and columns of the moved particles are recomputed.
+        """
+        dependencies = self._geometry_dependencies()
+        entry = self._cache.get(stage)
+        if entry is not None and entry[0] == dependencies:
+            return entry[1]
+
+        positions = self.particles.get_positions().copy()
+        value = None
+        if entry is not None and entry[0][0] is self.particles and entry[0][2] == dependencies[2] and entry[2].shape == positions.shape:
+            moved = np.flatnonzero(np.any(entry[2] != positions, axis=-1))
+            if 2 * moved.shape[0] < positions.shape[0]:
+                value = update(entry[1].copy(), positions, moved, self.medium_wave_number_nm)
+        if value is None:
+            value = construct(positions, self.medium_wave_number_nm, num_workers=self.num_workers)
+        value = _read_only(value)
+        self._cache[stage] = (dependencies, value, positions)
+        return value
+
+    def get_green_tensor(self) -> np.ndarray:
+        """
+        Get the Green's tensor of the particles, computed only when the positions, wavelength or medium changed.
+        When few particles moved, only their rows and columns are recomputed.
+
+        Returns
+        -------
+        np.ndarray
+            Read-only Green's tensor of shape (N, N, 3, 3). It stays in the cache, taking 144 N² bytes, until
+            clear_cache is called or the System is deleted.
+        """
+        return self._cached_geometry('green_tensor', construct_green_tensor, update_green_tensor)
+
+    def get_green_tensor_gradient(self) -> np.ndarray:
+        """
+        Get the derivative of the Green's tensor of the particles, computed only when the positions, wavelength or medium changed.
+        When few particles moved, only their rows and columns are recomputed.
+
+        Returns
+        -------
+        np.ndarray
+            Read-only derivative of the Green's tensor of shape (N, N, 3, 3, 3). It stays in the cache, taking
+            432 N² bytes, until clear_cache is called or the System is deleted. ForceCalculator.compute_forces
+            with indices builds only the selected rows and does not cache the full derivative.
+        """
+        return self._cached_geometry('green_tensor_gradient', construct_green_tensor_gradient, update_green_tensor_gradient)
+
+    def get_dipole_moments(self) -> np.ndarray:
+        """
+        Get the dipole moments of the particles induced by the MSP solution.
+
+        Returns
+        -------
+        np.ndarray
+            The dipole moments of shape (N, 3).
+        """
+        return self._cached('dipole_moments', self._response_dependencies(),
+                            lambda: calculate_dipole_moments_linear(self.particles.get_polarizabilities(), self.get_field_in_particles()),
+                            scales_with_amplitude=True)
     
     def add_particles(self,
                      positions: np.ndarray | List[float] | List[List[float]],
-                     particle_type: ParticleType | None = None) -> None:
+                     particle_type: ParticleType | None = None,
+                     type_indices: np.ndarray | List[int] | None = None) -> None:
         """
         Add particles to the system at specified positions.
 
@@ -56,29 +203,171 @@ class System:
         ----------
         positions :
             The position of the particles to add. This can be a 1D-three-element or 2D array-like.
-        type :
+        particle_type :
             The type of the particles to add. If not specified, and there is only one type in the system, that type will be used.
+        type_indices :
+            The index in particle_types of the type of each particle, e.g. from the configuration generators of
+            particles_mod. It replaces particle_type.
         """
 
-        if particle_type is None and len(self.particle_types) > 1:
-            raise ValueError("When adding particles to a multi-type system, the 'particle_type' parameter must be specified.")
-        else:
+        positions = np.asarray(positions, dtype=np.float64) * get_multiplier_nanometers(self.positions_unit)
+        if positions.ndim == 1:
+            positions = positions.reshape(1, -1)
+        elif positions.ndim != 2:
+            raise ValueError("Positions must be a 1D-three-element or 2D array-like.")
+
+        if type_indices is not None:
+            if particle_type is not None:
+                raise ValueError("Only one of 'particle_type' and 'type_indices' can be specified.")
+            type_indices = np.asarray(type_indices, dtype=np.int64).reshape(-1)
+            if type_indices.shape[0] != positions.shape[0] or np.any((type_indices < 0) | (type_indices >= len(self.particle_types))):
+                raise ValueError(f"type_indices must give one index in [0, {len(self.particle_types)}) per particle.")
+            type_polarizabilities = polarizability_array([ptype.polarizability for ptype in self.particle_types], len(self.particle_types))
+            self.particles.add_particles(positions=positions, polarizabilities=type_polarizabilities[type_indices], type_indices=type_indices)
+            return
+
+        if particle_type is None:
+            if len(self.particle_types) > 1:
+                raise ValueError("When adding particles to a multi-type system, the 'particle_type' parameter must be specified.")
             particle_type = self.particle_types[0]
 
-        if particle_type is not None and particle_type not in self.particle_types:
+        type_index = next((index for index, ptype in enumerate(self.particle_types) if ptype is particle_type), None)
+        if type_index is None:
             raise ValueError("The specified particle type is not part of the system's types.")
 
-        positions = np.array(positions)* get_multiplier_nanometers(self.positions_unit)
-        if positions.ndim == 1:
-            positions = [[pos] for pos in positions.flatten().tolist()]
-        elif positions.ndim == 2:
-            positions = positions.tolist() 
-        else:
-            raise ValueError("Positions must be a 1D-three-element or 2D array-like.")
+        # One entry per particle, so that a (3, 3) tensor is never read as one scalar per particle.
+        polarizabilities = np.repeat(polarizability_array([particle_type.polarizability], 1), positions.shape[0], axis=0)
+        self.particles.add_particles(positions=positions, polarizabilities=polarizabilities, type_indices=type_index)
+
+    def load_particles(self, filename: str, positions_unit: str | None = None) -> None:
+        """
+        Add the particles of a configuration file, see io_mod.load_configuration.
+
+        Parameters
+        ----------
+        filename :
+            The file name, with extension '.npy', '.npz', '.h5' or '.hdf5'.
+        positions_unit :
+            The unit of the positions of '.npy' files. Default is the positions unit of the system.
+
+        Notes
+        -----
+        The type indices of the file refer to particle_types. Particles without a type, with the index -1, take
+        the polarizabilities stored in the file. The positions are memory-mapped and copied once into the
+        particle storage.
+        """
+
+        configuration = load_configuration(filename, positions_unit=positions_unit or self.positions_unit)
+        scale = get_multiplier_nanometers(configuration["positions_unit"]) / get_multiplier_nanometers(self.positions_unit)
+        positions = configuration["positions"]
+        positions = positions * scale if scale != 1 else positions
+        type_indices = np.asarray(configuration["type_indices"])
+        untyped = type_indices == -1
+        if not np.any(untyped):
+            self.add_particles(positions, type_indices=type_indices)
+            return
+
+        if configuration["polarizabilities"] is None:
+            raise ValueError(f"The file '{filename}' has particles without a type but no polarizabilities.")
+        if np.any((type_indices < -1) | (type_indices >= len(self.particle_types))):
+            raise ValueError(f"type_indices must give one index in [-1, {len(self.particle_types)}) per particle.")
+        type_polarizabilities = polarizability_array([ptype.polarizability for ptype in self.particle_types], len(self.particle_types))
+        stored_polarizabilities = np.asarray(configuration["polarizabilities"])
+        if stored_polarizabilities.ndim != type_polarizabilities.ndim:
+            # Scalar polarizabilities become isotropic tensors when the others are tensors.
+            if stored_polarizabilities.ndim == 1:
+                stored_polarizabilities = stored_polarizabilities[:, None, None] * np.eye(3)
+            else:
+                type_polarizabilities = type_polarizabilities[:, None, None] * np.eye(3)
+        polarizabilities = np.where(untyped.reshape((-1,) + (1,) * (stored_polarizabilities.ndim - 1)),
+                                    stored_polarizabilities, type_polarizabilities[np.maximum(type_indices, 0)])
+        self.particles.add_particles(positions=np.asarray(positions, dtype=np.float64) * get_multiplier_nanometers(self.positions_unit),
+                                     polarizabilities=polarizabilities, type_indices=type_indices)
+
+    def save_particles(self, filename: str) -> None:
+        """
+        Save the positions, in the positions unit of the system, and the type indices of the particles, see
+        io_mod.save_configuration. Particles without a type are saved with the index -1, together with the
+        polarizabilities of all the particles so that load_particles can restore them.
+
+        Parameters
+        ----------
+        filename :
+            The file name, with extension '.npy', '.npz', '.h5' or '.hdf5'.
+        """
+
+        save_configuration(filename,
+                           positions=self.particles.get_positions() / get_multiplier_nanometers(self.positions_unit),
+                           type_indices=self.particles.type_indices,
+                           positions_unit=self.positions_unit,
+                           type_names=[type(ptype).__name__ for ptype in self.particle_types],
+                           polarizabilities=self.particles.get_polarizabilities() if np.any(self.particles.type_indices < 0) else None)
+
+    def update_polarizabilities(self) -> None:
+        """
+        Recompute the polarizability of every particle type for the current field frequency and medium, and
+        assign it to the particles of that type. Each type is evaluated once, whatever its number of particles.
+        """
+
+        for ptype in self.particle_types:
+            ptype.compute_polarizability(frequency=self.field.get_frequency(), medium_permittivity=self.medium_permittivity)
+        self._assign_type_polarizabilities()
+
+    def _assign_type_polarizabilities(self) -> None:
+        """
+        Assign the current polarizability of every particle type to the particles of that type.
+        """
+
+        self.particles._calculate_polarizabilities([ptype.polarizability for ptype in self.particle_types])
+
+    def remove_particles(self, indices: np.ndarray | List[int]) -> None:
+        """
+        Remove particles from the system.
+
+        Parameters
+        ----------
+        indices :
+            Indices, or boolean mask, of the particles to remove. The remaining particles keep their order.
+        """
+
+        self.particles.remove_particles(indices)
+
+    def get_bounding_radii(self) -> np.ndarray:
+        """
+        Get the radius of the bounding sphere of every particle, from its type, in nanometers.
+        Particles without a type are treated as points.
+
+        Returns
+        -------
+        np.ndarray
+            The radii of shape (N,).
+        """
+
+        # The last entry is picked by the index -1 of the particles without a type.
+        type_radii = np.array([ptype.get_bounding_radius() for ptype in self.particle_types] + [0.0])
+        return type_radii[self.particles.type_indices]
+
+    def validate_configuration(self, min_gap: float = 0.0) -> None:
+        """
+        Check that no two particles overlap, since the dipole approximation and the Green's tensor break down
+        for touching or coincident particles.
+
+        Parameters
+        ----------
+        min_gap :
+            The minimum surface-to-surface distance between particles, in the positions unit of the system. Default is 0.
+
+        Raises
+        ------
+        ValueError
+            If some pairs of particles are closer than the sum of their bounding radii plus min_gap.
+        """
+
+        overlaps = self.particles.find_overlaps(self.get_bounding_radii(), min_gap * get_multiplier_nanometers(self.positions_unit))
+        if overlaps.shape[0] > 0:
+            shown = ", ".join(f"({i}, {j})" for i, j in overlaps[:5])
+            raise ValueError(f"{overlaps.shape[0]} pairs of particles overlap, e.g. {shown}.")
 
-        polarizability = particle_type.polarizability
-        self.particles.add_particles(positions=positions, polarizabilities=polarizability)
-    
     def get_field_in_particles(self) -> np.ndarray:
         """
         Get the electric field at specified positions by solving the Multiple Scattering Problem (MSP).
@@ -89,30 +378,70 @@ class System:
             The electric field at the specified positions.
         """
         
+        return self._cached('field', self._response_dependencies(), self._solve_field, scales_with_amplitude=True)
 
+    def _solve_field(self) -> np.ndarray:
         external_field = self.field.get_external_field_in_positions(self.particles.get_positions())
-        green_tensor = construct_green_tensor(self.particles.get_positions(), self.medium_wave_number_nm)
-        field_solution = solve_MSP_from_arrays(polarizability=self.particles.polarizabilities,
+        field_solution = solve_MSP_from_arrays(polarizability=self.particles.get_polarizabilities(),
                                    external_field=external_field,
                                    wave_number=self.medium_wave_number_nm,
-                                   green_tensor=green_tensor,
-                                   method='Iterative')
+                                   green_tensor=self.get_green_tensor(),
+                                   method='Iterative',
+                                   initial_field=self._previous_field(external_field.shape))
         return field_solution
+
+    def _previous_field(self, shape: tuple) -> np.ndarray | None:
+        """
+        Last MSP solution of the same particles, rescaled to the current amplitude, used to warm start the next solve.
+        """
+        entry = self._cache.get('field')
+        if entry is None or entry[0][0] is not self.particles or entry[1].shape != shape or entry[2] == 0:
+            return None
+        return entry[1] * (self._field_amplitude() / entry[2])
     
-    def get_field_gradient_in_particles(self, current_field: np.ndarray) -> np.ndarray:
+    def get_field_gradient_in_particles(self, current_field: np.ndarray | None = None, indices: np.ndarray | List[int] | None = None) -> np.ndarray:
         """
         Get the electric field gradient at specified positions by solving the Multiple Scattering Problem (MSP) for the gradient.
 
+        Parameters
+        ----------
+        current_field :
+            The field on the particles used to compute the dipole moments. If not given, the (cached) MSP solution is used.
+        indices :
+            Indices of the particles where the gradient is computed. If given, only the M corresponding rows of the
+            Green's tensor derivative are built, so the cost scales with M·N instead of N².
+
         Returns
         -------
         np.ndarray
-            The electric field gradient at the specified positions.
+            The electric field gradient at the specified positions, of shape (N, 3, 3) or (M, 3, 3).
         """
         
-        external_gradient = self.field.get_external_gradient_in_positions(self.particles.get_positions())
-        green_tensor_derivative = construct_green_tensor_gradient(self.particles.get_positions(), self.medium_wave_number_nm)
-        dipole_moments = calculate_dipole_moments_linear(self.particles.polarizabilities,
-                                                         current_field) 
+        if indices is not None:
+            indices = np.arange(len(self.particles))[np.asarray(indices, dtype=np.int64).reshape(-1)]
+        if current_field is not None:
+            dipole_moments = calculate_dipole_moments_linear(self.particles.get_polarizabilities(),
+                                                             current_field) 
+            return self._solve_field_gradient(dipole_moments, indices)
+
+        if indices is None:
+            return self._cached('field_gradient', self._response_dependencies(),
+                                lambda: self._solve_field_gradient(self.get_dipole_moments()),
+                                scales_with_amplitude=True)
+        if self._is_cached('field_gradient', self._response_dependencies()):
+            return self.get_field_gradient_in_particles()[indices]
+        return self._cached('field_gradient_rows', self._response_dependencies() + (indices.tobytes(),),
+                            lambda: self._solve_field_gradient(self.get_dipole_moments(), indices),
+                            scales_with_amplitude=True)
+
+    def _solve_field_gradient(self, dipole_moments: np.ndarray, indices: np.ndarray | None = None) -> np.ndarray:
+        positions = self.particles.get_positions()
+        if indices is None:
+            external_gradient = self.field.get_external_gradient_in_positions(positions)
+            green_tensor_derivative = self.get_green_tensor_gradient()
+        else:
+            external_gradient = self.field.get_external_gradient_in_positions(positions[indices])
+            green_tensor_derivative = construct_green_tensor_gradient(positions, self.medium_wave_number_nm, num_workers=self.num_workers, rows=indices)
         gradient_solution = MSP_gradient_from_arrays(dipole_moments=dipole_moments,
                                                      external_gradient=external_gradient,
                                                      wave_number=self.medium_wave_number_nm,
@@ -134,8 +463,46 @@ class System:
         position = np.array(position)* get_multiplier_nanometers(self.positions_unit)
         if position.ndim != 1 or position.shape[0] != 3:
             raise ValueError("Position must be a 1D-three-element array-like.")
-        self.particles.set_position(index, position.tolist())
+        self.particles.set_position(index, position)
+
+    def set_positions(self, positions: np.ndarray | List[List[float]]) -> None:
+        """
+        Set the positions of all the particles.
+
+        Parameters
+        ----------
+        positions :
+            The new positions of the particles, of shape (N, 3), in the positions unit of the system.
+        """
+        positions = np.array(positions, dtype=np.float64)* get_multiplier_nanometers(self.positions_unit)
+        if positions.ndim != 2 or positions.shape[1] != 3:
+            raise ValueError("Positions must be a 2D array-like of shape (N, 3).")
+        self.particles.set_positions(positions)
+
 
+    def relax(self, method: str = "FIRE", force_tolerance: float = 1e-3, max_steps: int = 1000, max_step: float = 1.0, **kwargs) -> dict:
+        """
+        Move the particles to a configuration where the forces vanish, see relaxation_mod.relax.
+
+        Parameters
+        ----------
+        method :
+            Either 'FIRE' or 'LBFGS'. Default is 'FIRE'.
+        force_tolerance :
+            Threshold of the force norm on every mobile particle. Default is 1e-3.
+        max_steps :
+            Maximum number of steps. Default is 1000.
+        max_step :
+            Maximum displacement of a particle in one step, in the positions unit of the system. Default is 1.
+        **kwargs :
+            fixed, extra_forces, remove_net_force and the options of the method.
+
+        Returns
+        -------
+        dict
+            The final positions and forces, whether the relaxation converged, and the number of steps and force evaluations.
+        """
+        return relax(self, method=method, force_tolerance=force_tolerance, max_steps=max_steps, max_step=max_step, **kwargs)
 
 class ForceCalculator:
     """Class to compute optical forces on particles in a System."""
@@ -147,21 +514,74 @@ class ForceCalculator:
         self.system = system
 
 
-    def compute_forces(self) -> np.ndarray:
+    def compute_forces(self, indices: np.ndarray | List[int] | None = None) -> np.ndarray:
         """
         Compute the optical forces on particles at specified positions.
+        The field, Green's tensors and dipole moments are reused from the System cache when their dependencies did not change.
+
+        Parameters
+        ----------
+        indices :
+            Indices of the particles on which the forces are computed. If given, only the corresponding rows of the
+            Green's tensor derivative are built. The MSP is still solved for all the particles.
 
         Returns
         -------
         np.ndarray
-            The computed optical forces on the particles.
+            The computed optical forces on the particles, of shape (N, 3) or (len(indices), 3).
         """
 
-        E_field = self.system.get_field_in_particles()
-        E_grad = self.system.get_field_gradient_in_particles(E_field)
-        dipole_moments = calculate_dipole_moments_linear(self.system.particles.polarizabilities, E_field)
+        E_grad = self.system.get_field_gradient_in_particles(indices=indices)
+        dipole_moments = self.system.get_dipole_moments()
+        if indices is not None:
+            dipole_moments = dipole_moments[np.asarray(indices, dtype=np.int64).reshape(-1)]
         forces = calculate_forces_eppgrad(self.system.medium_permittivity, dipole_moments, E_grad)
 
         return forces
 
+    def compute_forces_batched(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Compute the optical forces for a batch of configurations of the particles of the System.
+
+        Parameters
+        ----------
+        positions :
+            Array of shape (B, N, 3) with B configurations of the N particles of the system, in the positions unit of the system.
+
+        Returns
+        -------
+        np.ndarray
+            The computed optical forces, of shape (B, N, 3).
+
+        Notes
+        -----
+        The Green's tensors, MSP solutions and gradients of all the configurations are computed with array
+        operations over the leading axis, using a direct solver. This is intended for many configurations
+        of few particles, where the per-call overhead of compute_forces dominates.
+        """
+
+        system = self.system
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.ndim != 3 or positions.shape[2] != 3:
+            raise ValueError("Positions must be an array of shape (B, N, 3).")
+        batch, num_particles, dimensions = positions.shape
+        polarizabilities = system.particles.get_polarizabilities()
+        if polarizabilities.shape[0] != num_particles:
+            raise ValueError(f"The configurations must have the {polarizabilities.shape[0]} particles of the system, got {num_particles}.")
+
+        positions_nm = positions * get_multiplier_nanometers(system.positions_unit)
+        flat_positions = positions_nm.reshape(batch * num_particles, dimensions)
+        external_field = system.field.get_external_field_in_positions(flat_positions).reshape(batch, num_particles, dimensions)
+        external_gradient = system.field.get_external_gradient_in_positions(flat_positions).reshape(batch, num_particles, dimensions, dimensions)
+
+        green_tensor = construct_green_tensor_batched(positions_nm, system.medium_wave_number_nm)
+        E_field = array_MSP_inverse_batched(polarizabilities, external_field, system.medium_wave_number_nm, green_tensor)
+        dipole_moments = calculate_dipole_moments_linear(polarizabilities, E_field)
+
+        green_tensor_derivative = construct_green_tensor_gradient_batched(positions_nm, system.medium_wave_number_nm)
+        E_grad = MSP_gradient_from_arrays(dipole_moments=dipole_moments,
+                                          external_gradient=external_gradient,
+                                          wave_number=system.medium_wave_number_nm,
+                                          green_tensor_derivative=green_tensor_derivative)
 
+        return calculate_forces_eppgrad(system.medium_permittivity, dipole_moments, E_grad)
@@ -1,45 +1,133 @@
 import numpy as np
 from typing import List
 
+def polarizability_array(polarizability: np.ndarray | complex | List[complex] | float | List[float],
+                         num_particles: int,
+                         dimensions: int = 3) -> np.ndarray:
+    """
+    Convert polarizabilities to an array of shape (N,) for isotropic particles or (N, d, d) for anisotropic ones.
+
+    Parameters
+    ----------
+    polarizability :
+        A scalar or a (d, d) tensor shared by all the particles, or one scalar or (d, d) tensor per particle,
+        i.e. an array of shape (N,) or (N, d, d). Lists mixing scalars and tensors are converted to tensors.
+        A 2-D array is always read as one shared tensor. When N == d it could also be mistaken for one row per
+        particle, so it is rejected and the tensors must be given explicitly with shape (N, d, d).
+    num_particles :
+        The number of particles in the system.
+    dimensions :
+        The number of dimensions of the system. Default is 3.
+
+    Returns
+    -------
+    np.ndarray
+        Complex array of shape (N,) or (N, d, d).
+    """
+
+    if isinstance(polarizability, (complex, float, int, np.number)):
+        return np.full(num_particles, polarizability, dtype=np.complex128)
+    if not isinstance(polarizability, (list, tuple, np.ndarray)):
+        raise TypeError("Polarizability must be a complex number, float, int, list, or numpy array.")
+
+    if isinstance(polarizability, np.ndarray) and polarizability.dtype != object:
+        array = polarizability.astype(np.complex128, copy=False)
+    else:
+        elements = [np.asarray(element, dtype=np.complex128) for element in polarizability]
+        if any(element.ndim == 2 for element in elements):
+            identity = np.eye(dimensions)
+            elements = [element * identity if element.ndim == 0 else element for element in elements]
+        array = np.array(elements, dtype=np.complex128) if elements else np.zeros(0, dtype=np.complex128)
+
+    if array.ndim == 2 and array.shape == (dimensions, dimensions):
+        if num_particles == dimensions:
+            raise ValueError(f"A ({dimensions}, {dimensions}) polarizability is ambiguous for {num_particles} particles, "
+                             f"give the tensors with shape ({num_particles}, {dimensions}, {dimensions}).")
+        array = np.broadcast_to(array, (num_particles, dimensions, dimensions))
+    if array.ndim == 0:
+        array = np.full(num_particles, array, dtype=np.complex128)
+    if array.shape[0] != num_particles:
+        raise ValueError("Polarizability and electric field must have the same number of elements.")
+    if array.shape[1:] not in [(), (dimensions, dimensions)]:
+        raise ValueError(f"Polarizabilities must have shape (N,) or (N, {dimensions}, {dimensions}), got {array.shape}.")
+    return array
+
 def calculate_dipole_moments_linear(polarizability: np.ndarray | complex | List[complex] | float | List[float],
                                     electric_field : np.ndarray) -> np.ndarray:
-    
-    
-    if isinstance(polarizability, (complex, float, int)):
-        polarizability += 0j  # Ensure polarizability is treated as a complex number
-        dipole_moments = polarizability * electric_field
-    elif isinstance(polarizability, (list, np.ndarray)):
-        number_of_polarizabilities = len(polarizability) if isinstance(polarizability, list) else polarizability.shape[0]
-        if number_of_polarizabilities != electric_field.shape[0]:
-            raise ValueError("Polarizability and electric field must have the same number of elements.")
-        dipole_moments = np.array([polarizability[i] * electric_field[i,:] for i in range(number_of_polarizabilities)])
-    else:
-        raise TypeError("Polarizability must be a complex number, float, int, list, or numpy array.")
+    """
+    Calculate the dipole moments p = alpha E induced in the particles.
+
+    Parameters
+    ----------
+    polarizability :
+        A scalar shared by all the particles, an array of shape (N,) of scalar polarizabilities or an array of
+        shape (N, d, d) of polarizability tensors. Lists are converted with polarizability_array.
+    electric_field :
+        The electric field on the particles, of shape (..., N, d).
 
+    Returns
+    -------
+    np.ndarray
+        The dipole moments of shape (..., N, d).
+    """
 
-    return dipole_moments
+    if isinstance(polarizability, (complex, float, int, np.number)):
+        return (polarizability + 0j) * electric_field
+
+    polarizability = polarizability_array(polarizability, electric_field.shape[-2], electric_field.shape[-1])
+    if polarizability.ndim == 1:
+        return polarizability[:, None] * electric_field
+    return np.einsum('imn,...in->...im', polarizability, electric_field)
 
 def polarizability_to_matrix(polarizability, num_particles : int, dimensions : int) -> np.ndarray:
     """
     Convert polarizability to a matrix form suitable for calculations.
-    
+
     Parameters
     ----------
     polarizability : complex, float, int, list, or np.ndarray
-        The polarizability value(s).
+        The polarizability value(s), scalars or (d, d) tensors.
     num_particles :
         The number of particles in the system.
     dimensions :
         The number of dimensions of the system.
-    
+
+    Returns
+    -------
+    np.ndarray
+        The block-diagonal matrix of shape (N d, N d) of the polarizabilities.
+
+    Notes
+    -----
+    The solvers do not build this dense matrix, they apply the polarizabilities with apply_polarizability.
+    """
+
+    polarizability = polarizability_array(polarizability, num_particles, dimensions)
+    if polarizability.ndim == 1:
+        polarizability = polarizability[:, None, None] * np.eye(dimensions)
+
+    matrix = np.zeros((num_particles, dimensions, num_particles, dimensions), dtype=np.complex128)
+    particles = np.arange(num_particles)
+    matrix[particles, :, particles, :] = polarizability
+    return matrix.reshape(num_particles * dimensions, num_particles * dimensions)
+
+def apply_polarizability(green_tensor: np.ndarray, polarizability: np.ndarray) -> np.ndarray:
+    """
+    Multiply the blocks of a Green's tensor on the right by the polarizabilities, (G alpha)_ij = G_ij alpha_j.
+
+    Parameters
+    ----------
+    green_tensor :
+        Green's tensor of shape (..., N, N, d, d).
+    polarizability :
+        Polarizabilities of shape (N,) or (N, d, d), see polarizability_array.
+
     Returns
     -------
     np.ndarray
-        A matrix representation of the polarizability.
+        The product of shape (..., N, N, d, d).
     """
-    
-    if isinstance(polarizability, (complex, float, int)):
-        return np.eye(dimensions*num_particles) * polarizability
 
-    elif isinstance(polarizability, (list, np.ndarray)):
-       return np.diag([polarizability[i] for i in range(num_particles) for _ in range(dimensions)])
\ No newline at end of file
+    if polarizability.ndim == 1:
+        return green_tensor * polarizability[:, None, None]
+    return np.einsum('...ijml,jln->...ijmn', green_tensor, polarizability)
@@ -0,0 +1,214 @@
+import numpy as np
+from scipy.optimize import least_squares
+from .permittivity import permittivity_ridx
+
+class DrudeLorentzModel:
+    """Permittivity given by a Drude term, Lorentz oscillators and critical-point terms, with frequencies in eV."""
+
+    def __init__(self,
+                 epsilon_inf: float,
+                 plasma_frequency: float = 0.0,
+                 collision_frequency: float = 0.0,
+                 oscillator_strengths: np.ndarray | list = (),
+                 resonance_frequencies: np.ndarray | list = (),
+                 oscillator_widths: np.ndarray | list = (),
+                 critical_point_amplitudes: np.ndarray | list = (),
+                 critical_point_frequencies: np.ndarray | list = (),
+                 critical_point_phases: np.ndarray | list = (),
+                 critical_point_widths: np.ndarray | list = ()) -> None:
+        """
+        Initialize a DrudeLorentzModel.
+
+        Parameters
+        ----------
+        epsilon_inf :
+            The high-frequency dielectric constant.
+        plasma_frequency, collision_frequency :
+            The parameters of the Drude term, as in permittivity_Drude. A plasma frequency of 0 removes it.
+        oscillator_strengths, resonance_frequencies, oscillator_widths :
+            The strengths f_j, frequencies w_j and widths g_j of the Lorentz oscillators.
+        critical_point_amplitudes, critical_point_frequencies, critical_point_phases, critical_point_widths :
+            The amplitudes A_j, frequencies W_j, phases phi_j and widths G_j of the critical-point terms.
+
+        Notes
+        -----
+        The permittivity is
+        eps(w) = eps_inf - wp^2 / (w^2 + i gamma w) + sum_j f_j w_j^2 / (w_j^2 - w^2 - i g_j w)
+                 + sum_j A_j W_j [e^(i phi_j) / (W_j - w - i G_j) + e^(-i phi_j) / (W_j + w + i G_j)],
+        with the same time convention as permittivity_Drude, where absorption gives a positive imaginary part.
+        The critical-point terms of Etchegoin et al. describe the interband edges of noble metals better than
+        Lorentz oscillators.
+        """
+
+        self.epsilon_inf = float(epsilon_inf)
+        self.plasma_frequency = float(plasma_frequency)
+        self.collision_frequency = float(collision_frequency)
+        self.oscillator_strengths = np.asarray(oscillator_strengths, dtype=np.float64)
+        self.resonance_frequencies = np.asarray(resonance_frequencies, dtype=np.float64)
+        self.oscillator_widths = np.asarray(oscillator_widths, dtype=np.float64)
+        self.critical_point_amplitudes = np.asarray(critical_point_amplitudes, dtype=np.float64)
+        self.critical_point_frequencies = np.asarray(critical_point_frequencies, dtype=np.float64)
+        self.critical_point_phases = np.asarray(critical_point_phases, dtype=np.float64)
+        self.critical_point_widths = np.asarray(critical_point_widths, dtype=np.float64)
+        self.frequency_range = None
+        self.rms_error = None
+        self.max_error = None
+
+    def __call__(self, frequency: float | np.ndarray) -> complex | np.ndarray:
+        """
+        Compute the permittivity at frequencies in eV.
+        """
+
+        w = np.asarray(frequency, dtype=np.float64)[..., None]
+        epsilon = self.epsilon_inf + 0j
+        if self.plasma_frequency != 0.0:
+            epsilon = epsilon - self.plasma_frequency**2 / (w[..., 0]**2 + 1j * self.collision_frequency * w[..., 0])
+        f, w0, g = self.oscillator_strengths, self.resonance_frequencies, self.oscillator_widths
+        epsilon = epsilon + np.sum(f * w0**2 / (w0**2 - w**2 - 1j * g * w), axis=-1)
+        A, W, phi, G = self.critical_point_amplitudes, self.critical_point_frequencies, self.critical_point_phases, self.critical_point_widths
+        epsilon = epsilon + np.sum(A * W * (np.exp(1j * phi) / (W - w - 1j * G) + np.exp(-1j * phi) / (W + w + 1j * G)), axis=-1)
+        return epsilon[()] if np.ndim(epsilon) == 0 else epsilon
+
+    def derivative(self, frequency: float | np.ndarray) -> complex | np.ndarray:
+        """
+        Compute the analytic derivative of the permittivity with respect to the frequency in eV, in 1/eV.
+        """
+
+        w = np.asarray(frequency, dtype=np.float64)[..., None]
+        derivative = np.zeros(w.shape[:-1], dtype=np.complex128)
+        if self.plasma_frequency != 0.0:
+            drude_denominator = w[..., 0]**2 + 1j * self.collision_frequency * w[..., 0]
+            derivative = derivative + self.plasma_frequency**2 * (2 * w[..., 0] + 1j * self.collision_frequency) / drude_denominator**2
+        f, w0, g = self.oscillator_strengths, self.resonance_frequencies, self.oscillator_widths
+        derivative = derivative + np.sum(f * w0**2 * (2 * w + 1j * g) / (w0**2 - w**2 - 1j * g * w)**2, axis=-1)
+        A, W, phi, G = self.critical_point_amplitudes, self.critical_point_frequencies, self.critical_point_phases, self.critical_point_widths
+        derivative = derivative + np.sum(A * W * (np.exp(1j * phi) / (W - w - 1j * G)**2 - np.exp(-1j * phi) / (W + w + 1j * G)**2), axis=-1)
+        return derivative[()] if np.ndim(derivative) == 0 else derivative
+
+    def parameters(self) -> np.ndarray:
+        """Pack the parameters into the vector used by the fit."""
+        return np.concatenate([[self.epsilon_inf, self.plasma_frequency, self.collision_frequency],
+                               np.stack([self.oscillator_strengths, self.resonance_frequencies, self.oscillator_widths], axis=-1).ravel(),
+                               np.stack([self.critical_point_amplitudes, self.critical_point_frequencies,
+                                         self.critical_point_phases, self.critical_point_widths], axis=-1).ravel()])
+
+    @classmethod
+    def from_parameters(cls, parameters: np.ndarray, num_lorentz: int, num_critical_points: int) -> "DrudeLorentzModel":
+        """Unpack a parameter vector built by parameters."""
+        lorentz = np.asarray(parameters[3:3 + 3 * num_lorentz]).reshape(num_lorentz, 3)
+        critical_points = np.asarray(parameters[3 + 3 * num_lorentz:]).reshape(num_critical_points, 4)
+        return cls(parameters[0], parameters[1], parameters[2], *lorentz.T, *critical_points.T)
+
+def fit_dispersion_model(frequencies: np.ndarray,
+                         permittivities: np.ndarray,
+                         num_lorentz: int = 2,
+                         num_critical_points: int = 0,
+                         drude: bool = True,
+                         initial_model: DrudeLorentzModel | None = None,
+                         max_evaluations: int = 20000) -> DrudeLorentzModel:
+    """
+    Fit a Drude-Lorentz model, optionally with critical-point terms, to tabulated permittivities.
+
+    Parameters
+    ----------
+    frequencies :
+        The frequencies in eV.
+    permittivities :
+        The complex permittivities at these frequencies.
+    num_lorentz :
+        Number of Lorentz oscillators. Default is 2.
+    num_critical_points :
+        Number of critical-point terms. Default is 0.
+    drude :
+        Whether to include the Drude term, for metals. Default is True.
+    initial_model :
+        Starting point of the fit, with num_lorentz oscillators and num_critical_points critical points. Default
+        places the oscillators evenly over the band and estimates the Drude term from the lowest frequency.
+    max_evaluations :
+        Maximum number of model evaluations of the least-squares fit. Default is 20000.
+
+    Returns
+    -------
+    DrudeLorentzModel
+        The fitted model. Its frequency_range is the fitted band, its rms_error the root mean square of
+        |eps_model - eps| divided by the root mean square of |eps|, and its max_error the largest
+        |eps_model - eps| / |eps|.
+
+    Notes
+    -----
+    The residuals are the real and imaginary parts of (eps_model - eps) / |eps|, so that the fit is accurate in
+    relative terms over the whole band, and they are minimized with scipy.optimize.least_squares with the
+    strengths, frequencies and widths bounded to non-negative values.
+    """
+
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    permittivities = np.asarray(permittivities, dtype=np.complex128)
+    valid = np.isfinite(permittivities)
+    frequencies, permittivities = frequencies[valid], permittivities[valid]
+    low, high = frequencies.min(), frequencies.max()
+    band = high - low
+
+    if initial_model is None:
+        lowest = np.argmin(frequencies)
+        plasma_frequency, collision_frequency = 0.0, 0.0
+        if drude:
+            plasma_frequency = frequencies[lowest] * np.sqrt(max(1.0 - permittivities[lowest].real, 1.0))
+            collision_frequency = np.clip(permittivities[lowest].imag * frequencies[lowest]**3 / plasma_frequency**2, 0.01, 1.0)
+        lorentz_centers = low + band * (np.arange(num_lorentz) + 0.5) / max(num_lorentz, 1)
+        critical_point_centers = low + band * (np.arange(num_critical_points) + 0.5) / max(num_critical_points, 1)
+        initial_model = DrudeLorentzModel(1.0, plasma_frequency, collision_frequency,
+                                          np.ones(num_lorentz), lorentz_centers, np.full(num_lorentz, band / max(num_lorentz, 1)),
+                                          np.ones(num_critical_points), critical_point_centers, np.full(num_critical_points, -np.pi / 4),
+                                          np.full(num_critical_points, band / max(num_critical_points, 1)))
+
+    initial = initial_model.parameters()
+    lower = np.concatenate([[0.0, 0.0, 0.0], np.tile([0.0, 0.0, 0.0], num_lorentz), np.tile([0.0, 0.0, -np.pi, 0.0], num_critical_points)])
+    upper = np.concatenate([[np.inf, np.inf, np.inf], np.tile([np.inf, np.inf, np.inf], num_lorentz), np.tile([np.inf, np.inf, np.pi, np.inf], num_critical_points)])
+    # Without the Drude term, its parameters stay at their initial values instead of being fitted.
+    free = np.ones(initial.shape[0], dtype=bool)
+    if not drude:
+        initial[1:3] = 0.0
+        free[1:3] = False
+    parameters = np.clip(initial, lower, upper)
+    weights = 1 / np.maximum(np.abs(permittivities), 1e-3 * np.abs(permittivities).max())
+
+    def residuals(free_parameters):
+        parameters[free] = free_parameters
+        difference = (DrudeLorentzModel.from_parameters(parameters, num_lorentz, num_critical_points)(frequencies) - permittivities) * weights
+        return np.concatenate([difference.real, difference.imag])
+
+    result = least_squares(residuals, parameters[free], bounds=(lower[free], upper[free]), x_scale="jac", max_nfev=max_evaluations)
+    parameters[free] = result.x
+    model = DrudeLorentzModel.from_parameters(parameters, num_lorentz, num_critical_points)
+    error = np.abs(model(frequencies) - permittivities)
+    model.frequency_range = (low, high)
+    model.rms_error = float(np.sqrt(np.mean(error**2) / np.mean(np.abs(permittivities)**2)))
+    model.max_error = float(np.max(error / np.abs(permittivities)))
+    return model
+
+def fit_material(material: str,
+                 frequency_range: tuple,
+                 num_samples: int = 400,
+                 **kwargs) -> DrudeLorentzModel:
+    """
+    Fit a dispersion model to the tabulated permittivity of a material over a frequency band.
+
+    Parameters
+    ----------
+    material :
+        The name of the material as recognized by the RefractiveIndex package.
+    frequency_range :
+        The (minimum, maximum) frequencies of the band in eV.
+    num_samples :
+        Number of frequencies at which the tabulated permittivity is sampled. Default is 400.
+    **kwargs :
+        Arguments of fit_dispersion_model.
+
+    Returns
+    -------
+    DrudeLorentzModel
+        The fitted model, which can be used as the material of a SphereType or SpheroidType.
+    """
+
+    frequencies = np.linspace(frequency_range[0], frequency_range[1], num_samples)
+    return fit_dispersion_model(frequencies, permittivity_ridx(frequencies, material), **kwargs)
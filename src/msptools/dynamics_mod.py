@@ -0,0 +1,301 @@
+import numpy as np
+from typing import Callable, List
+from .tools.unit_calcs import get_multiplier_nanometers
+
+
+def _mobile_mask(num_particles: int, fixed: np.ndarray | List[int] | None) -> np.ndarray:
+    mobile = np.ones(num_particles, dtype=bool)
+    if fixed is not None:
+        mobile[np.asarray(fixed)] = False
+    return mobile
+
+def _total_forces(force_calculator, positions: np.ndarray, mobile: np.ndarray, mobile_indices: np.ndarray, extra_forces) -> np.ndarray:
+    """
+    Optical forces on the mobile particles plus the extra forces, with zero rows for the fixed particles.
+    The optical forces on the fixed particles are not computed.
+    """
+
+    forces = np.zeros_like(positions)
+    if mobile.all():
+        forces += force_calculator.compute_forces()
+    elif mobile_indices.shape[0] > 0:
+        forces[mobile_indices] = force_calculator.compute_forces(indices=mobile_indices)
+    if extra_forces is not None:
+        forces += np.asarray(extra_forces(positions.copy()), dtype=np.float64)
+    forces[~mobile] = 0.0
+    return forces
+
+
+class Integrator:
+    """Base class of the integrators that move the particles of a System under the optical forces."""
+
+    def __init__(self,
+                 system,
+                 time_step: float,
+                 extra_forces: Callable[[np.ndarray], np.ndarray] | None = None,
+                 fixed: np.ndarray | List[int] | None = None,
+                 force_calculator=None) -> None:
+        """
+        Initialize an Integrator by specifying the System and the time step.
+
+        Parameters
+        ----------
+        system :
+            The System whose particles are moved. Its positions are updated at every step.
+        time_step :
+            The time step, in units consistent with the forces and the positions unit of the system.
+        extra_forces :
+            Callable returning additional forces of shape (N, 3) for the positions of shape (N, 3), in the
+            positions unit of the system. They are added to the optical forces.
+        fixed :
+            Indices, or boolean mask, of the particles that do not move. Their forces are not computed.
+        force_calculator :
+            The object computing the optical forces of the system with compute_forces(indices=None), e.g. a
+            PairForceCalculator for approximate dynamics. Default is a ForceCalculator of the system.
+        """
+
+        from . import ForceCalculator
+
+        if time_step <= 0:
+            raise ValueError(f"The time step must be positive, got {time_step}.")
+        self.system = system
+        self.force_calculator = ForceCalculator(system) if force_calculator is None else force_calculator
+        self.time_step = time_step
+        self.extra_forces = extra_forces
+        self.time = 0.0
+        self.positions = system.particles.get_positions() / get_multiplier_nanometers(system.positions_unit)
+        self.forces = None
+
+        self.mobile = _mobile_mask(self.positions.shape[0], fixed)
+        self._mobile_indices = np.flatnonzero(self.mobile)
+
+    def compute_forces(self) -> np.ndarray:
+        """
+        Compute the total forces on the particles at their current positions.
+
+        Returns
+        -------
+        np.ndarray
+            The optical forces plus the extra forces, of shape (N, 3). The rows of the fixed particles are zero.
+
+        Notes
+        -----
+        The Green's tensors of the System are updated only for the particles that moved and the MSP solve
+        is warm started from the solution of the previous step.
+        """
+
+        return _total_forces(self.force_calculator, self.positions, self.mobile, self._mobile_indices, self.extra_forces)
+
+    def step(self) -> None:
+        """
+        Advance the particles by one time step.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def frame(self) -> dict:
+        """
+        Get the current state of the integrator.
+
+        Returns
+        -------
+        dict
+            The time, positions and forces, and the velocities for inertial integrators.
+        """
+
+        if self.forces is None:
+            self.forces = self.compute_forces()
+        return {"time": np.float64(self.time), "positions": self.positions.copy(), "forces": self.forces.copy()}
+
+    def run(self,
+            num_steps: int,
+            stride: int = 1,
+            chunk_size: int = 100,
+            writer: Callable[[dict], None] | None = None) -> dict | None:
+        """
+        Integrate num_steps steps and record a trajectory.
+
+        Parameters
+        ----------
+        num_steps :
+            The number of steps.
+        stride :
+            A frame is recorded every stride steps. Default is 1.
+        chunk_size :
+            The number of frames buffered before they are passed to the writer. Default is 100.
+        writer :
+            Callable receiving each chunk as a dict of arrays with the frames along the first axis, with the
+            keys of frame(). If given, the frames are not kept in memory.
+
+        Returns
+        -------
+        dict | None
+            The recorded frames concatenated along the first axis, or None if a writer is given.
+        """
+
+        if stride < 1 or chunk_size < 1:
+            raise ValueError("stride and chunk_size must be positive integers.")
+
+        buffers = None
+        num_buffered = 0
+        chunks = []
+        for step in range(1, num_steps + 1):
+            self.step()
+            if step % stride != 0:
+                continue
+            frame = self.frame()
+            if buffers is None:
+                buffers = {name: np.empty((chunk_size,) + np.shape(value), dtype=np.asarray(value).dtype) for name, value in frame.items()}
+            for name, value in frame.items():
+                buffers[name][num_buffered] = value
+            num_buffered += 1
+            if num_buffered == chunk_size:
+                self._flush(buffers, num_buffered, writer, chunks)
+                num_buffered = 0
+        if num_buffered > 0:
+            self._flush(buffers, num_buffered, writer, chunks)
+
+        if writer is not None:
+            return None
+        if not chunks:
+            return {name: np.empty((0,) + np.shape(value)) for name, value in self.frame().items()}
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+    def _flush(self, buffers: dict, num_frames: int, writer, chunks: list) -> None:
+        chunk = {name: buffer[:num_frames].copy() for name, buffer in buffers.items()}
+        if writer is None:
+            chunks.append(chunk)
+        else:
+            writer(chunk)
+
+    def _move(self, positions: np.ndarray) -> None:
+        self.positions = positions
+        self.system.set_positions(positions)
+
+
+class VelocityVerletIntegrator(Integrator):
+    """Velocity Verlet integrator of the Newtonian dynamics of the particles."""
+
+    def __init__(self,
+                 system,
+                 time_step: float,
+                 masses: float | np.ndarray | List[float],
+                 velocities: np.ndarray | None = None,
+                 extra_forces: Callable[[np.ndarray], np.ndarray] | None = None,
+                 fixed: np.ndarray | List[int] | None = None,
+                 force_calculator=None) -> None:
+        """
+        Initialize a VelocityVerletIntegrator.
+
+        Parameters
+        ----------
+        system :
+            The System whose particles are moved.
+        time_step :
+            The time step.
+        masses :
+            The mass of the particles, a single value or one per particle.
+        velocities :
+            Initial velocities of shape (N, 3). Default is zero.
+        extra_forces :
+            Callable returning additional forces for the positions, see Integrator.
+        fixed :
+            Indices, or boolean mask, of the particles that do not move.
+        force_calculator :
+            The object computing the optical forces, see Integrator.
+        """
+
+        super().__init__(system, time_step, extra_forces=extra_forces, fixed=fixed, force_calculator=force_calculator)
+        num_particles = self.positions.shape[0]
+        self.masses = np.broadcast_to(np.asarray(masses, dtype=np.float64), (num_particles,)).copy()
+        if np.any(self.masses <= 0):
+            raise ValueError("The masses must be positive.")
+        if velocities is None:
+            self.velocities = np.zeros_like(self.positions)
+        else:
+            self.velocities = np.array(velocities, dtype=np.float64).reshape(self.positions.shape)
+        self.velocities[~self.mobile] = 0.0
+
+    def step(self) -> None:
+        """
+        Advance the particles by one time step. The forces are computed once per step.
+        """
+
+        if self.forces is None:
+            self.forces = self.compute_forces()
+        half_step_velocities = self.velocities + 0.5 * self.time_step * self.forces / self.masses[:, None]
+        self._move(self.positions + self.time_step * half_step_velocities)
+        self.forces = self.compute_forces()
+        self.velocities = half_step_velocities + 0.5 * self.time_step * self.forces / self.masses[:, None]
+        self.time += self.time_step
+
+    def frame(self) -> dict:
+        frame = super().frame()
+        frame["velocities"] = self.velocities.copy()
+        return frame
+
+
+class BrownianIntegrator(Integrator):
+    """Euler-Maruyama integrator of the overdamped Langevin (Brownian) dynamics of the particles."""
+
+    def __init__(self,
+                 system,
+                 time_step: float,
+                 friction: float | np.ndarray | List[float],
+                 thermal_energy: float = 0.0,
+                 extra_forces: Callable[[np.ndarray], np.ndarray] | None = None,
+                 fixed: np.ndarray | List[int] | None = None,
+                 seed: int | None = None,
+                 force_calculator=None) -> None:
+        """
+        Initialize a BrownianIntegrator.
+
+        Parameters
+        ----------
+        system :
+            The System whose particles are moved.
+        time_step :
+            The time step.
+        friction :
+            The friction coefficient of the particles, a single value or one per particle.
+        thermal_energy :
+            The thermal energy k_B T. Default is 0, i.e. no noise.
+        extra_forces :
+            Callable returning additional forces for the positions, see Integrator.
+        fixed :
+            Indices, or boolean mask, of the particles that do not move.
+        seed :
+            Seed of the random number generator of the thermal noise.
+        force_calculator :
+            The object computing the optical forces, see Integrator.
+
+        Notes
+        -----
+        Each step displaces the particles by F dt / gamma + sqrt(2 k_B T dt / gamma) xi, with xi a
+        standard normal random vector.
+        """
+
+        super().__init__(system, time_step, extra_forces=extra_forces, fixed=fixed, force_calculator=force_calculator)
+        num_particles = self.positions.shape[0]
+        self.friction = np.broadcast_to(np.asarray(friction, dtype=np.float64), (num_particles,)).copy()
+        if np.any(self.friction <= 0):
+            raise ValueError("The friction coefficients must be positive.")
+        if thermal_energy < 0:
+            raise ValueError(f"The thermal energy must be non-negative, got {thermal_energy}.")
+        self.thermal_energy = thermal_energy
+        self.rng = np.random.default_rng(seed)
+
+    def step(self) -> None:
+        """
+        Advance the particles by one time step. The forces are computed once per step.
+        """
+
+        if self.forces is None:
+            self.forces = self.compute_forces()
+        displacement = self.time_step * self.forces / self.friction[:, None]
+        if self.thermal_energy > 0:
+            noise_amplitude = np.sqrt(2 * self.thermal_energy * self.time_step / self.friction)
+            displacement += noise_amplitude[:, None] * self.rng.standard_normal(self.positions.shape)
+        displacement[~self.mobile] = 0.0
+        self._move(self.positions + displacement)
+        self.forces = self.compute_forces()
+        self.time += self.time_step
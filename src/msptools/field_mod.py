@@ -6,6 +6,9 @@ from .tools.field_tools import *
 
 class Field:
     """Class representing an electromagnetic field."""
+
+    external_field_function = None
+    external_gradient_function = None
     
     def __init__(self, **kwargs ) -> None:
         """
@@ -120,7 +123,18 @@ class Field:
             The permittivity of the medium in which the field propagates.
         """
         self.medium_permittivity = medium_permittivity
-        
+
+    def get_medium_wave_number_nm(self) -> float:
+        """
+        Method to get the wave number of the field in the medium in inverse nanometers (1/nm).
+
+        Returns
+        -------
+        float
+            The wave number in the medium, or in vacuum if no medium permittivity has been set.
+        """
+        medium_permittivity = getattr(self, 'medium_permittivity', 1.0)
+        return self.wave_number_um/1000 * np.sqrt(medium_permittivity)
 
     
 
@@ -162,23 +176,29 @@ class PlaneWaveField(Field):
         self.polarization = np.array(polarization) / np.linalg.norm(np.array(polarization))
         self.direction = np.array(direction) / np.linalg.norm(np.array(direction))
 
-        if hasattr(self, 'medium_permittivity'):
-            wave_number_nm_medium = self.wave_number_um/1000 * np.sqrt(self.medium_permittivity)
-        else:
-            wave_number_nm_medium = self.wave_number_um/1000  # Convert um^-1 to nm^-1
-        
-        self.external_field_function = lambda positions: plane_wave_function(
+
+    def external_field_function(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the electric field at the specified positions, assumed to be in nanometers (nm).
+        The wave number is computed from the current medium permittivity.
+        """
+        return plane_wave_function(
             direction=self.direction,
             amplitude_vec=self.amplitude * self.polarization,
             positions=positions, 
-            k_magnitude=wave_number_nm_medium
+            k_magnitude=self.get_medium_wave_number_nm()
         )
 
-        self.external_gradient_function = lambda positions: plane_wave_gradient(
+    def external_gradient_function(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the electric field gradient at the specified positions, assumed to be in nanometers (nm).
+        The wave number is computed from the current medium permittivity.
+        """
+        return plane_wave_gradient(
             direction=self.direction,
             amplitude_vec=self.amplitude * self.polarization,
             positions=positions, 
-            k_magnitude=wave_number_nm_medium
+            k_magnitude=self.get_medium_wave_number_nm()
         )
     
     def get_direction(self) -> np.ndarray:
@@ -252,22 +272,28 @@ class StandingWaveField(Field):
         self.polarization = np.array(polarization) / np.linalg.norm(np.array(polarization))
         self.direction = np.array(direction) / np.linalg.norm(np.array(direction))
 
-        if hasattr(self, 'medium_permittivity'):
-            wave_number_nm_medium = self.wave_number_um/1000 * np.sqrt(self.medium_permittivity)
-        else:
-            wave_number_nm_medium = self.wave_number_um/1000  # Convert um^-1 to nm^-1
-        
-        self.external_field_function = lambda positions: standing_wave_function(
+
+    def external_field_function(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the electric field at the specified positions, assumed to be in nanometers (nm).
+        The wave number is computed from the current medium permittivity.
+        """
+        return standing_wave_function(
             direction=self.direction,
             amplitude_vec=self.amplitude * self.polarization,
             positions=positions, 
-            k_magnitude=wave_number_nm_medium
+            k_magnitude=self.get_medium_wave_number_nm()
         )
 
-        self.external_gradient_function = lambda positions: standing_wave_gradient(
+    def external_gradient_function(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the electric field gradient at the specified positions, assumed to be in nanometers (nm).
+        The wave number is computed from the current medium permittivity.
+        """
+        return standing_wave_gradient(
             direction=self.direction,
             amplitude_vec=self.amplitude * self.polarization,
             positions=positions, 
-            k_magnitude=wave_number_nm_medium
+            k_magnitude=self.get_medium_wave_number_nm()
         )
 
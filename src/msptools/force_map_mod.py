@@ -0,0 +1,131 @@
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from .particle_types import ParticleType
+from .GreenTensor_Electric import _pair_green_blocks, _pair_green_derivative_blocks
+from .MSP import MSP_gradient_from_arrays, _MSP_matrix
+from .dipole_moments import calculate_dipole_moments_linear, apply_polarizability
+from .OFO_calculations import calculate_forces_eppgrad
+from .tools.unit_calcs import get_multiplier_nanometers
+
+
+def probe_force_map(system,
+                    probe_type: ParticleType,
+                    grid: np.ndarray,
+                    batch_size: int = 1024) -> tuple:
+    """
+    Compute the optical force and potential energy of a probe particle at every point of a grid around the
+    fixed particles of a System.
+
+    Parameters
+    ----------
+    system :
+        The System whose particles form the fixed structure. Its field and medium are used.
+    probe_type :
+        The type of the probe particle. Its polarizability is computed for the field and medium of the system.
+    grid :
+        Probe positions of shape (..., 3), in the positions unit of the system, e.g. from np.meshgrid stacked
+        on the last axis. The points must not coincide with the fixed particles.
+    batch_size :
+        Number of grid points solved together. Default is 1024.
+
+    Returns
+    -------
+    tuple
+        The forces on the probe, of shape grid.shape, and its potential energy, of shape grid.shape[:-1].
+
+    Notes
+    -----
+    The MSP matrix A = I - k^2 G alpha of the N fixed particles is LU-factorized once. With the probe at r,
+    the system gains three rows and columns, and the probe field is the solution of the 3 x 3 Schur complement
+    S = I - C A^-1 B, where B and C are the couplings between the probe and the structure. Each grid point then
+    costs a solve with three right-hand sides, O(N^2), instead of a new O(N^3) solve.
+
+    The potential energy is the gradient-force potential U = -(ε/4) Re(E_p* · alpha_p E_p) of the probe in the
+    total field at its position, which is -(ε/4) Re(alpha_p) |E_p|^2 for an isotropic probe. The scattering
+    force is not conservative and is not included in U.
+    """
+
+    grid = np.asarray(grid, dtype=np.float64)
+    if grid.shape[-1] != 3:
+        raise ValueError("The grid must have shape (..., 3).")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be a positive integer, got {batch_size}.")
+
+    probe_points = grid.reshape(-1, 3) * get_multiplier_nanometers(system.positions_unit)
+    probe_type.compute_polarizability(frequency=system.field.get_frequency(), medium_permittivity=system.medium_permittivity)
+    probe_polarizability = probe_type.polarizability
+    structure = _FixedStructure(system)
+
+    forces = np.empty_like(probe_points)
+    energy = np.empty(probe_points.shape[0])
+    for start in range(0, probe_points.shape[0], batch_size):
+        stop = min(start + batch_size, probe_points.shape[0])
+        forces[start:stop], energy[start:stop] = structure.probe(probe_points[start:stop], probe_polarizability)
+
+    return forces.reshape(grid.shape), energy.reshape(grid.shape[:-1])
+
+class _FixedStructure:
+    """LU-factorized MSP of the fixed particles of a System, solved with one added probe at a time."""
+
+    def __init__(self, system) -> None:
+        self.field = system.field
+        self.medium_permittivity = system.medium_permittivity
+        self.wave_number = system.medium_wave_number_nm
+        self.positions = system.particles.get_positions().reshape(-1, 3)
+        num_particles = self.positions.shape[0]
+        self.num_particles = num_particles
+        if num_particles == 0:
+            return
+        self.polarizabilities = system.particles.get_polarizabilities()
+        self.factorization = lu_factor(_MSP_matrix(self.polarizabilities, self.wave_number, system.get_green_tensor()))
+        external_field = self.field.get_external_field_in_positions(self.positions)
+        self.structure_field = lu_solve(self.factorization, external_field.reshape(-1))
+
+    def probe(self, probe_points: np.ndarray, probe_polarizability) -> tuple:
+        """
+        Force and potential energy of the probe at each of the P points of shape (P, 3).
+        """
+
+        num_points = probe_points.shape[0]
+        num_particles = self.num_particles
+        k2 = self.wave_number**2
+        probe_external_field = self.field.get_external_field_in_positions(probe_points).reshape(num_points, 3)
+        probe_external_gradient = self.field.get_external_gradient_in_positions(probe_points).reshape(num_points, 3, 3)
+
+        if num_particles == 0:
+            probe_field = probe_external_field
+            probe_gradient = probe_external_gradient
+        else:
+            R_vec = probe_points[:, None, :] - self.positions[None, :, :]
+            green_blocks = _pair_green_blocks(R_vec, self.wave_number)
+
+            # Coupling of the probe to the structure, B_j = -k^2 G(x_j - r) alpha_p, stacked as (P, 3 N, 3).
+            # The pair blocks are even in the separation, so G(x_j - r) = G(r - x_j).
+            if np.ndim(probe_polarizability) == 2:
+                probe_coupling = -k2 * green_blocks @ np.asarray(probe_polarizability)
+            else:
+                probe_coupling = -k2 * green_blocks * probe_polarizability
+            right_hand_sides = probe_coupling.reshape(num_points, 3 * num_particles, 3).transpose(1, 0, 2).reshape(3 * num_particles, 3 * num_points)
+            solved_columns = lu_solve(self.factorization, right_hand_sides).reshape(3 * num_particles, num_points, 3).transpose(1, 0, 2)
+
+            # Coupling of the structure to the probe, C_j = -k^2 G(r - x_j) alpha_j, stacked as (P, 3, 3 N).
+            structure_coupling = -k2 * apply_polarizability(green_blocks[:, None], self.polarizabilities)[:, 0]
+            structure_coupling = structure_coupling.transpose(0, 2, 1, 3).reshape(num_points, 3, 3 * num_particles)
+
+            schur_complement = np.eye(3) - structure_coupling @ solved_columns
+            probe_rhs = probe_external_field - structure_coupling @ self.structure_field
+            probe_field = np.linalg.solve(schur_complement, probe_rhs[..., None])[..., 0]
+
+            structure_field = self.structure_field[None, :] - np.einsum('pkn,pn->pk', solved_columns, probe_field)
+            structure_dipoles = calculate_dipole_moments_linear(self.polarizabilities, structure_field.reshape(num_points, num_particles, 3))
+
+            green_tensor_derivative = _pair_green_derivative_blocks(R_vec, self.wave_number)[:, None]
+            probe_gradient = MSP_gradient_from_arrays(dipole_moments=structure_dipoles,
+                                                      external_gradient=probe_external_gradient[:, None],
+                                                      wave_number=self.wave_number,
+                                                      green_tensor_derivative=green_tensor_derivative)[:, 0]
+
+        probe_dipoles = calculate_dipole_moments_linear(probe_polarizability, probe_field)
+        forces = calculate_forces_eppgrad(self.medium_permittivity, probe_dipoles, probe_gradient)
+        energy = -(self.medium_permittivity / 4) * np.real(np.sum(np.conj(probe_field) * probe_dipoles, axis=-1))
+        return forces, energy
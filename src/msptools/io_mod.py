@@ -0,0 +1,443 @@
+import os
+import zipfile
+import numpy as np
+from typing import List
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    h5py = None
+    H5PY_AVAILABLE = False
+
+HDF5_EXTENSIONS = ('.h5', '.hdf5')
+
+
+def _file_format(filename: str) -> str:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in ('.npy', '.npz'):
+        return extension[1:]
+    if extension in HDF5_EXTENSIONS:
+        if not H5PY_AVAILABLE:
+            raise ValueError("HDF5 files require h5py, which is not installed.")
+        return 'hdf5'
+    raise ValueError(f"Unknown configuration file extension '{extension}', expected .npy, .npz, .h5 or .hdf5.")
+
+def save_configuration(filename: str,
+                       positions: np.ndarray,
+                       type_indices: np.ndarray | List[int] | None = None,
+                       positions_unit: str = "nm",
+                       type_names: List[str] | None = None,
+                       polarizabilities: np.ndarray | None = None) -> None:
+    """
+    Save a particle configuration.
+
+    Parameters
+    ----------
+    filename :
+        The file name. The extension selects the format: '.npy' stores the positions only, '.npz' and HDF5
+        ('.h5', '.hdf5') also store the type indices, the positions unit and the type names.
+    positions :
+        The positions of shape (N, 3).
+    type_indices :
+        The index of the type of each particle. Default is 0 for every particle.
+    positions_unit :
+        The unit of the positions. Default is 'nm'.
+    type_names :
+        Optional names of the types, stored for reference.
+    polarizabilities :
+        Optional polarizabilities of the particles, of shape (N,) or (N, 3, 3), stored in '.npz' and HDF5 files,
+        e.g. for particles without a type.
+
+    Notes
+    -----
+    The arrays are stored uncompressed and contiguous, so that load_configuration can memory-map them.
+    """
+
+    file_format = _file_format(filename)
+    positions = np.ascontiguousarray(positions, dtype=np.float64)
+    if positions.ndim != 2:
+        raise ValueError("Positions must have shape (N, 3).")
+    if type_indices is None:
+        type_indices = np.zeros(positions.shape[0], dtype=np.int64)
+    type_indices = np.ascontiguousarray(type_indices, dtype=np.int64).reshape(-1)
+    if type_indices.shape[0] != positions.shape[0]:
+        raise ValueError("There must be one type index per particle.")
+    type_names = np.array([] if type_names is None else list(type_names), dtype=str)
+    arrays = {"positions": positions, "type_indices": type_indices}
+    if polarizabilities is not None:
+        arrays["polarizabilities"] = np.ascontiguousarray(polarizabilities, dtype=np.complex128)
+        if arrays["polarizabilities"].shape[0] != positions.shape[0]:
+            raise ValueError("There must be one polarizability per particle.")
+
+    if file_format == 'npy':
+        np.save(filename, positions)
+    elif file_format == 'npz':
+        with open(filename, 'wb') as file:
+            np.savez(file, **arrays, positions_unit=np.array(positions_unit), type_names=type_names)
+    else:
+        with h5py.File(filename, 'w') as file:
+            for name, array in arrays.items():
+                file.create_dataset(name, data=array)
+            file.attrs['positions_unit'] = positions_unit
+            file.attrs['type_names'] = [str(name) for name in type_names]
+
+def load_configuration(filename: str, positions_unit: str = "nm", mmap: bool = True) -> dict:
+    """
+    Load a particle configuration saved with save_configuration, or a plain .npy array of positions.
+
+    Parameters
+    ----------
+    filename :
+        The file name, with extension '.npy', '.npz', '.h5' or '.hdf5'.
+    positions_unit :
+        The unit of the positions of '.npy' files, which do not store it. Default is 'nm'.
+    mmap :
+        Memory-map the positions and type indices instead of reading them. Default is True.
+
+    Returns
+    -------
+    dict
+        The positions of shape (N, 3), the type indices of shape (N,), the positions unit, the type names and
+        the polarizabilities, None if they were not saved. The arrays are read-only memory maps when mmap is True and the data is stored uncompressed.
+
+    Notes
+    -----
+    The members of uncompressed '.npz' archives and the contiguous datasets of HDF5 files are mapped at
+    their offset in the file. Compressed or chunked data cannot be mapped and is read instead.
+    """
+
+    file_format = _file_format(filename)
+    if file_format == 'npy':
+        positions = np.load(filename, mmap_mode='r' if mmap else None)
+        return {"positions": positions,
+                "type_indices": np.zeros(positions.shape[0], dtype=np.int64),
+                "positions_unit": positions_unit,
+                "type_names": [],
+                "polarizabilities": None}
+
+    if file_format == 'npz':
+        load = _map_npz_member if mmap else _read_npz_member
+        with np.load(filename) as archive:
+            has_polarizabilities = 'polarizabilities' in archive.files
+        return {"positions": load(filename, 'positions'),
+                "type_indices": load(filename, 'type_indices'),
+                "positions_unit": str(_read_npz_member(filename, 'positions_unit')),
+                "type_names": [str(name) for name in _read_npz_member(filename, 'type_names')],
+                "polarizabilities": load(filename, 'polarizabilities') if has_polarizabilities else None}
+
+    load = _map_hdf5_dataset if mmap else _read_hdf5_dataset
+    with h5py.File(filename, 'r') as file:
+        unit = file.attrs['positions_unit']
+        names = list(file.attrs.get('type_names', []))
+        has_polarizabilities = 'polarizabilities' in file
+    return {"positions": load(filename, 'positions'),
+            "type_indices": load(filename, 'type_indices'),
+            "positions_unit": unit.decode() if isinstance(unit, bytes) else str(unit),
+            "type_names": [name.decode() if isinstance(name, bytes) else str(name) for name in names],
+            "polarizabilities": load(filename, 'polarizabilities') if has_polarizabilities else None}
+
+def _read_npz_member(filename: str, name: str) -> np.ndarray:
+    with np.load(filename) as archive:
+        return archive[name]
+
+def _map_npz_member(filename: str, name: str) -> np.ndarray:
+    """
+    Memory-map an array stored uncompressed in an .npz archive, or read it if it is compressed.
+    """
+
+    with zipfile.ZipFile(filename) as archive:
+        info = archive.getinfo(name + '.npy')
+    if info.compress_type != zipfile.ZIP_STORED:
+        return _read_npz_member(filename, name)
+
+    with open(filename, 'rb') as file:
+        # The local file header has 30 bytes, followed by the file name and an extra field of variable lengths.
+        file.seek(info.header_offset + 26)
+        name_length, extra_length = np.frombuffer(file.read(4), dtype='<u2')
+        file.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+        version = np.lib.format.read_magic(file)
+        if version not in [(1, 0), (2, 0)]:
+            return _read_npz_member(filename, name)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(file)
+        offset = file.tell()
+    if dtype.hasobject or 0 in shape:
+        return _read_npz_member(filename, name)
+    return np.memmap(filename, dtype=dtype, mode='r', shape=shape, order='F' if fortran_order else 'C', offset=offset)
+
+def _read_hdf5_dataset(filename: str, name: str) -> np.ndarray:
+    with h5py.File(filename, 'r') as file:
+        return file[name][()]
+
+def _map_hdf5_dataset(filename: str, name: str) -> np.ndarray:
+    """
+    Memory-map a contiguous HDF5 dataset, or read it if it is chunked or compressed.
+    """
+
+    with h5py.File(filename, 'r') as file:
+        dataset = file[name]
+        offset = dataset.id.get_offset()
+        if dataset.chunks is not None or offset is None or dataset.size == 0:
+            return dataset[()]
+        shape, dtype = dataset.shape, dataset.dtype
+    return np.memmap(filename, dtype=dtype, mode='r', shape=shape, offset=offset)
+
+
+class ResultsWriter:
+    """Buffered writer of frames of results, e.g. positions, fields, dipoles and forces, to chunked files."""
+
+    def __init__(self, path: str, chunk_size: int = 100, mode: str = 'w') -> None:
+        """
+        Open a results container.
+
+        Parameters
+        ----------
+        path :
+            A file with extension '.h5' or '.hdf5' for an HDF5 file with one dataset per result, or a directory
+            for one '.npz' shard per chunk.
+        chunk_size :
+            The number of frames buffered in memory before they are written. Default is 100.
+        mode :
+            'w' to replace the existing results, 'a' to append to them. Default is 'w'.
+
+        Notes
+        -----
+        Each frame is a dict of arrays, and every frame must have the same names, shapes and dtypes. Frames
+        are copied into preallocated buffers, so memory stays bounded by chunk_size frames. Shards are written
+        to a temporary file and renamed, and HDF5 files are flushed after each chunk, so a crash loses at
+        most the buffered frames. The writer can be passed as the writer of Integrator.run.
+        """
+
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}.")
+        if mode not in ('w', 'a'):
+            raise ValueError(f"mode must be 'w' or 'a', got '{mode}'.")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.hdf5 = os.path.splitext(path)[1].lower() in HDF5_EXTENSIONS
+        self._buffers = None
+        self._num_buffered = 0
+        self.num_frames = 0
+
+        if self.hdf5:
+            if not H5PY_AVAILABLE:
+                raise ValueError("HDF5 files require h5py, which is not installed.")
+            self._file = h5py.File(path, mode)
+            if mode == 'a' and len(self._file.keys()) > 0:
+                self.num_frames = min(dataset.shape[0] for dataset in self._file.values())
+        else:
+            os.makedirs(path, exist_ok=True)
+            shards = _shard_files(path)
+            if mode == 'w':
+                for shard in shards:
+                    os.remove(shard)
+                shards = []
+            self._num_shards = len(shards)
+            if shards:
+                self.num_frames = len(ResultsReader(path))
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __call__(self, chunk: dict) -> None:
+        self.write_chunk(chunk)
+
+    def write_frame(self, frame: dict) -> None:
+        """
+        Append one frame.
+
+        Parameters
+        ----------
+        frame :
+            Dict of the arrays of the frame, e.g. {"positions": ..., "forces": ...}.
+        """
+
+        self.write_chunk({name: np.asarray(value)[None] for name, value in frame.items()})
+
+    def write_chunk(self, chunk: dict) -> None:
+        """
+        Append several frames.
+
+        Parameters
+        ----------
+        chunk :
+            Dict of arrays with the frames along the first axis, as passed by Integrator.run.
+        """
+
+        chunk = {name: np.asarray(value) for name, value in chunk.items()}
+        if self._buffers is None:
+            self._buffers = {name: np.empty((self.chunk_size,) + value.shape[1:], dtype=value.dtype) for name, value in chunk.items()}
+        if set(chunk) != set(self._buffers):
+            raise ValueError(f"Frames must contain the results {sorted(self._buffers)}, got {sorted(chunk)}.")
+        num_frames = {value.shape[0] for value in chunk.values()}
+        if len(num_frames) != 1:
+            raise ValueError("All the results of a chunk must have the same number of frames.")
+
+        start, stop = 0, num_frames.pop()
+        while start < stop:
+            count = min(stop - start, self.chunk_size - self._num_buffered)
+            for name, value in chunk.items():
+                self._buffers[name][self._num_buffered:self._num_buffered + count] = value[start:start + count]
+            self._num_buffered += count
+            start += count
+            if self._num_buffered == self.chunk_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered frames.
+        """
+
+        if self._num_buffered == 0:
+            return
+        arrays = {name: buffer[:self._num_buffered] for name, buffer in self._buffers.items()}
+        if self.hdf5:
+            for name, value in arrays.items():
+                if name not in self._file:
+                    self._file.create_dataset(name, shape=(0,) + value.shape[1:], maxshape=(None,) + value.shape[1:],
+                                              dtype=value.dtype, chunks=(self.chunk_size,) + value.shape[1:])
+                dataset = self._file[name]
+                if dataset.shape[1:] != value.shape[1:]:
+                    raise ValueError(f"Result '{name}' has shape {value.shape[1:]} per frame, the file has {dataset.shape[1:]}.")
+                dataset.resize(self.num_frames + value.shape[0], axis=0)
+                dataset[self.num_frames:] = value
+            self._file.flush()
+        else:
+            shard = os.path.join(self.path, f"chunk_{self._num_shards:06d}.npz")
+            temporary = shard + ".tmp"
+            with open(temporary, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temporary, shard)
+            self._num_shards += 1
+        self.num_frames += self._num_buffered
+        self._num_buffered = 0
+
+    def close(self) -> None:
+        """
+        Write the buffered frames and close the container.
+        """
+
+        self.flush()
+        if self.hdf5 and self._file.id.valid:
+            self._file.close()
+
+
+class ResultsReader:
+    """Lazy reader of the frames written by a ResultsWriter."""
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the results written by a ResultsWriter to an HDF5 file or a directory of shards.
+        The data is only read, or memory-mapped, when frames are accessed.
+        """
+
+        self.path = path
+        self.hdf5 = os.path.splitext(path)[1].lower() in HDF5_EXTENSIONS
+        if self.hdf5:
+            if not H5PY_AVAILABLE:
+                raise ValueError("HDF5 files require h5py, which is not installed.")
+            self._file = h5py.File(path, 'r')
+            self.names = list(self._file.keys())
+            self._chunk_bounds = []
+            if self.names:
+                length = min(self._file[name].shape[0] for name in self.names)
+                step = self._file[self.names[0]].chunks[0]
+                self._chunk_bounds = [(start, min(start + step, length)) for start in range(0, length, step)]
+        else:
+            self._shards = _shard_files(path)
+            self.names = []
+            self._chunk_bounds = []
+            start = 0
+            for shard in self._shards:
+                with zipfile.ZipFile(shard) as archive:
+                    names = [name[:-4] for name in archive.namelist()]
+                self.names = self.names or names
+                length = _map_npz_member(shard, names[0]).shape[0]
+                self._chunk_bounds.append((start, start + length))
+                start += length
+        self.num_frames = self._chunk_bounds[-1][1] if self._chunk_bounds else 0
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __enter__(self) -> "ResultsReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.hdf5 and self._file.id.valid:
+            self._file.close()
+
+    def _chunk(self, index: int, names: List[str]) -> dict:
+        if self.hdf5:
+            start, stop = self._chunk_bounds[index]
+            return {name: self._file[name][start:stop] for name in names}
+        return {name: _map_npz_member(self._shards[index], name) for name in names}
+
+    def iter_chunks(self, names: List[str] | None = None):
+        """
+        Iterate over the chunks of frames, reading one chunk at a time.
+
+        Parameters
+        ----------
+        names :
+            The results to read. Default is all of them.
+
+        Yields
+        ------
+        dict
+            The arrays of the chunk, with the frames along the first axis.
+        """
+
+        names = self.names if names is None else names
+        for index in range(len(self._chunk_bounds)):
+            yield self._chunk(index, names)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            for frame in range(next(iter(chunk.values())).shape[0]):
+                yield {name: value[frame] for name, value in chunk.items()}
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self.num_frames
+        if not 0 <= index < self.num_frames:
+            raise IndexError(f"Frame {index} out of range for {self.num_frames} frames.")
+        chunk = int(np.searchsorted([stop for _, stop in self._chunk_bounds], index, side='right'))
+        offset = index - self._chunk_bounds[chunk][0]
+        return {name: value[offset] for name, value in self._chunk(chunk, self.names).items()}
+
+    def read(self, name: str, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """
+        Read one result for a range of frames.
+
+        Parameters
+        ----------
+        name :
+            The name of the result, e.g. 'forces'.
+        start, stop :
+            The range of frames. Default is all the frames.
+
+        Returns
+        -------
+        np.ndarray
+            The result with the frames along the first axis.
+        """
+
+        stop = self.num_frames if stop is None else min(stop, self.num_frames)
+        if self.hdf5:
+            return self._file[name][start:stop]
+        parts = [self._chunk(index, [name])[name][max(start - first, 0):stop - first]
+                 for index, (first, last) in enumerate(self._chunk_bounds) if last > start and first < stop]
+        if not parts:
+            return np.empty((0,))
+        return np.concatenate(parts)
+
+def _shard_files(path: str) -> List[str]:
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith("chunk_") and name.endswith(".npz"))
@@ -0,0 +1,238 @@
+import copy
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import List
+from .particle_types import ParticleType
+from .field_mod import PlaneWaveField
+from .tools.unit_calcs import get_multiplier_nanometers
+
+
+class PairForceTable:
+    """Tabulated two-body optical binding forces of identical particles in a plane wave."""
+
+    def __init__(self,
+                 particle_type: ParticleType,
+                 field: PlaneWaveField,
+                 max_distance: float,
+                 min_distance: float,
+                 medium_permittivity: float = 1.0,
+                 num_distances: int = 128,
+                 num_angles: int = 8,
+                 distance_unit: str = "nm",
+                 batch_size: int = 20000) -> None:
+        """
+        Tabulate the pair interaction force on a cylindrical (radial distance, axial distance, angle) grid.
+
+        Parameters
+        ----------
+        particle_type :
+            The type of the particles.
+        field :
+            The plane wave. It is copied, so later changes of the field do not affect the table.
+        max_distance :
+            The cutoff distance. Pairs farther apart do not interact.
+        min_distance :
+            The smallest tabulated distance. Closer pairs use the forces at min_distance in the same direction.
+        medium_permittivity :
+            The permittivity of the medium. Default is 1.
+        num_distances :
+            Number of radial distances of the grid over [0, max_distance]. The axial distances over
+            [-max_distance, max_distance] have the same spacing. Default is 128.
+        num_angles :
+            Number of angles of the grid over [0, 2π), measured from the polarization around the propagation
+            direction. At least 7. Default is 8.
+        distance_unit :
+            The unit of the distances. Default is 'nm'.
+        batch_size :
+            Number of pair configurations solved together. Default is 20000.
+
+        Notes
+        -----
+        The separation d of a pair is described by its distance from the propagation axis, its component along
+        the propagation and its angle from the polarization. Translating both particles along the propagation
+        only changes the phase of the field on both of them, which leaves the forces unchanged, but the phase
+        difference between the particles does change them, so the table spans the full 3D separation. The
+        forces are quadratic in the field, so rotating the pair around the propagation direction only produces
+        angular harmonics up to the third order, and the trigonometric interpolation over 7 or more angles is
+        exact. The forces oscillate on the scale of the wavelength in both distances, which are interpolated
+        linearly, so the spacing max_distance / (num_distances - 1) should be a small fraction of the wavelength
+        in the medium. The table has
+        num_distances * (2 num_distances - 1) * num_angles entries. It stores the interaction force, i.e. the
+        pair force minus the single-particle force, on the particle at separation d from the other, which is
+        computed with ForceCalculator.compute_forces_batched.
+        """
+
+        from . import System, ForceCalculator
+
+        if not isinstance(field, PlaneWaveField):
+            raise ValueError("Pair force tables require a PlaneWaveField.")
+        if not 0 < min_distance < max_distance:
+            raise ValueError("The distances must satisfy 0 < min_distance < max_distance.")
+        if num_distances < 2 or num_angles < 7:
+            raise ValueError("The table needs at least 2 distances and 7 angles.")
+
+        self.system = System(particle_types=particle_type, field=copy.deepcopy(field), positions_unit="nm", medium_permittivity=medium_permittivity)
+        self.polarizability = particle_type.polarizability
+        self.amplitude = self.system._field_amplitude()
+
+        multiplier = get_multiplier_nanometers(distance_unit)
+        self.distance_unit = distance_unit
+        self.min_distance = min_distance * multiplier
+        self.max_distance = max_distance * multiplier
+        self.radial_distances = np.linspace(0.0, self.max_distance, num_distances)
+        self.axial_distances = np.linspace(-self.max_distance, self.max_distance, 2 * num_distances - 1)
+        self.angles = 2 * np.pi * np.arange(num_angles) / num_angles
+
+        direction = np.real(self.system.field.direction)
+        self.direction = direction / np.linalg.norm(direction)
+        axis_u = np.real(self.system.field.polarization) - np.dot(np.real(self.system.field.polarization), direction) * direction
+        if np.linalg.norm(axis_u) < 1e-12:
+            axis_u = np.imag(self.system.field.polarization) - np.dot(np.imag(self.system.field.polarization), direction) * direction
+        self.axis_u = axis_u / np.linalg.norm(axis_u)
+        self.axis_v = np.cross(self.direction, self.axis_u)
+
+        self.system.add_particles([[0.0, 0.0, 0.0]])
+        self.single_force = ForceCalculator(self.system).compute_forces()[0]
+
+        separations = self._separations(self.radial_distances[:, None, None], self.axial_distances[None, :, None], self.angles[None, None, :]).reshape(-1, 3)
+        separations = self._clamp_to_min_distance(separations)
+        self.system.add_particles(separations[:1])
+        calculator = ForceCalculator(self.system)
+        pair_forces = np.empty_like(separations)
+        for start in range(0, separations.shape[0], batch_size):
+            chunk = separations[start:start + batch_size]
+            configurations = np.stack([np.zeros_like(chunk), chunk], axis=1)
+            pair_forces[start:start + batch_size] = calculator.compute_forces_batched(configurations)[:, 1]
+        self.table = (pair_forces - self.single_force).reshape(num_distances, 2 * num_distances - 1, num_angles, 3)
+        # Fourier coefficients over the angle, weighted so that summing the non-negative harmonics gives the forces.
+        self.coefficients = np.fft.rfft(self.table, axis=2) / num_angles
+        self.coefficients[:, :, 1:(num_angles + 1) // 2] *= 2
+
+    def _separations(self, radial_distances: np.ndarray, axial_distances: np.ndarray, angles: np.ndarray) -> np.ndarray:
+        in_plane = np.cos(angles)[..., None] * self.axis_u + np.sin(angles)[..., None] * self.axis_v
+        return radial_distances[..., None] * in_plane + axial_distances[..., None] * self.direction
+
+    def _clamp_to_min_distance(self, separations: np.ndarray) -> np.ndarray:
+        distances = np.linalg.norm(separations, axis=-1, keepdims=True)
+        directions = np.where(distances > 0, separations / np.where(distances > 0, distances, 1.0), self.axis_u)
+        return np.where(distances < self.min_distance, self.min_distance * directions, separations)
+
+    def interaction_forces(self, separations: np.ndarray) -> np.ndarray:
+        """
+        Interpolate the interaction force on a particle at separation d from another particle.
+
+        Parameters
+        ----------
+        separations :
+            Separation vectors of shape (..., 3), in nanometers.
+
+        Returns
+        -------
+        np.ndarray
+            The interaction forces of shape (..., 3), linearly interpolated in radial and axial distance and
+            trigonometrically in angle. They are zero beyond the cutoff distance.
+        """
+
+        separations = self._clamp_to_min_distance(np.asarray(separations, dtype=np.float64))
+        in_plane_u = separations @ self.axis_u
+        in_plane_v = separations @ self.axis_v
+        axial = separations @ self.direction
+        radial = np.hypot(in_plane_u, in_plane_v)
+        angles = np.arctan2(in_plane_v, in_plane_u)
+
+        num_radial, num_axial = self.coefficients.shape[:2]
+        spacing = self.radial_distances[1] - self.radial_distances[0]
+        radial_position = np.clip(radial / spacing, 0, num_radial - 1)
+        radial_index = np.minimum(radial_position.astype(np.int64), num_radial - 2)
+        radial_weight = (radial_position - radial_index)[..., None, None]
+
+        axial_position = np.clip((axial - self.axial_distances[0]) / spacing, 0, num_axial - 1)
+        axial_index = np.minimum(axial_position.astype(np.int64), num_axial - 2)
+        axial_weight = (axial_position - axial_index)[..., None, None]
+
+        coefficients = np.zeros(separations.shape[:-1] + self.coefficients.shape[2:], dtype=np.complex128)
+        for radial_corner, radial_factor in ((radial_index, 1 - radial_weight), (radial_index + 1, radial_weight)):
+            for axial_corner, axial_factor in ((axial_index, 1 - axial_weight), (axial_index + 1, axial_weight)):
+                coefficients += radial_factor * axial_factor * self.coefficients[radial_corner, axial_corner]
+        harmonics = np.exp(1j * angles[..., None] * np.arange(self.coefficients.shape[2]))
+        forces = np.real(np.einsum('...m,...mi->...i', harmonics, coefficients))
+        forces[np.hypot(radial, axial) > self.max_distance] = 0.0
+        return forces
+
+    def compute_forces(self, positions: np.ndarray, amplitude: float | complex | None = None, pairs: np.ndarray | None = None) -> np.ndarray:
+        """
+        Sum the single-particle force and the tabulated pair interactions of every particle.
+
+        Parameters
+        ----------
+        positions :
+            Positions of shape (N, 3), in nanometers.
+        amplitude :
+            The amplitude of the field. The forces are rescaled by |amplitude|^2 relative to the table. Default is the table amplitude.
+        pairs :
+            The pairs (i, j) of shape (P, 2) within the cutoff distance, e.g. from Particles.query_pairs. Default
+            is a neighbour list built from the positions.
+
+        Returns
+        -------
+        np.ndarray
+            The approximate forces of shape (N, 3).
+
+        Notes
+        -----
+        The interacting pairs are found with a k-d tree neighbour list within the cutoff distance, so the cost
+        scales with the number of particles times the number of neighbours. Pairs beyond the cutoff are ignored.
+        """
+
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        forces = np.broadcast_to(self.single_force, positions.shape).copy()
+        if pairs is None:
+            pairs = cKDTree(positions).query_pairs(self.max_distance, output_type='ndarray')
+        if pairs.shape[0] > 0:
+            separations = positions[pairs[:, 1]] - positions[pairs[:, 0]]
+            np.add.at(forces, pairs[:, 1], self.interaction_forces(separations))
+            np.add.at(forces, pairs[:, 0], self.interaction_forces(-separations))
+        if amplitude is not None:
+            forces *= np.abs(amplitude / self.amplitude)**2
+        return forces
+
+
+class PairForceCalculator:
+    """Approximate optical forces of a System summed from a PairForceTable."""
+
+    def __init__(self, system, table: PairForceTable) -> None:
+        """
+        Initialize a PairForceCalculator by specifying the System and the table of its pair interactions.
+
+        The field of the system must match the field of the table up to its amplitude, and all the particles
+        must have the polarizability of the table. It can replace ForceCalculator in the integrators.
+        """
+
+        if system._field_key() != table.system._field_key():
+            raise ValueError("The field and medium of the system must match the ones of the pair force table.")
+        self.system = system
+        self.table = table
+
+    def compute_forces(self, indices: np.ndarray | List[int] | None = None) -> np.ndarray:
+        """
+        Compute the approximate optical forces on the particles of the System.
+
+        Parameters
+        ----------
+        indices :
+            Indices of the particles on which the forces are returned. Default is all the particles.
+
+        Returns
+        -------
+        np.ndarray
+            The forces, of shape (N, 3) or (len(indices), 3).
+        """
+
+        if not np.allclose(self.system.particles.polarizabilities, self.table.polarizability):
+            raise ValueError("All the particles must have the polarizability of the pair force table.")
+        particles = self.system.particles
+        forces = self.table.compute_forces(particles.get_positions(), amplitude=self.system._field_amplitude(),
+                                           pairs=particles.query_pairs(self.table.max_distance))
+        if indices is not None:
+            forces = forces[np.asarray(indices, dtype=np.int64).reshape(-1)]
+        return forces
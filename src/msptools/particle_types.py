@@ -1,6 +1,7 @@
 from .polarizability_mod import *
 from .tools.unit_calcs import *
-from .permittivity import permittivity_ridx
+from .permittivity import material_permittivity
+from .polarizability_table_mod import get_polarizability_table
 from typing import List, Tuple, Self, Callable
 import numpy as np
 
@@ -11,20 +12,92 @@ class ParticleType:
         """Compute the polarizability of the particle type at a given frequency."""
         raise NotImplementedError("This method should be implemented by subclasses.")
 
+    def get_bounding_radius(self) -> float:
+        """Radius in nanometers of the smallest sphere containing the particle, 0 for point particles."""
+        return 0.0
+
 class SphereType(ParticleType):
     """Class representing spherical particles."""
 
-    def __init__(self, material: str, radius: float, radius_unit: str, polarizability: float = None) -> None:
+    def __init__(self, material: str | Callable, radius: float, radius_unit: str, polarizability: float = None, use_table: bool = False) -> None:
+        """
+        Initialize a SphereType. The material is a name of the RefractiveIndex database or a dispersion model, such as a
+        fitted DrudeLorentzModel. If polarizability is given, it is used at every frequency instead of the Mie polarizability.
+        If use_table is True, the Mie polarizability is interpolated from a PolarizabilityTable of the material, radius and
+        medium, which is computed once and shared by every SphereType with the same parameters. Dispersion models without a
+        frequency_range, such as hand-built models, have no band to tabulate and are always evaluated directly.
+        """
         self.radius = radius
         self.radius_unit = radius_unit
         self.material = material
-        if polarizability is not None:
-            self.compute_polarizability = lambda frequency, medium_permittivity: polarizability
+        self.fixed_polarizability = polarizability
+        self.use_table = use_table
 
     def compute_polarizability(self, frequency: float, medium_permittivity: float):
-        self.polarizability = Mie_electric_dipole_polarizability(radius=self.radius,
-                                  medium_permittivity=medium_permittivity,
-                                  particle_permittivity=permittivity_ridx(frequency, self.material),
-                                  wave_number=frequency_to_wavenumber_nm(frequency))
+        radius_nm = self.radius * get_multiplier_nanometers(self.radius_unit)
+        if self.fixed_polarizability is not None:
+            self.polarizability = self.fixed_polarizability
+            return self.polarizability
+        if self.use_table and not (callable(self.material) and getattr(self.material, "frequency_range", None) is None):
+            table = get_polarizability_table(self.material, radius_nm, medium_permittivity)
+            if table.contains(frequency):
+                self.polarizability = complex(table(frequency))
+                return self.polarizability
+        self.polarizability = Mie_electric_dipole_polarizability(radius=radius_nm,
+                                                                 medium_permittivity=medium_permittivity,
+                                                                 particle_permittivity=material_permittivity(frequency, self.material),
+                                                                 wave_number=frequency_to_wavenumber_nm(frequency))
+        return self.polarizability
+
+    def get_bounding_radius(self) -> float:
+        return self.radius * get_multiplier_nanometers(self.radius_unit)
     
 
+
+class SpheroidType(ParticleType):
+    """Class representing spheroidal particles, e.g. rods (prolate) or disks (oblate), with a fixed orientation."""
+
+    def __init__(self,
+                 material: str | Callable,
+                 axial_semi_axis: float,
+                 transverse_semi_axis: float,
+                 semi_axes_unit: str,
+                 axis: List[float] | np.ndarray = [0.0, 0.0, 1.0],
+                 polarizability: complex | np.ndarray | None = None) -> None:
+        """
+        Initialize a SpheroidType by specifying its material, its semi-axes and the direction of its symmetry axis.
+        The material is a name of the RefractiveIndex database or a dispersion model, such as a fitted DrudeLorentzModel.
+        If polarizability is given, it is used at every frequency instead of the quasi-static spheroid polarizability.
+        """
+        self.material = material
+        self.axial_semi_axis = axial_semi_axis
+        self.transverse_semi_axis = transverse_semi_axis
+        self.semi_axes_unit = semi_axes_unit
+        self.axis = np.array(axis, dtype=np.float64) / np.linalg.norm(axis)
+        self.fixed_polarizability = polarizability
+
+    def compute_polarizability(self, frequency: float, medium_permittivity: float) -> np.ndarray:
+        """
+        Compute the polarizability tensor of shape (3, 3) of the particle type at a given frequency.
+        """
+        if self.fixed_polarizability is not None:
+            self.polarizability = self.fixed_polarizability
+        else:
+            multiplier = get_multiplier_nanometers(self.semi_axes_unit)
+            axial_polarizability, transverse_polarizability = quasistatic_spheroid_polarizability(
+                axial_semi_axis=self.axial_semi_axis * multiplier,
+                transverse_semi_axis=self.transverse_semi_axis * multiplier,
+                medium_permittivity=medium_permittivity,
+                particle_permittivity=material_permittivity(frequency, self.material),
+                wave_number=frequency_to_wavenumber_nm(frequency))
+            self.polarizability = self.polarizability_tensor(axial_polarizability, transverse_polarizability)
+        return self.polarizability
+
+    def get_bounding_radius(self) -> float:
+        return max(self.axial_semi_axis, self.transverse_semi_axis) * get_multiplier_nanometers(self.semi_axes_unit)
+
+    def polarizability_tensor(self, axial_polarizability: complex, transverse_polarizability: complex) -> np.ndarray:
+        """
+        Build the tensor alpha_t I + (alpha_a - alpha_t) n n^T of a spheroid with symmetry axis n.
+        """
+        return transverse_polarizability * np.eye(3) + (axial_polarizability - transverse_polarizability) * np.outer(self.axis, self.axis)
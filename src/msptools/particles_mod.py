@@ -1,57 +1,190 @@
 from typing import List
 import numpy as np
 from .tools.unit_calcs import get_multiplier_nanometers
+from .dipole_moments import polarizability_array
+from .spatial_mod import SpatialIndex
+from .particle_types import ParticleType
+from scipy.spatial import cKDTree
 
 
 class Particles:
     """Class representing a system of particles."""
 
-    def __init__(self) -> None:
+    def __init__(self, dimensions: int = 3) -> None:
         """
         Initialize a Particles object.
+
+        Parameters
+        ----------
+        dimensions :
+            The number of dimensions of the positions. Default is 3.
+
+        Notes
+        -----
+        The positions and polarizabilities are stored in contiguous arrays whose capacity doubles when they are
+        full, so adding particles one at a time costs amortized O(1) copies. The positions and polarizabilities
+        attributes are read-only views of the first N rows.
+
+        Each particle also stores the index of its type in the list of types of the System, or -1 if it was
+        added with an explicit polarizability and no type.
+        """
+
+        self.dimensions = dimensions
+        self._num_particles = 0
+        self._positions = np.empty((0, dimensions), dtype=np.float64)
+        self._polarizabilities = np.empty(0, dtype=np.complex128)
+        self._type_indices = np.empty(0, dtype=np.int64)
+        self.positions_version = 0
+        self.polarizabilities_version = 0
+        self._spatial_index = None
+        self._spatial_index_version = None
+
+    def __len__(self) -> int:
+        return self._num_particles
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_positions"] = self._positions[:self._num_particles].copy()
+        state["_polarizabilities"] = self._polarizabilities[:self._num_particles].copy()
+        state["_type_indices"] = self._type_indices[:self._num_particles].copy()
+        state["_spatial_index"] = None
+        state["_spatial_index_version"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Read-only view of the positions of shape (N, d)."""
+        return _read_only(self._positions[:self._num_particles])
+
+    @property
+    def polarizabilities(self) -> np.ndarray:
+        """Read-only view of the polarizabilities of shape (N,) or (N, 3, 3)."""
+        return _read_only(self._polarizabilities[:self._num_particles])
+
+    @property
+    def type_indices(self) -> np.ndarray:
+        """Read-only view of the type indices of shape (N,), -1 for particles without a type."""
+        return _read_only(self._type_indices[:self._num_particles])
+
+    def copy(self) -> "Particles":
         """
+        Get an independent copy of the particles, with its own storage and versions.
+        """
+
+        particles = Particles.__new__(Particles)
+        particles.__setstate__(self.__getstate__())
+        return particles
 
-        self.positions = []
-        self.polarizabilities = []
+    def _reserve(self, capacity: int, tensor: bool = False) -> None:
+        """
+        Grow the storage to hold at least capacity particles, doubling it, and promote the polarizabilities to
+        tensors if needed.
+        """
 
+        num_particles = self._num_particles
+        if capacity > self._positions.shape[0]:
+            new_capacity = max(capacity, 2 * self._positions.shape[0], 4)
+            positions = np.empty((new_capacity, self.dimensions), dtype=np.float64)
+            positions[:num_particles] = self._positions[:num_particles]
+            self._positions = positions
+            polarizabilities = np.empty((new_capacity,) + self._polarizabilities.shape[1:], dtype=np.complex128)
+            polarizabilities[:num_particles] = self._polarizabilities[:num_particles]
+            self._polarizabilities = polarizabilities
+            type_indices = np.empty(new_capacity, dtype=np.int64)
+            type_indices[:num_particles] = self._type_indices[:num_particles]
+            self._type_indices = type_indices
+        if tensor and self._polarizabilities.ndim == 1:
+            polarizabilities = np.empty((self._positions.shape[0], self.dimensions, self.dimensions), dtype=np.complex128)
+            polarizabilities[:num_particles] = self._polarizabilities[:num_particles, None, None] * np.eye(self.dimensions)
+            self._polarizabilities = polarizabilities
 
     def add_particles(self,
-                     positions: List[List[float]],
-                     polarizabilities: complex | List[complex]) -> None:
+                     positions: np.ndarray | List[List[float]],
+                     polarizabilities: complex | np.ndarray | List[complex],
+                     type_indices: int | np.ndarray | List[int] = -1) -> None:
         """
         Add particles to the system at specified positions and with specified polarizabilities.
 
         Parameters
         ----------
         positions :
-            The position of the particles to add.
+            The positions of the particles to add, of shape (M, d).
         polarizabilities :
-            The polarizabilities of the particles to add.
-        positions_unit :
-            The unit of the positions provided.
+            The polarizabilities of the particles to add. A scalar or a (3, 3) tensor is shared by all of them,
+            a list or an array of shape (M,) or (M, 3, 3) gives one scalar or tensor per particle. A shared
+            (3, 3) tensor is rejected when M == 3, see polarizability_array.
+        type_indices :
+            The index of the type of the particles, shared by all of them or one per particle. Default is -1,
+            i.e. no type, and the polarizabilities are never recomputed.
         """
 
-        self.positions.extend(positions)
+        positions = np.asarray(positions, dtype=np.float64)
+        if positions.ndim != 2 or positions.shape[1] != self.dimensions:
+            raise ValueError(f"Positions must have shape (M, {self.dimensions}), got {positions.shape}.")
+        num_new = positions.shape[0]
+        polarizabilities = polarizability_array(polarizabilities, num_new, self.dimensions)
+        type_indices = np.broadcast_to(np.asarray(type_indices, dtype=np.int64), (num_new,))
 
-        if isinstance(polarizabilities, list):
-            self.polarizabilities.extend(polarizabilities)
-        else:
-            self.polarizabilities.extend([polarizabilities] * len(positions))
+        start = self._num_particles
+        self._reserve(start + num_new, tensor=polarizabilities.ndim == 3)
+        self._positions[start:start + num_new] = positions
+        if self._polarizabilities.ndim == 3 and polarizabilities.ndim == 1:
+            polarizabilities = polarizabilities[:, None, None] * np.eye(self.dimensions)
+        self._polarizabilities[start:start + num_new] = polarizabilities
+        self._type_indices[start:start + num_new] = type_indices
+        self._num_particles += num_new
+        self.positions_version += 1
+        self.polarizabilities_version += 1
+
+    def remove_particles(self, indices: np.ndarray | List[int]) -> None:
+        """
+        Remove particles from the system, keeping the order of the remaining ones.
+
+        Parameters
+        ----------
+        indices :
+            Indices, or boolean mask, of the particles to remove.
+        """
+
+        keep = np.ones(self._num_particles, dtype=bool)
+        keep[np.asarray(indices)] = False
+        num_kept = int(keep.sum())
+        self._positions[:num_kept] = self._positions[:self._num_particles][keep]
+        self._polarizabilities[:num_kept] = self._polarizabilities[:self._num_particles][keep]
+        self._type_indices[:num_kept] = self._type_indices[:self._num_particles][keep]
+        self._num_particles = num_kept
+        self.positions_version += 1
+        self.polarizabilities_version += 1
 
     def get_positions(self) -> np.ndarray:
         """
-        Get the positions of all particles in the system. If there is only one particle, returns a 1D array.
+        Get the positions of all particles in the system.
 
         Returns
         -------
         np.ndarray
-            An array of shape (N, 3) where N is the number of particles.
+            A read-only view of shape (N, d) where N is the number of particles. It follows later changes of
+            the positions, so it must be copied to keep a snapshot.
         """
 
-        positions = np.array(self.positions)
-        
-        return positions
-    
+        return self.positions
+
+    def get_polarizabilities(self) -> np.ndarray:
+        """
+        Get the polarizabilities of all particles in the system.
+
+        Returns
+        -------
+        np.ndarray
+            A read-only complex view of shape (N,) if all the particles are isotropic, and of shape (N, 3, 3)
+            otherwise.
+        """
+
+        return self.polarizabilities
+
     def get_position(self, index: int) -> np.ndarray:
         """
         Get the position of a specific particle by its index.
@@ -67,29 +200,46 @@ class Particles:
             A 1D array representing the position of the specified particle.
         """
 
-        return np.array(self.positions[index])
-    
+        return self.positions[index].copy()
+
     def clean_particles(self) -> None:
         """
-        Remove all particles' data from the system.
+        Remove all particles' data from the system. The storage is kept for the next particles.
         """
 
-        self.positions = []
-        self.polarizabilities = []
+        self._num_particles = 0
+        self._polarizabilities = np.empty(self._positions.shape[0], dtype=np.complex128)
+        self.positions_version += 1
+        self.polarizabilities_version += 1
 
 
-    def _calculate_polarizabilities(self) -> None:
+    def _calculate_polarizabilities(self, type_polarizabilities: List[complex | np.ndarray]) -> None:
         """
-        Calculate the polarizabilities of all particles in the system given that their types polarizabilities are known.
+        Set the polarizabilities of all the typed particles from the polarizabilities of their types.
+
+        Parameters
+        ----------
+        type_polarizabilities :
+            The polarizability of each type, a scalar or a (3, 3) tensor, in the order of the type indices.
+
+        Notes
+        -----
+        The polarizabilities of the types are stacked into one array, (T,) or (T, 3, 3), and gathered with the
+        type indices, so the cost does not depend on the number of particles per type.
         """
 
-        for particle in range(len(self.positions)):
-            type_index = self.type_assignments[particle]
-            particle_type = self.types[type_index]
-            polarizability = particle_type.compute_polarizability()
-            self.polarizabilities.append(polarizability)
+        type_polarizabilities = polarizability_array(list(type_polarizabilities), len(type_polarizabilities), self.dimensions)
+        type_indices = self.type_indices
+        if np.any(type_indices >= len(type_polarizabilities)):
+            raise ValueError("Some particles have a type index without polarizability.")
+        typed = np.flatnonzero(type_indices >= 0)
+        self._reserve(self._num_particles, tensor=type_polarizabilities.ndim == 3)
+        if self._polarizabilities.ndim == 3 and type_polarizabilities.ndim == 1:
+            type_polarizabilities = type_polarizabilities[:, None, None] * np.eye(self.dimensions)
+        self._polarizabilities[typed] = type_polarizabilities[type_indices[typed]]
+        self.polarizabilities_version += 1
 
-    def set_position(self, index: int, position: List[float]) -> None:
+    def set_position(self, index: int, position: np.ndarray | List[float]) -> None:
         """
         Set the position of a particle at a specified index.
 
@@ -100,6 +250,510 @@ class Particles:
         position :
             The new position of the particle. This can be a 1D-three-element array-like.
         """
-        
-        self.positions[index] = position
 
+        self._positions[:self._num_particles][index] = position
+        in_sync = self._spatial_index is not None and self._spatial_index_version == self.positions_version
+        self.positions_version += 1
+        if in_sync:
+            self._spatial_index.update(index, self._positions[:self._num_particles][index])
+            self._spatial_index_version = self.positions_version
+
+    def set_positions(self, positions: np.ndarray | List[List[float]]) -> None:
+        """
+        Replace the positions of all the particles.
+
+        Parameters
+        ----------
+        positions :
+            The new positions of the particles, one per particle already in the system.
+        """
+
+        if len(positions) != self._num_particles:
+            raise ValueError(f"Expected {self._num_particles} positions, got {len(positions)}.")
+        self._positions[:self._num_particles] = positions
+        self.positions_version += 1
+
+    def set_polarizabilities(self, polarizabilities: complex | np.ndarray | List[complex]) -> None:
+        """
+        Replace the polarizabilities of all the particles.
+
+        Parameters
+        ----------
+        polarizabilities :
+            A scalar or (3, 3) tensor shared by all the particles, or one per particle, see add_particles.
+        """
+
+        polarizabilities = polarizability_array(polarizabilities, self._num_particles, self.dimensions)
+        self._reserve(self._num_particles, tensor=polarizabilities.ndim == 3)
+        if self._polarizabilities.ndim == 3 and polarizabilities.ndim == 1:
+            polarizabilities = polarizabilities[:, None, None] * np.eye(self.dimensions)
+        self._polarizabilities[:self._num_particles] = polarizabilities
+        self.polarizabilities_version += 1
+
+    def get_spatial_index(self) -> SpatialIndex:
+        """
+        Get the spatial index of the positions, built when it is first needed or when the positions changed.
+        Moving a single particle with set_position updates the index incrementally.
+
+        Returns
+        -------
+        SpatialIndex
+            The index of the current positions.
+        """
+
+        if self._spatial_index is None or self._spatial_index_version != self.positions_version:
+            self._spatial_index = SpatialIndex(self.positions)
+            self._spatial_index_version = self.positions_version
+        return self._spatial_index
+
+    def query_neighbours(self, points: np.ndarray, radius: float) -> list:
+        """
+        Find the particles within a distance of each point.
+
+        Parameters
+        ----------
+        points :
+            Points of shape (P, d), in nanometers.
+        radius :
+            The distance, in nanometers.
+
+        Returns
+        -------
+        list
+            For each point, the sorted array of the indices of the particles within radius.
+        """
+
+        return self.get_spatial_index().query_radius(points, radius)
+
+    def query_pairs(self, radius: float) -> np.ndarray:
+        """
+        Find the pairs of particles closer than a distance.
+
+        Parameters
+        ----------
+        radius :
+            The distance, in nanometers.
+
+        Returns
+        -------
+        np.ndarray
+            Integer array of shape (P, 2) of the pairs (i, j) with i < j.
+        """
+
+        return self.get_spatial_index().query_pairs(radius)
+
+    def find_overlaps(self, radii: np.ndarray, min_gap: float = 0.0) -> np.ndarray:
+        """
+        Find the pairs of particles whose bounding spheres overlap.
+
+        Parameters
+        ----------
+        radii :
+            The radius of the bounding sphere of each particle, of shape (N,), in nanometers.
+        min_gap :
+            The minimum surface-to-surface distance. Pairs closer than min_gap are reported. Default is 0.
+
+        Returns
+        -------
+        np.ndarray
+            Integer array of shape (P, 2) of the pairs (i, j) with i < j and |x_i - x_j| < r_i + r_j + min_gap.
+            Coincident particles are always reported, since their Green's tensor is singular.
+        """
+
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (self._num_particles,))
+        if self._num_particles < 2:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = self.query_pairs(2 * radii.max() + min_gap)
+        positions = self.positions
+        distances = np.linalg.norm(positions[pairs[:, 0]] - positions[pairs[:, 1]], axis=-1)
+        return pairs[(distances < radii[pairs[:, 0]] + radii[pairs[:, 1]] + min_gap) | (distances == 0)]
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+def _type_radii(particle_types: ParticleType | List[ParticleType], positions_unit: str) -> np.ndarray:
+    """
+    Bounding radii of the types, converted from nanometers to the positions unit.
+    """
+
+    if not isinstance(particle_types, (list, tuple)):
+        particle_types = [particle_types]
+    return np.array([ptype.get_bounding_radius() for ptype in particle_types], dtype=np.float64) / get_multiplier_nanometers(positions_unit)
+
+def _random_types(rng: np.random.Generator, num_particles: int, num_types: int, fractions: np.ndarray | List[float] | None) -> np.ndarray:
+    if fractions is None:
+        fractions = np.full(num_types, 1.0 / num_types)
+    fractions = np.asarray(fractions, dtype=np.float64)
+    if fractions.shape != (num_types,) or np.any(fractions < 0) or fractions.sum() <= 0:
+        raise ValueError(f"fractions must be {num_types} non-negative numbers.")
+    return rng.choice(num_types, size=num_particles, p=fractions / fractions.sum())
+
+def _accept_candidates(tree: cKDTree | None,
+                       accepted_radii: np.ndarray | None,
+                       candidates: np.ndarray,
+                       candidate_radii: np.ndarray,
+                       min_gap: float) -> np.ndarray:
+    """
+    Mask of the candidates that overlap neither the accepted particles nor an earlier candidate of the batch.
+    """
+
+    keep = np.ones(candidates.shape[0], dtype=bool)
+    max_radius = candidate_radii.max()
+    if tree is not None and tree.n > 0:
+        candidate_tree = cKDTree(candidates)
+        distances = candidate_tree.sparse_distance_matrix(tree, max_radius + accepted_radii.max() + min_gap, output_type='ndarray')
+        overlapping = distances['v'] < candidate_radii[distances['i']] + accepted_radii[distances['j']] + min_gap
+        keep[distances['i'][overlapping]] = False
+    # Among the remaining candidates, the later one of each overlapping pair is rejected.
+    remaining = np.flatnonzero(keep)
+    if remaining.shape[0] > 1:
+        pairs = cKDTree(candidates[remaining]).query_pairs(2 * max_radius + min_gap, output_type='ndarray')
+        first, second = remaining[pairs[:, 0]], remaining[pairs[:, 1]]
+        separations = np.linalg.norm(candidates[first] - candidates[second], axis=-1)
+        overlapping = separations < candidate_radii[first] + candidate_radii[second] + min_gap
+        keep[np.maximum(first, second)[overlapping]] = False
+    return keep
+
+def random_sequential_addition(num_particles: int,
+                               box: np.ndarray | List[float],
+                               particle_types: ParticleType | List[ParticleType],
+                               fractions: np.ndarray | List[float] | None = None,
+                               min_gap: float = 0.0,
+                               positions_unit: str = "nm",
+                               seed: int | None = None,
+                               max_attempts: int = 100) -> tuple:
+    """
+    Place non-overlapping particles uniformly at random in a box by random sequential addition (RSA).
+
+    Parameters
+    ----------
+    num_particles :
+        The number of particles.
+    box :
+        The edge lengths of the box [0, Lx) x [0, Ly) x [0, Lz), in positions_unit. A zero length gives a
+        plane or a line.
+    particle_types :
+        The particle types. Their bounding radii set the excluded volume of the particles.
+    fractions :
+        The probability of each type. Default is equal probabilities.
+    min_gap :
+        The minimum surface-to-surface distance, in positions_unit. Default is 0.
+    positions_unit :
+        The unit of box, min_gap and the returned positions. Default is 'nm'.
+    seed :
+        Seed of the random number generator.
+    max_attempts :
+        Maximum number of batches of candidates. Default is 100.
+
+    Returns
+    -------
+    tuple
+        The positions of shape (num_particles, 3) and the type indices of shape (num_particles,), to be
+        passed to System.add_particles.
+
+    Notes
+    -----
+    Candidates are drawn in batches. Each batch is checked against the accepted particles with a k-d tree,
+    and against itself, keeping the earlier candidate of each overlapping pair. The particles are accepted
+    in the order they were drawn, as in sequential RSA. The jamming limit of monodisperse spheres is a
+    volume fraction of about 0.38, and the number of attempts grows quickly close to it.
+    """
+
+    rng = np.random.default_rng(seed)
+    box = np.asarray(box, dtype=np.float64)
+    radii = _type_radii(particle_types, positions_unit)
+
+    positions = np.empty((0, 3))
+    type_indices = np.empty(0, dtype=np.int64)
+    for _ in range(max_attempts):
+        missing = num_particles - positions.shape[0]
+        if missing == 0:
+            break
+        batch_size = max(2 * missing, 1024)
+        candidates = rng.random((batch_size, 3)) * box
+        candidate_types = _random_types(rng, batch_size, radii.shape[0], fractions)
+        tree = cKDTree(positions) if positions.shape[0] > 0 else None
+        keep = _accept_candidates(tree, radii[type_indices], candidates, radii[candidate_types], min_gap)
+        accepted = np.flatnonzero(keep)[:missing]
+        positions = np.concatenate([positions, candidates[accepted]])
+        type_indices = np.concatenate([type_indices, candidate_types[accepted]])
+
+    if positions.shape[0] < num_particles:
+        raise ValueError(f"Only {positions.shape[0]} of {num_particles} particles could be placed, the packing is too dense.")
+    return positions, type_indices
+
+def poisson_disk_sampling(box: np.ndarray | List[float],
+                          particle_types: ParticleType | List[ParticleType],
+                          fractions: np.ndarray | List[float] | None = None,
+                          min_gap: float = 0.0,
+                          positions_unit: str = "nm",
+                          seed: int | None = None,
+                          num_candidates: int = 30,
+                          max_particles: int | None = None) -> tuple:
+    """
+    Fill a box with non-overlapping particles by Poisson-disk sampling.
+
+    Parameters
+    ----------
+    box :
+        The edge lengths of the box [0, Lx) x [0, Ly) x [0, Lz), in positions_unit. A zero length gives a
+        plane or a line.
+    particle_types :
+        The particle types. Their bounding radii set the excluded volume of the particles.
+    fractions :
+        The probability of each type. Default is equal probabilities.
+    min_gap :
+        The minimum surface-to-surface distance, in positions_unit. Default is 0.
+    positions_unit :
+        The unit of box, min_gap and the returned positions. Default is 'nm'.
+    seed :
+        Seed of the random number generator.
+    num_candidates :
+        Number of candidates drawn around each active particle before it is retired. Default is 30.
+    max_particles :
+        Stop once this number of particles is reached. Default is no limit.
+
+    Returns
+    -------
+    tuple
+        The positions of shape (N, 3) and the type indices of shape (N,).
+
+    Notes
+    -----
+    This is Bridson's algorithm applied to all the active particles at once. In each round, every active
+    particle proposes candidates in the shell between contact and twice the contact distance. The
+    candidates are checked with a k-d tree like in random_sequential_addition, and the active particles
+    without an accepted candidate are retired. The result is a dense, nearly maximal packing, with
+    volume fractions close to the jamming limit of RSA.
+    """
+
+    rng = np.random.default_rng(seed)
+    box = np.asarray(box, dtype=np.float64)
+    radii = _type_radii(particle_types, positions_unit)
+    dimensions = np.flatnonzero(box > 0)
+    limit = np.inf if max_particles is None else max_particles
+
+    positions = rng.random((1, 3)) * box
+    type_indices = _random_types(rng, 1, radii.shape[0], fractions)
+    active = np.array([0])
+    while active.shape[0] > 0 and positions.shape[0] < limit:
+        parents = np.repeat(active, num_candidates)
+        candidate_types = _random_types(rng, parents.shape[0], radii.shape[0], fractions)
+        contact = radii[type_indices[parents]] + radii[candidate_types] + min_gap
+        directions = np.zeros((parents.shape[0], 3))
+        directions[:, dimensions] = rng.standard_normal((parents.shape[0], dimensions.shape[0]))
+        directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+        distances = contact * (1 + rng.random(parents.shape[0]))
+        candidates = positions[parents] + distances[:, None] * directions
+        inside = np.all((candidates >= 0) & (candidates <= box), axis=-1)
+
+        keep = np.zeros(parents.shape[0], dtype=bool)
+        if inside.any():
+            keep[inside] = _accept_candidates(cKDTree(positions), radii[type_indices], candidates[inside], radii[candidate_types[inside]], min_gap)
+        accepted = np.flatnonzero(keep)[:int(min(limit - positions.shape[0], keep.sum()))]
+
+        new_indices = positions.shape[0] + np.arange(accepted.shape[0])
+        positions = np.concatenate([positions, candidates[accepted]])
+        type_indices = np.concatenate([type_indices, candidate_types[accepted]])
+        active = np.concatenate([np.unique(parents[accepted]), new_indices])
+
+    return positions, type_indices
+
+def jittered_lattice(shape: tuple | List[int],
+                     spacing: float,
+                     particle_types: ParticleType | List[ParticleType],
+                     lattice: str = "cubic",
+                     jitter: float = 0.0,
+                     fractions: np.ndarray | List[float] | None = None,
+                     min_gap: float = 0.0,
+                     positions_unit: str = "nm",
+                     seed: int | None = None) -> tuple:
+    """
+    Place particles on a lattice and displace each of them randomly.
+
+    Parameters
+    ----------
+    shape :
+        Number of unit cells along x, y and z.
+    spacing :
+        The lattice constant, in positions_unit.
+    particle_types :
+        The particle types.
+    lattice :
+        'cubic', 'fcc' or 'hexagonal', a triangular lattice in the xy plane stacked along z. Default is 'cubic'.
+    jitter :
+        Maximum displacement of a particle, in positions_unit. Default is 0.
+    fractions :
+        The probability of each type. Default is equal probabilities.
+    min_gap :
+        The minimum surface-to-surface distance, in positions_unit. Default is 0.
+    positions_unit :
+        The unit of spacing, jitter, min_gap and the returned positions. Default is 'nm'.
+    seed :
+        Seed of the random number generator.
+
+    Returns
+    -------
+    tuple
+        The positions of shape (N, 3) and the type indices of shape (N,).
+
+    Notes
+    -----
+    The displacements are drawn uniformly in a ball of radius jitter. The particles cannot overlap if the
+    nearest-neighbour distance of the lattice is at least 2 jitter plus twice the largest radius plus
+    min_gap, and a ValueError is raised otherwise.
+    """
+
+    rng = np.random.default_rng(seed)
+    radii = _type_radii(particle_types, positions_unit)
+    bases = {"cubic": (np.eye(3), np.zeros((1, 3))),
+             "fcc": (np.eye(3), np.array([[0.0, 0.0, 0.0], [0.5, 0.5, 0.0], [0.5, 0.0, 0.5], [0.0, 0.5, 0.5]])),
+             "hexagonal": (np.array([[1.0, 0.0, 0.0], [0.5, np.sqrt(3) / 2, 0.0], [0.0, 0.0, 1.0]]), np.zeros((1, 3)))}
+    if lattice not in bases:
+        raise ValueError(f"Unknown lattice '{lattice}', expected one of {list(bases)}.")
+    vectors, basis = bases[lattice]
+    nearest_distance = spacing / np.sqrt(2) if lattice == "fcc" else spacing
+    if nearest_distance < 2 * jitter + 2 * radii.max() + min_gap:
+        raise ValueError("The spacing is too small for the jitter and the radii, the particles could overlap.")
+
+    cells = np.stack(np.meshgrid(*[np.arange(n) for n in shape], indexing="ij"), axis=-1).reshape(-1, 1, 3)
+    positions = ((cells + basis) @ vectors).reshape(-1, 3) * spacing
+    if jitter > 0:
+        directions = rng.standard_normal(positions.shape)
+        directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+        positions += jitter * rng.random(positions.shape[0])[:, None]**(1 / 3) * directions
+    return positions, _random_types(rng, positions.shape[0], radii.shape[0], fractions)
+
+def diffusion_limited_aggregate(num_particles: int,
+                                particle_types: ParticleType | List[ParticleType],
+                                fractions: np.ndarray | List[float] | None = None,
+                                positions_unit: str = "nm",
+                                seed: int | None = None,
+                                num_walkers: int = 1024,
+                                sticking_distance: float = 1e-3) -> tuple:
+    """
+    Grow an off-lattice diffusion-limited aggregate (DLA) around a seed particle at the origin.
+
+    Parameters
+    ----------
+    num_particles :
+        The number of particles of the aggregate.
+    particle_types :
+        The particle types. Particles stick when their bounding spheres touch.
+    fractions :
+        The probability of each type. Default is equal probabilities.
+    positions_unit :
+        The unit of the returned positions. Default is 'nm'.
+    seed :
+        Seed of the random number generator.
+    num_walkers :
+        Number of random walkers moved at once. Default is 1024.
+    sticking_distance :
+        A walker sticks when its surface is closer than this fraction of its radius from the aggregate.
+        Default is 1e-3.
+
+    Returns
+    -------
+    tuple
+        The positions of shape (num_particles, 3) and the type indices of shape (num_particles,).
+
+    Notes
+    -----
+    Walkers are launched on a sphere around the aggregate. Each step jumps in a random direction by the
+    distance to the nearest surface of the aggregate, which keeps the walk exact while skipping empty
+    space, and walkers farther than five launch radii are launched again. A walker that touches the
+    aggregate is placed at contact with the particle it hit. Several walkers move at once, so walkers
+    that stick in the same step are checked against each other and the later ones are launched again.
+    """
+
+    rng = np.random.default_rng(seed)
+    radii = _type_radii(particle_types, positions_unit)
+    max_radius = radii.max()
+    if max_radius <= 0:
+        raise ValueError("Diffusion-limited aggregation requires particle types with a positive radius.")
+
+    positions = np.zeros((num_particles, 3))
+    type_indices = _random_types(rng, num_particles, radii.shape[0], fractions)
+    num_placed = 1
+    cluster_radius = radii[type_indices[0]]
+    tree = cKDTree(positions[:1])
+    tree_size = 1
+
+    def launch(count):
+        directions = rng.standard_normal((count, 3))
+        directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+        return (cluster_radius + 4 * max_radius) * directions
+
+    def nearest_surface(points):
+        # Nearest surface among the particles in the tree and the few placed since it was built. With several
+        # radii, the nearest surface belongs to a centre closer than the nearest centre plus the radius spread,
+        # so the points whose nearest centres do not cover that distance search it with a ball query.
+        num_nearest = 1 if radii.shape[0] == 1 else min(8, tree_size)
+        distances, nearest = tree.query(points, k=num_nearest)
+        distances, nearest = distances.reshape(points.shape[0], -1), nearest.reshape(points.shape[0], -1)
+        surfaces = distances - radii[type_indices[nearest]]
+        closest = surfaces.argmin(axis=1)
+        rows = np.arange(points.shape[0])
+        surface, hit = surfaces[rows, closest], nearest[rows, closest]
+
+        search_distances = distances[:, 0] + radii.max() - radii.min()
+        uncovered = np.flatnonzero(distances[:, -1] < search_distances) if num_nearest < tree_size else np.empty(0, dtype=np.int64)
+        if uncovered.shape[0] > 0:
+            neighbours = tree.query_ball_point(points[uncovered], search_distances[uncovered])
+            counts = np.array([len(row) for row in neighbours])
+            point_rows = np.repeat(uncovered, counts)
+            candidates = np.concatenate(neighbours).astype(np.int64)
+            candidate_surfaces = np.linalg.norm(points[point_rows] - positions[candidates], axis=-1) - radii[type_indices[candidates]]
+            order = np.lexsort((candidate_surfaces, point_rows))
+            first = order[np.r_[0, np.cumsum(counts)[:-1]]]
+            surface[uncovered], hit[uncovered] = candidate_surfaces[first], candidates[first]
+
+        if num_placed > tree_size:
+            recent_surfaces = np.linalg.norm(points[:, None] - positions[None, tree_size:num_placed], axis=-1) - radii[type_indices[tree_size:num_placed]]
+            recent_closest = recent_surfaces.argmin(axis=1)
+            closer = recent_surfaces[rows, recent_closest] < surface
+            surface = np.where(closer, recent_surfaces[rows, recent_closest], surface)
+            hit = np.where(closer, tree_size + recent_closest, hit)
+        return surface, hit
+
+    walker_types = _random_types(rng, num_walkers, radii.shape[0], fractions)
+    walkers = launch(num_walkers)
+    while num_placed < num_particles:
+        surface, nearest = nearest_surface(walkers)
+        gaps = surface - radii[walker_types]
+
+        sticking = np.flatnonzero(gaps < sticking_distance * radii[walker_types])
+        if sticking.shape[0] > 0:
+            hit = nearest[sticking]
+            directions = walkers[sticking] - positions[hit]
+            directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+            new_types = walker_types[sticking]
+            new_positions = positions[hit] + (radii[type_indices[hit]] + radii[new_types])[:, None] * directions
+
+            # Walkers that stuck in the same step must not overlap each other or other particles of the aggregate.
+            tolerance = sticking_distance * max_radius
+            keep = _accept_candidates(None, None, new_positions, radii[new_types], -tolerance)
+            keep &= nearest_surface(new_positions)[0] - radii[new_types] > -tolerance
+            placed = np.flatnonzero(keep)[:num_particles - num_placed]
+            positions[num_placed:num_placed + placed.shape[0]] = new_positions[placed]
+            type_indices[num_placed:num_placed + placed.shape[0]] = new_types[placed]
+            num_placed += placed.shape[0]
+            cluster_radius = max(cluster_radius, np.max(np.linalg.norm(new_positions[placed], axis=-1) + radii[new_types[placed]], initial=0))
+            if num_placed - tree_size > 64:
+                tree = cKDTree(positions[:num_placed])
+                tree_size = num_placed
+
+            walker_types[sticking] = _random_types(rng, sticking.shape[0], radii.shape[0], fractions)
+            walkers[sticking] = launch(sticking.shape[0])
+            gaps[sticking] = 0.0
+
+        moving = np.flatnonzero(gaps > 0)
+        directions = rng.standard_normal((moving.shape[0], 3))
+        directions /= np.linalg.norm(directions, axis=-1, keepdims=True)
+        walkers[moving] += gaps[moving, None] * directions
+        escaped = np.flatnonzero(np.einsum('ij,ij->i', walkers, walkers) > (5 * (cluster_radius + 4 * max_radius))**2)
+        walkers[escaped] = launch(escaped.shape[0])
+
+    return positions, type_indices
@@ -1,9 +1,16 @@
+import os
 import refractiveindex as ridx
+from collections import OrderedDict
 from scipy.constants import c, e, h
 from .tools.unit_calcs import *
 from .tools.ridx_usage import obtain_ridx_material_info
 import numpy as np
 
+MATERIAL_CACHE_SIZE = 16
+
+_material_cache = OrderedDict()
+_material_cache_dir = os.environ.get("MSPTOOLS_CACHE_DIR")
+
 def permittivity_Drude(frequency: float, plasma_frequency: float, collision_frequency: float, epsilon_inf: float) -> complex:
     """
     Calculate the permittivity using the Drude model.
@@ -34,22 +41,273 @@ def permittivity_ridx(frequency: float | np.ndarray, material: str) -> complex:
     Parameters
     ----------
     frequency :
-        The frequency of the incident light in eV.
+        The frequency of the incident light in eV, or an array of frequencies.
     material :
         The name of the material as recognized by the RefractiveIndex package.
     
     Returns
     -------
     complex
-        The dielectric constant of the material.
+        The dielectric constant of the material, with the shape of frequency.
     """
     
-    shelf, book, page = obtain_ridx_material_info(material)
-    Material = ridx.RefractiveIndexMaterial(shelf=shelf, book=book, page=page)
-    if isinstance(frequency, np.ndarray):
-        wavelength_nm = eV_to_nm(frequency)
-        epsilon = np.array([Material.get_epsilon(wavelength_nm=w) for w in wavelength_nm])
+    Material = get_material(material)
+    if isinstance(frequency, (list, tuple)):
+        frequency = np.asarray(frequency, dtype=np.float64)
+    # Materials evaluate whole arrays at once, so a spectrum costs a single pass over the frequencies.
+    wavelength_nm = eV_to_nm(frequency)
+    try:
+        return Material.get_epsilon(wavelength_nm=wavelength_nm)
+    except ridx.NoExtinctionCoefficient:
+        return Material.get_refractive_index(wavelength_nm) ** 2 + 0j
+
+def material_permittivity(frequency: float | np.ndarray, material) -> complex | np.ndarray:
+    """
+    Calculate the permittivity of a material given by name or by a dispersion model.
+
+    Parameters
+    ----------
+    frequency :
+        The frequency of the incident light in eV, or an array of frequencies.
+    material :
+        The name of the material as recognized by the RefractiveIndex package, or a callable returning the
+        permittivity at frequencies in eV, such as a fitted DrudeLorentzModel.
+
+    Returns
+    -------
+    complex
+        The dielectric constant of the material, with the shape of frequency.
+    """
+
+    if callable(material):
+        return material(frequency)
+    return permittivity_ridx(frequency, material)
+
+
+class MaterialTable:
+    """Tabulated refractive index n and extinction coefficient k of a material of the RefractiveIndex database."""
+
+    def __init__(self,
+                 n_wavelengths_um: np.ndarray,
+                 n: np.ndarray,
+                 k_wavelengths_um: np.ndarray | None = None,
+                 k: np.ndarray | None = None) -> None:
+        """
+        Initialize a MaterialTable from the tabulated data.
+
+        Parameters
+        ----------
+        n_wavelengths_um :
+            Increasing wavelengths in micrometers at which n is tabulated.
+        n :
+            The refractive index at these wavelengths.
+        k_wavelengths_um :
+            Increasing wavelengths in micrometers at which k is tabulated. Default is None, for materials without
+            extinction coefficient, whose k is 0.
+        k :
+            The extinction coefficient at these wavelengths.
+
+        Notes
+        -----
+        n and k are linearly interpolated between the tabulated wavelengths and are NaN outside of them, as in
+        the RefractiveIndex package.
+        """
+
+        self.n_wavelengths_um = np.asarray(n_wavelengths_um, dtype=np.float64)
+        self.n = np.asarray(n, dtype=np.float64)
+        if k_wavelengths_um is None:
+            k_wavelengths_um, k = self.n_wavelengths_um, np.zeros_like(self.n)
+        self.k_wavelengths_um = np.asarray(k_wavelengths_um, dtype=np.float64)
+        self.k = np.asarray(k, dtype=np.float64)
+
+    @classmethod
+    def from_ridx(cls, material) -> "MaterialTable":
+        """
+        Extract the tabulated data of a RefractiveIndexMaterial.
+
+        Parameters
+        ----------
+        material :
+            The ridx.RefractiveIndexMaterial.
+
+        Returns
+        -------
+        MaterialTable
+            The table of the material, which interpolates the data exactly as the material does.
+
+        Notes
+        -----
+        Only tabulated data is extracted. A ValueError is raised for materials given by a dispersion formula,
+        which are evaluated exactly by the material instead, and when the installed RefractiveIndex package
+        does not store its data as version 1.0.0 does, see _ridx_internals.
+        """
+
+        internals = _ridx_internals(material)
+        if internals is None:
+            raise ValueError("The data of the material cannot be read from this version of the RefractiveIndex package.")
+        n_func, k_func, _ = internals
+        if n_func is None:
+            raise ValueError("The material has no refractive index.")
+        if not all(_is_tabulated(function) for function in (n_func, k_func) if function is not None):
+            raise ValueError("The material is given by a dispersion formula, which is not tabulated.")
+        n_wavelengths, n = np.array(n_func.x), np.array(n_func.y)
+        k_wavelengths, k = (None, None) if k_func is None else (np.array(k_func.x), np.array(k_func.y))
+        return cls(n_wavelengths, n, k_wavelengths, k)
+
+    def wavelength_range_um(self) -> tuple:
+        """Return the (shortest, longest) wavelengths in micrometers at which both n and k are tabulated."""
+        return (max(self.n_wavelengths_um[0], self.k_wavelengths_um[0]), min(self.n_wavelengths_um[-1], self.k_wavelengths_um[-1]))
+
+    def save(self, filename: str) -> None:
+        """Save the table to a .npz file."""
+        np.savez(filename, n_wavelengths_um=self.n_wavelengths_um, n=self.n, k_wavelengths_um=self.k_wavelengths_um, k=self.k)
+
+    @classmethod
+    def load(cls, filename: str) -> "MaterialTable":
+        """Load a table saved with MaterialTable.save."""
+        with np.load(filename) as data:
+            return cls(data["n_wavelengths_um"], data["n"], data["k_wavelengths_um"], data["k"])
+
+    @staticmethod
+    def _interpolate(wavelengths_um, tabulated_wavelengths: np.ndarray, values: np.ndarray):
+        if tabulated_wavelengths.shape[0] == 1:
+            return np.full_like(np.asarray(wavelengths_um, dtype=np.float64), values[0])
+        return np.interp(wavelengths_um, tabulated_wavelengths, values, left=np.nan, right=np.nan)
+
+    def get_refractive_index(self, wavelength_nm: float | np.ndarray) -> float | np.ndarray:
+        """
+        Compute the refractive index n at the given wavelengths in nanometers.
+        """
+
+        return self._interpolate(np.asarray(wavelength_nm, dtype=np.float64) / 1000.0, self.n_wavelengths_um, self.n)
+
+    def get_epsilon(self, wavelength_nm: float | np.ndarray) -> complex | np.ndarray:
+        """
+        Compute the permittivity (n + ik)^2 at the given wavelengths in nanometers.
+        """
+
+        wavelength_um = np.asarray(wavelength_nm, dtype=np.float64) / 1000.0
+        n = self._interpolate(wavelength_um, self.n_wavelengths_um, self.n)
+        k = self._interpolate(wavelength_um, self.k_wavelengths_um, self.k)
+        return (n + 1j * k) ** 2
+
+def _ridx_internals(material) -> tuple | None:
+    """
+    The n function, k function and wavelength range in micrometers of a RefractiveIndexMaterial, or None.
+
+    They are not part of the public API of the RefractiveIndex package, whose version 1.0.0 is pinned in
+    environment.yml. They are only used to store tabulated data on disk and to find the wavelength range of a
+    material, and None is returned when the installed version does not provide them.
+    """
+
+    names = ("_n_func", "_k_func", "_wl_range")
+    if not all(hasattr(material, name) for name in names):
+        return None
+    return tuple(getattr(material, name) for name in names)
+
+def _is_tabulated(function) -> bool:
+    return hasattr(function, "x") and hasattr(function, "y")
+
+def set_material_cache_dir(directory: str | None) -> None:
+    """
+    Set the directory of the on-disk cache of material tables.
+
+    Parameters
+    ----------
+    directory :
+        The directory, created if needed. None disables the on-disk cache. The initial value is the
+        MSPTOOLS_CACHE_DIR environment variable, if it is set.
+    """
+
+    global _material_cache_dir
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _material_cache_dir = directory
+
+def get_material_cache_dir() -> str | None:
+    """Return the directory of the on-disk cache of material tables, or None if it is disabled."""
+    return _material_cache_dir
+
+def clear_material_cache(disk: bool = False) -> None:
+    """
+    Empty the in-memory cache of materials and, if disk is True, remove the tables of the on-disk cache,
+    including the polarizability tables stored there.
+    """
+
+    _material_cache.clear()
+    if disk and _material_cache_dir is not None and os.path.isdir(_material_cache_dir):
+        for filename in os.listdir(_material_cache_dir):
+            if filename.endswith(".npz"):
+                os.remove(os.path.join(_material_cache_dir, filename))
+
+def _material_cache_file(key: tuple) -> str | None:
+    if _material_cache_dir is None:
+        return None
+    name = "_".join(part.replace(os.sep, "-") for part in key)
+    return os.path.join(_material_cache_dir, f"{name}.npz")
+
+def get_material(material: str):
+    """
+    Obtain a material, reading the RefractiveIndex database only on the first request.
+
+    Parameters
+    ----------
+    material :
+        The name of the material as recognized by obtain_ridx_material_info.
+
+    Returns
+    -------
+    ridx.RefractiveIndexMaterial or MaterialTable
+        The material, whose get_epsilon and get_refractive_index methods take wavelengths in nanometers.
+
+    Notes
+    -----
+    Materials are kept in a process-wide cache keyed by (shelf, book, page) that holds the MATERIAL_CACHE_SIZE
+    most recently used materials. On a miss, the table of a tabulated material is loaded from the on-disk
+    cache if it exists there. Otherwise the database entry is parsed into a RefractiveIndexMaterial, which is
+    cached and evaluated exactly, and its data is stored in the on-disk cache if it is tabulated. Materials
+    given by a dispersion formula are never resampled.
+    """
+
+    key = obtain_ridx_material_info(material)
+    cached = _material_cache.get(key)
+    if cached is not None:
+        _material_cache.move_to_end(key)
+        return cached
+
+    filename = _material_cache_file(key)
+    if filename is not None and os.path.exists(filename):
+        cached = MaterialTable.load(filename)
     else:
-        wavelength_nm = eV_to_nm(frequency)
-        epsilon = Material.get_epsilon(wavelength_nm=wavelength_nm)
-    return epsilon
+        shelf, book, page = key
+        cached = ridx.RefractiveIndexMaterial(shelf=shelf, book=book, page=page)
+        if filename is not None:
+            try:
+                table = MaterialTable.from_ridx(cached)
+            except ValueError:
+                table = None
+            if table is not None:
+                temporary = filename + ".tmp.npz"
+                table.save(temporary)
+                os.replace(temporary, filename)
+
+    _material_cache[key] = cached
+    while len(_material_cache) > MATERIAL_CACHE_SIZE:
+        _material_cache.popitem(last=False)
+    return cached
+
+def material_wavelength_range_um(material: str) -> tuple:
+    """
+    Return the (shortest, longest) wavelengths in micrometers over which the permittivity of a material is known.
+    """
+
+    cached = get_material(material)
+    if isinstance(cached, MaterialTable):
+        return cached.wavelength_range_um()
+    internals = _ridx_internals(cached)
+    if internals is None or internals[2] is None:
+        raise ValueError(f"The wavelength range of material '{material}' is unknown.")
+    n_func, k_func, wavelength_range = internals
+    if k_func is not None and _is_tabulated(k_func):
+        return (max(wavelength_range[0], k_func.x[0]), min(wavelength_range[1], k_func.x[-1]))
+    return tuple(wavelength_range)
@@ -35,7 +35,10 @@ def Clausius_Mossotti(radius: float, medium_permittivity: float, particle_permit
     return polarizability
 
 
-def Mie_size_dipole_approximation(radius: float, medium_permittivity: float, particle_permittivity: float, wave_number: float) -> complex:
+def Mie_size_dipole_approximation(radius: float | np.ndarray,
+                                  medium_permittivity: float | np.ndarray,
+                                  particle_permittivity: complex | np.ndarray,
+                                  wave_number: float | np.ndarray) -> complex | np.ndarray:
     """
     Calculate the polarizability of a spherical particle using Mie size dipole approximation.
     The bessel and hankel functions are expanded to second order in size parameter.
@@ -54,7 +57,7 @@ def Mie_size_dipole_approximation(radius: float, medium_permittivity: float, par
     Returns
     -------
     complex
-        The polarizability of the spherical particle using Mie size expansion. 
+        The polarizability of the spherical particle using Mie size expansion. Array arguments are broadcast together.
 
     Notes
     -----
@@ -84,7 +87,10 @@ def Mie_size_dipole_approximation(radius: float, medium_permittivity: float, par
 
     return polarizability_mie
 
-def Mie_electric_dipole_polarizability(radius: float, medium_permittivity: float, particle_permittivity: float, wave_number: float) -> complex:
+def Mie_electric_dipole_polarizability(radius: float | np.ndarray,
+                                       medium_permittivity: float | np.ndarray,
+                                       particle_permittivity: complex | np.ndarray,
+                                       wave_number: float | np.ndarray) -> complex | np.ndarray:
     """
     Calculate the electric dipole polarizability of a spherical particle using Mie theory.
     
@@ -102,7 +108,8 @@ def Mie_electric_dipole_polarizability(radius: float, medium_permittivity: float
     Returns
     -------
     complex
-        The electric dipole polarizability of the spherical particle using Mie theory.
+        The electric dipole polarizability of the spherical particle using Mie theory. Array arguments are
+        broadcast together, e.g. radii of shape (N, 1) and frequencies of shape (M,) give shape (N, M).
     Notes
     -----
     The electric dipole polarizability is derived from the first Mie coefficient (a1).
@@ -111,19 +118,230 @@ def Mie_electric_dipole_polarizability(radius: float, medium_permittivity: float
     where k_m is the wave number in the medium and tE1 is the first Mie coefficient for the electric dipole.
     - Wave number and radius should be in consistent units.
     """
-    k_m = wave_number * medium_permittivity**0.5
-    k_p = wave_number * particle_permittivity**0.5
+    k_m = wave_number * np.sqrt(np.asarray(medium_permittivity, dtype=np.complex128))
+    k_p = wave_number * np.sqrt(np.asarray(particle_permittivity, dtype=np.complex128))
     x_p = k_p * radius
     x_m = k_m * radius
     eps_m = medium_permittivity
     eps_p = particle_permittivity
 
-    t11 = eps_p * sph_jn(1,x_p) * (sph_jn(1,x_m) + x_m * sph_jn(1,x_m,derivative=True))
-    t12 = eps_m * sph_jn(1,x_m) * (sph_jn(1,x_p) + x_p * sph_jn(1,x_p,derivative=True))
-    t21 = eps_m * hankel_plus(1,x_m) * (sph_jn(1,x_p) + x_p * sph_jn(1,x_p,derivative=True))
-    t22 = eps_p * sph_jn(1,x_p) * (hankel_plus(1,x_m) + x_m * hankel_plus(1,x_m,derivative=True))
+    # Each spherical Bessel function is evaluated once per argument array. The Riccati derivatives use
+    # (x z_1(x))' = x z_0(x) - z_1(x), which holds for j_n, y_n and the Hankel functions.
+    j0_p, j1_p = sph_jn(0, x_p), sph_jn(1, x_p)
+    j0_m, j1_m = sph_jn(0, x_m), sph_jn(1, x_m)
+    h0_m = j0_m * 1j - sph_yn(0, x_m)
+    h1_m = j1_m * 1j - sph_yn(1, x_m)
+    riccati_j_p = x_p * j0_p - j1_p
+    riccati_j_m = x_m * j0_m - j1_m
+    riccati_h_m = x_m * h0_m - h1_m
+
+    t11 = eps_p * j1_p * riccati_j_m
+    t12 = eps_m * j1_m * riccati_j_p
+    t21 = eps_m * h1_m * riccati_j_p
+    t22 = eps_p * j1_p * riccati_h_m
 
     tE1 = (t11 - t12) / (t21 - t22)
 
     alpha_e = 6 * np.pi / (k_m**3) * tE1
-    return alpha_e
\ No newline at end of file
+    return alpha_e[()] if np.ndim(alpha_e) == 0 else alpha_e
+
+def Mie_coefficients(radius: float | np.ndarray,
+                     medium_permittivity: float | np.ndarray,
+                     particle_permittivity: complex | np.ndarray,
+                     wave_number: float | np.ndarray,
+                     n_max: int | None = None) -> tuple:
+    """
+    Calculate the electric and magnetic Mie coefficients a_n and b_n of a spherical particle up to order n_max.
+
+    Parameters
+    ----------
+    radius :
+        The radius of the spherical particle.
+    medium_permittivity :
+        The permittivity of the surrounding medium.
+    particle_permittivity :
+        The permittivity of the particle material.
+    wave_number :
+        The wave number of the incident light (in vacuum).
+    n_max :
+        The highest multipole order. Default is the Wiscombe criterion x + 4 x^(1/3) + 2 for the largest size
+        parameter x = k_m * radius, which converges the cross sections.
+
+    Returns
+    -------
+    tuple
+        The coefficients a and b, complex arrays of shape (n_max,) + the broadcast shape of the arguments, where
+        a[n - 1] and b[n - 1] are the coefficients of order n. a[0] is the electric dipole, b[0] the magnetic
+        dipole and a[1] the electric quadrupole.
+
+    Notes
+    -----
+    The coefficients follow Bohren and Huffman, with the Riccati-Bessel functions psi_n(x) = x j_n(x),
+    chi_n(x) = -x y_n(x) and xi_n = psi_n - i chi_n:
+    a_n = [(D_n(mx)/m + n/x) psi_n(x) - psi_{n-1}(x)] / [(D_n(mx)/m + n/x) xi_n(x) - xi_{n-1}(x)]
+    b_n = [(m D_n(mx) + n/x) psi_n(x) - psi_{n-1}(x)] / [(m D_n(mx) + n/x) xi_n(x) - xi_{n-1}(x)]
+    where m is the relative refractive index and D_n = psi_n'/psi_n. All orders are computed in one pass of
+    recurrences, each step being one vectorized operation over the arguments:
+    - D_n(mx) by downward recurrence, stable for any m.
+    - chi_n by upward recurrence, which is stable because chi_n grows with n.
+    - psi_n by upward recurrence while n <= |x|, and above |x|, where psi_n decays and the upward recurrence loses
+    precision, from the ratios psi_n/psi_{n-1} obtained by downward recurrence.
+    The electric dipole polarizability is 6 pi i a_1 / k_m^3, see Mie_electric_dipole_polarizability.
+    - Wave number and radius should be in consistent units.
+    """
+    k_m = wave_number * np.sqrt(np.asarray(medium_permittivity, dtype=np.complex128))
+    m = np.sqrt(np.asarray(particle_permittivity, dtype=np.complex128) / np.asarray(medium_permittivity, dtype=np.complex128))
+    x, m = np.broadcast_arrays(np.asarray(k_m * radius, dtype=np.complex128), m)
+    mx = m * x
+    abs_x = np.abs(x)
+    if n_max is None:
+        largest = abs_x.max(initial=0.0)
+        n_max = int(np.ceil(largest + 4 * largest**(1 / 3) + 2))
+    # The continued fractions converge slowly around n = |mx|, hence the margin growing as |mx|^(1/3).
+    largest_order = max(n_max, np.abs(mx).max(initial=0.0), abs_x.max(initial=0.0))
+    n_start = int(np.ceil(largest_order + 8 * largest_order**(1 / 3))) + 16
+
+    # Downward recurrences of D_n(mx) and of the ratios psi_n(x) / psi_{n-1}(x), started at 0 far above n_max.
+    log_derivative = np.zeros((n_max + 1,) + x.shape, dtype=np.complex128)
+    psi_ratio = np.zeros((n_max + 1,) + x.shape, dtype=np.complex128)
+    d = np.zeros(x.shape, dtype=np.complex128)
+    r = np.zeros(x.shape, dtype=np.complex128)
+    for n in range(n_start, 0, -1):
+        d = n / mx - 1 / (d + n / mx)
+        r = 1 / ((2 * n + 1) / x - r)
+        if n - 1 <= n_max:
+            log_derivative[n - 1] = d
+        if n <= n_max:
+            psi_ratio[n] = r
+
+    a = np.empty((n_max,) + x.shape, dtype=np.complex128)
+    b = np.empty((n_max,) + x.shape, dtype=np.complex128)
+    psi_previous, psi = np.cos(x), np.sin(x)
+    chi_previous, chi = -np.sin(x), np.cos(x)
+    with np.errstate(over="ignore", invalid="ignore"):
+        for n in range(1, n_max + 1):
+            psi_next = np.where(n <= abs_x, (2 * n - 1) / x * psi - psi_previous, psi_ratio[n] * psi)
+            chi_next = (2 * n - 1) / x * chi - chi_previous
+            xi, xi_next = psi - 1j * chi, psi_next - 1j * chi_next
+            electric_term = log_derivative[n] / m + n / x
+            magnetic_term = m * log_derivative[n] + n / x
+            a[n - 1] = (electric_term * psi_next - psi) / (electric_term * xi_next - xi)
+            b[n - 1] = (magnetic_term * psi_next - psi) / (magnetic_term * xi_next - xi)
+            psi_previous, psi = psi, psi_next
+            chi_previous, chi = chi, chi_next
+    # chi_n overflows only for orders far above the size parameter, whose coefficients vanish.
+    a[~np.isfinite(a)] = 0.0
+    b[~np.isfinite(b)] = 0.0
+    return a, b
+
+def Mie_efficiencies(radius: float | np.ndarray,
+                     medium_permittivity: float | np.ndarray,
+                     particle_permittivity: complex | np.ndarray,
+                     wave_number: float | np.ndarray,
+                     n_max: int | None = None) -> tuple:
+    """
+    Calculate the extinction and scattering efficiencies of a spherical particle from its Mie coefficients.
+
+    Parameters
+    ----------
+    radius, medium_permittivity, particle_permittivity, wave_number, n_max :
+        As in Mie_coefficients. The medium permittivity must be real.
+
+    Returns
+    -------
+    tuple
+        The extinction and scattering efficiencies, the cross sections divided by pi radius^2.
+
+    Notes
+    -----
+    Q_ext = 2/x^2 sum_n (2n + 1) Re(a_n + b_n) and Q_sca = 2/x^2 sum_n (2n + 1) (|a_n|^2 + |b_n|^2).
+    Comparing them with n_max = 1 and with the converged n_max shows the error of the dipole approximation.
+    """
+    a, b = Mie_coefficients(radius, medium_permittivity, particle_permittivity, wave_number, n_max)
+    x = np.real(wave_number * np.sqrt(medium_permittivity) * np.asarray(radius))
+    weights = (2 * np.arange(1, a.shape[0] + 1) + 1).reshape((-1,) + (1,) * (a.ndim - 1))
+    extinction = 2 / x**2 * np.sum(weights * (a + b).real, axis=0)
+    scattering = 2 / x**2 * np.sum(weights * (np.abs(a)**2 + np.abs(b)**2), axis=0)
+    return extinction, scattering
+
+def spheroid_depolarization_factors(axial_semi_axis: float, transverse_semi_axis: float) -> tuple:
+    """
+    Calculate the depolarization factors of a spheroid along and across its symmetry axis.
+
+    Parameters
+    ----------
+    axial_semi_axis :
+        The semi-axis along the symmetry axis.
+    transverse_semi_axis :
+        The two equal semi-axes perpendicular to the symmetry axis.
+
+    Returns
+    -------
+    tuple
+        The axial and transverse depolarization factors, which add up to 1 with the transverse one counted twice.
+
+    Notes
+    -----
+    For a prolate spheroid (rod-like, axial > transverse) with eccentricity e = sqrt(1 - b^2/a^2):
+    L_axial = (1 - e^2)/e^2 * (ln((1 + e)/(1 - e))/(2e) - 1).
+    For an oblate spheroid (disk-like, axial < transverse) with e = sqrt(1 - a^2/b^2):
+    L_axial = (1 - sqrt(1 - e^2) arcsin(e)/e)/e^2.
+    A sphere has L = 1/3 along every axis.
+    """
+
+    if axial_semi_axis <= 0 or transverse_semi_axis <= 0:
+        raise ValueError("The semi-axes must be positive.")
+    if np.isclose(axial_semi_axis, transverse_semi_axis, rtol=1e-8, atol=0):
+        return 1 / 3, 1 / 3
+
+    if axial_semi_axis > transverse_semi_axis:
+        e = np.sqrt(1 - (transverse_semi_axis / axial_semi_axis)**2)
+        axial_factor = (1 - e**2) / e**2 * (np.log((1 + e) / (1 - e)) / (2 * e) - 1)
+    else:
+        e = np.sqrt(1 - (axial_semi_axis / transverse_semi_axis)**2)
+        axial_factor = (1 - np.sqrt(1 - e**2) * np.arcsin(e) / e) / e**2
+    return axial_factor, (1 - axial_factor) / 2
+
+def quasistatic_spheroid_polarizability(axial_semi_axis: float,
+                                        transverse_semi_axis: float,
+                                        medium_permittivity: float,
+                                        particle_permittivity: complex,
+                                        wave_number: float) -> tuple:
+    """
+    Calculate the polarizabilities of a small spheroid along and across its symmetry axis.
+
+    Parameters
+    ----------
+    axial_semi_axis :
+        The semi-axis along the symmetry axis.
+    transverse_semi_axis :
+        The two equal semi-axes perpendicular to the symmetry axis.
+    medium_permittivity :
+        The permittivity of the surrounding medium.
+    particle_permittivity :
+        The permittivity of the particle material.
+    wave_number :
+        The wave number of the incident light (in vacuum).
+
+    Returns
+    -------
+    tuple
+        The axial and transverse polarizabilities.
+
+    Notes
+    -----
+    The quasi-static polarizability alpha_0 = V (ε - ε_m)/(ε_m + L (ε - ε_m)), with V the volume of the spheroid
+    and L the depolarization factor, is corrected for radiation reaction as alpha = alpha_0/(1 - i k_m^3 alpha_0/(6π)).
+    For a sphere alpha_0 is the Clausius-Mossotti polarizability.
+    - Wave number and semi-axes should be in consistent units.
+    """
+
+    k_m = wave_number * np.sqrt(medium_permittivity)
+    volume = 4 * np.pi / 3 * axial_semi_axis * transverse_semi_axis**2
+    contrast = particle_permittivity - medium_permittivity
+
+    polarizabilities = []
+    for factor in spheroid_depolarization_factors(axial_semi_axis, transverse_semi_axis):
+        alpha_0 = volume * contrast / (medium_permittivity + factor * contrast)
+        polarizabilities.append(alpha_0 / (1 - 1j * k_m**3 * alpha_0 / (6 * np.pi)))
+    return tuple(polarizabilities)
@@ -0,0 +1,222 @@
+import os
+import numpy as np
+from collections import OrderedDict
+from .polarizability_mod import Mie_electric_dipole_polarizability
+from .permittivity import material_permittivity, material_wavelength_range_um, get_material_cache_dir
+from .tools.unit_calcs import nm_to_eV, frequency_to_wavenumber_nm
+
+POLARIZABILITY_TABLE_CACHE_SIZE = 64
+
+_polarizability_tables = OrderedDict()
+
+class PolarizabilityTable:
+    """Mie dipole polarizability of a sphere tabulated over frequency, interpolated between the tabulated points."""
+
+    def __init__(self,
+                 frequencies: np.ndarray,
+                 polarizabilities: np.ndarray,
+                 material: str | None = None,
+                 radius_nm: float | None = None,
+                 medium_permittivity: float | None = None) -> None:
+        """
+        Initialize a PolarizabilityTable from tabulated values.
+
+        Parameters
+        ----------
+        frequencies :
+            Increasing frequencies in eV.
+        polarizabilities :
+            The complex polarizabilities in nm^3 at these frequencies.
+        material, radius_nm, medium_permittivity :
+            The parameters of the table, stored with it.
+        """
+
+        self.frequencies = np.asarray(frequencies, dtype=np.float64)
+        self.polarizabilities = np.asarray(polarizabilities, dtype=np.complex128)
+        self.material = material
+        self.radius_nm = radius_nm
+        self.medium_permittivity = medium_permittivity
+
+    def __len__(self) -> int:
+        return self.frequencies.shape[0]
+
+    @staticmethod
+    def evaluate(material, radius_nm: float, medium_permittivity: float, frequencies: np.ndarray) -> np.ndarray:
+        """
+        Compute the Mie dipole polarizability at an array of frequencies in eV.
+        """
+
+        return Mie_electric_dipole_polarizability(radius=radius_nm,
+                                                  medium_permittivity=medium_permittivity,
+                                                  particle_permittivity=material_permittivity(frequencies, material),
+                                                  wave_number=frequency_to_wavenumber_nm(frequencies))
+
+    @classmethod
+    def compute(cls,
+                material,
+                radius_nm: float,
+                medium_permittivity: float,
+                frequency_range: tuple | None = None,
+                tolerance: float = 1e-4,
+                initial_points: int = 65,
+                max_points: int = 20000) -> "PolarizabilityTable":
+        """
+        Tabulate the polarizability on a grid refined where it varies quickly.
+
+        Parameters
+        ----------
+        material :
+            The name of the material, or a dispersion model such as a fitted DrudeLorentzModel.
+        radius_nm :
+            The radius of the sphere in nanometers.
+        medium_permittivity :
+            The permittivity of the medium.
+        frequency_range :
+            The (minimum, maximum) frequencies in eV. Default is the range of the tabulated permittivity of the material,
+            or the fitted band of a dispersion model. It is required for dispersion models without a fitted band.
+        tolerance :
+            Target error of the linear interpolation, relative to the largest polarizability. Default is 1e-4.
+        initial_points :
+            Number of points of the initial uniform grid. Default is 65.
+        max_points :
+            The refinement stops when the grid has more points. Default is 20000.
+
+        Returns
+        -------
+        PolarizabilityTable
+            The table.
+
+        Notes
+        -----
+        Each refinement pass evaluates the midpoints of the intervals that are still refined, in one vectorized call,
+        and compares them with the linear interpolation of the endpoints. Intervals whose error exceeds the tolerance
+        are split again, so the points concentrate around the plasmon resonance and the kinks of the tabulated
+        permittivity, while the smooth parts of the spectrum keep the initial spacing.
+        """
+
+        if frequency_range is None and callable(material):
+            frequency_range = getattr(material, "frequency_range", None)
+            if frequency_range is None:
+                raise ValueError("The dispersion model has no frequency_range, so the frequency range of the table must be given.")
+        if frequency_range is None:
+            shortest_um, longest_um = material_wavelength_range_um(material)
+            frequency_range = (nm_to_eV(1000.0 * longest_um), nm_to_eV(1000.0 * shortest_um))
+
+        frequencies = np.linspace(frequency_range[0], frequency_range[1], initial_points)
+        values = cls.evaluate(material, radius_nm, medium_permittivity, frequencies)
+        refine = np.ones(initial_points - 1, dtype=bool)
+        while refine.any() and frequencies.shape[0] < max_points:
+            intervals = np.flatnonzero(refine)
+            midpoints = 0.5 * (frequencies[intervals] + frequencies[intervals + 1])
+            midpoint_values = cls.evaluate(material, radius_nm, medium_permittivity, midpoints)
+            error = np.abs(midpoint_values - 0.5 * (values[intervals] + values[intervals + 1]))
+            scale = max(np.nanmax(np.abs(values)), np.nanmax(np.abs(midpoint_values)))
+            split = error > tolerance * scale
+
+            # Interval i becomes one interval if it was not refined, or two that are refined again if the error was large.
+            new_refine = np.repeat(split, 2)
+            refine_counts = np.where(refine, 2, 1)
+            next_refine = np.zeros(refine_counts.sum(), dtype=bool)
+            starts = np.cumsum(refine_counts) - refine_counts
+            next_refine[(starts[intervals][:, None] + np.arange(2)).ravel()] = new_refine
+
+            frequencies = np.insert(frequencies, intervals + 1, midpoints)
+            values = np.insert(values, intervals + 1, midpoint_values)
+            refine = next_refine
+        return cls(frequencies, values, material, radius_nm, medium_permittivity)
+
+    def contains(self, frequency: float | np.ndarray) -> bool:
+        """Check if all the frequencies are within the range of the table."""
+        return bool(np.all((frequency >= self.frequencies[0]) & (frequency <= self.frequencies[-1])))
+
+    def __call__(self, frequency: float | np.ndarray) -> complex | np.ndarray:
+        """
+        Interpolate the polarizability at frequencies in eV, NaN outside of the table.
+        """
+
+        real = np.interp(frequency, self.frequencies, self.polarizabilities.real, left=np.nan, right=np.nan)
+        imag = np.interp(frequency, self.frequencies, self.polarizabilities.imag, left=np.nan, right=np.nan)
+        return real + 1j * imag
+
+    def save(self, filename: str) -> None:
+        """Save the table to a .npz file."""
+        np.savez(filename, frequencies=self.frequencies, polarizabilities=self.polarizabilities,
+                 material=np.str_(self.material or ""), radius_nm=np.float64(np.nan if self.radius_nm is None else self.radius_nm),
+                 medium_permittivity=np.float64(np.nan if self.medium_permittivity is None else self.medium_permittivity))
+
+    @classmethod
+    def load(cls, filename: str) -> "PolarizabilityTable":
+        """Load a table saved with PolarizabilityTable.save."""
+        with np.load(filename) as data:
+            return cls(data["frequencies"], data["polarizabilities"], str(data["material"]) or None,
+                       float(data["radius_nm"]), float(data["medium_permittivity"]))
+
+def _polarizability_table_file(key: tuple) -> str | None:
+    directory = get_material_cache_dir()
+    if directory is None or not isinstance(key[0], str):
+        return None
+    material, radius_nm, medium_permittivity, frequency_range, tolerance, initial_points, max_points = key
+    band = "full" if frequency_range is None else f"{frequency_range[0]:.12g}-{frequency_range[1]:.12g}eV"
+    return os.path.join(directory, f"polarizability_{material}_{radius_nm:.12g}nm_{medium_permittivity:.12g}_{band}"
+                                   f"_{tolerance:.6g}_{initial_points}_{max_points}.npz")
+
+def get_polarizability_table(material,
+                             radius_nm: float,
+                             medium_permittivity: float,
+                             frequency_range: tuple | None = None,
+                             tolerance: float = 1e-4,
+                             initial_points: int = 65,
+                             max_points: int = 20000) -> PolarizabilityTable:
+    """
+    Obtain the polarizability table of a sphere, computing it only on the first request.
+
+    Parameters
+    ----------
+    material :
+        The name of the material, or a dispersion model such as a fitted DrudeLorentzModel.
+    radius_nm :
+        The radius of the sphere in nanometers.
+    medium_permittivity :
+        The permittivity of the medium.
+    frequency_range, tolerance, initial_points, max_points :
+        The arguments of PolarizabilityTable.compute.
+
+    Returns
+    -------
+    PolarizabilityTable
+        The table.
+
+    Notes
+    -----
+    Tables are keyed by all the parameters, so a request with another tolerance or frequency range computes
+    its own table. They are kept in a process-wide cache that holds the POLARIZABILITY_TABLE_CACHE_SIZE most
+    recently used tables, and stored in the on-disk cache directory of the material tables if it is set, see
+    set_material_cache_dir. Tables of dispersion models are only kept in memory.
+    """
+
+    if frequency_range is not None:
+        frequency_range = (float(frequency_range[0]), float(frequency_range[1]))
+    key = (material, float(radius_nm), float(medium_permittivity), frequency_range, float(tolerance), int(initial_points), int(max_points))
+    table = _polarizability_tables.get(key)
+    if table is not None:
+        _polarizability_tables.move_to_end(key)
+        return table
+
+    filename = _polarizability_table_file(key)
+    if filename is not None and os.path.exists(filename):
+        table = PolarizabilityTable.load(filename)
+    else:
+        table = PolarizabilityTable.compute(*key)
+        if filename is not None:
+            temporary = filename + ".tmp.npz"
+            table.save(temporary)
+            os.replace(temporary, filename)
+
+    _polarizability_tables[key] = table
+    while len(_polarizability_tables) > POLARIZABILITY_TABLE_CACHE_SIZE:
+        _polarizability_tables.popitem(last=False)
+    return table
+
+def clear_polarizability_tables() -> None:
+    """Empty the in-memory cache of polarizability tables."""
+    _polarizability_tables.clear()
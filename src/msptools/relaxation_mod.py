@@ -0,0 +1,212 @@
+import numpy as np
+from typing import Callable, List
+from .tools.unit_calcs import get_multiplier_nanometers
+from .dynamics_mod import _mobile_mask, _total_forces
+
+RELAXATION_METHODS = ("FIRE", "LBFGS")
+
+def relax(system,
+          method: str = "FIRE",
+          force_tolerance: float = 1e-3,
+          max_steps: int = 1000,
+          max_step: float = 1.0,
+          fixed: np.ndarray | List[int] | None = None,
+          extra_forces: Callable[[np.ndarray], np.ndarray] | None = None,
+          remove_net_force: bool = False,
+          **options) -> dict:
+    """
+    Move the particles of a System to a configuration where the forces vanish.
+
+    Parameters
+    ----------
+    system :
+        The System to relax. Its positions are updated in place.
+    method :
+        Either 'FIRE' (fast inertial relaxation engine) or 'LBFGS' (limited-memory BFGS). Default is 'FIRE'.
+    force_tolerance :
+        The relaxation stops when the norm of the force on every mobile particle is below this value. Default is 1e-3.
+    max_steps :
+        Maximum number of steps. Default is 1000.
+    max_step :
+        Maximum displacement of a particle in one step, in the positions unit of the system. Default is 1.
+    fixed :
+        Indices, or boolean mask, of the particles that do not move.
+    extra_forces :
+        Callable returning additional forces of shape (N, 3) for the positions of shape (N, 3), in the
+        positions unit of the system, e.g. optical traps.
+    remove_net_force :
+        If True, the mean force on the mobile particles is subtracted, so the relaxation finds configurations
+        that move rigidly, e.g. optically bound structures pushed by the radiation pressure. Default is False.
+    **options :
+        Options of the method. FIRE: time_step, max_time_step, min_steps, time_step_increase,
+        time_step_decrease, alpha_start, alpha_decrease. LBFGS: memory.
+
+    Returns
+    -------
+    dict
+        The final positions and forces, whether the relaxation converged, and the number of steps and force evaluations.
+
+    Notes
+    -----
+    Optical forces are not conservative, so there is no energy to drive a line search. Both methods only use
+    the forces: FIRE through the power F·v and L-BFGS through force differences, with a step length bounded
+    by max_step and a reset to steepest descent when the quasi-Newton direction opposes the forces.
+    Each force evaluation reuses the Green's tensors of the particles that did not move and warm starts
+    the MSP solve from the previous configuration.
+    """
+
+    if method not in RELAXATION_METHODS:
+        raise ValueError("Unknown relaxation method: {}. Expected one of {}".format(method, RELAXATION_METHODS))
+    if force_tolerance <= 0 or max_step <= 0:
+        raise ValueError("force_tolerance and max_step must be positive.")
+
+    forces_function = _RelaxationForces(system, fixed, extra_forces, remove_net_force)
+    positions = system.particles.get_positions() / get_multiplier_nanometers(system.positions_unit)
+
+    if method == "FIRE":
+        positions, forces, converged, num_steps = _relax_FIRE(forces_function, positions, force_tolerance, max_steps, max_step, **options)
+    else:
+        positions, forces, converged, num_steps = _relax_LBFGS(forces_function, positions, force_tolerance, max_steps, max_step, **options)
+
+    return {"positions": positions,
+            "forces": forces,
+            "converged": converged,
+            "num_steps": num_steps,
+            "num_force_evaluations": forces_function.num_evaluations}
+
+class _RelaxationForces:
+    """Forces on the mobile particles of a System as a function of the positions."""
+
+    def __init__(self, system, fixed, extra_forces, remove_net_force) -> None:
+        from . import ForceCalculator
+
+        self.system = system
+        self.force_calculator = ForceCalculator(system)
+        self.extra_forces = extra_forces
+        self.remove_net_force = remove_net_force
+        self.num_evaluations = 0
+        self.mobile = _mobile_mask(len(system.particles), fixed)
+        self.mobile_indices = np.flatnonzero(self.mobile)
+
+    def __call__(self, positions: np.ndarray) -> np.ndarray:
+        self.system.set_positions(positions)
+        self.num_evaluations += 1
+
+        forces = _total_forces(self.force_calculator, positions, self.mobile, self.mobile_indices, self.extra_forces)
+        if self.remove_net_force and self.mobile_indices.shape[0] > 0:
+            forces[self.mobile] -= forces[self.mobile].mean(axis=0)
+        return forces
+
+def _max_norm(vectors: np.ndarray) -> float:
+    return float(np.max(np.linalg.norm(vectors, axis=-1), initial=0.0))
+
+def _limit_step(displacement: np.ndarray, max_step: float) -> np.ndarray:
+    """
+    Scale a displacement so that no particle moves more than max_step.
+    """
+
+    largest = _max_norm(displacement)
+    if largest > max_step:
+        displacement = displacement * (max_step / largest)
+    return displacement
+
+def _relax_FIRE(forces_function, positions, force_tolerance, max_steps, max_step,
+                time_step=None, max_time_step=None, min_steps=5, time_step_increase=1.1,
+                time_step_decrease=0.5, alpha_start=0.1, alpha_decrease=0.99):
+    """
+    FIRE minimization with unit masses. The default time step moves the most loaded particle by
+    max_step / 10 in the first step.
+    """
+
+    forces = forces_function(positions)
+    if time_step is None:
+        time_step = np.sqrt(0.2 * max_step / max(_max_norm(forces), np.finfo(float).tiny))
+    if max_time_step is None:
+        max_time_step = 10 * time_step
+
+    velocities = np.zeros_like(positions)
+    alpha = alpha_start
+    num_positive = 0
+    for step in range(max_steps):
+        if _max_norm(forces) < force_tolerance:
+            return positions, forces, True, step
+
+        power = np.sum(forces * velocities)
+        if power > 0:
+            force_norm = np.linalg.norm(forces)
+            velocities = (1 - alpha) * velocities + alpha * np.linalg.norm(velocities) * forces / force_norm
+            num_positive += 1
+            if num_positive > min_steps:
+                time_step = min(time_step * time_step_increase, max_time_step)
+                alpha *= alpha_decrease
+        else:
+            velocities[:] = 0.0
+            time_step *= time_step_decrease
+            alpha = alpha_start
+            num_positive = 0
+
+        velocities += time_step * forces
+        positions = positions + _limit_step(time_step * velocities, max_step)
+        forces = forces_function(positions)
+
+    return positions, forces, _max_norm(forces) < force_tolerance, max_steps
+
+def _relax_LBFGS(forces_function, positions, force_tolerance, max_steps, max_step, memory=10):
+    """
+    Limited-memory BFGS minimization driven by the forces only, with the two-loop recursion.
+    """
+
+    forces = forces_function(positions)
+    initial_inverse_curvature = max_step / max(_max_norm(forces), np.finfo(float).tiny)
+    steps = []
+    force_changes = []
+
+    for step in range(max_steps):
+        if _max_norm(forces) < force_tolerance:
+            return positions, forces, True, step
+
+        direction = _two_loop_direction(forces, steps, force_changes, initial_inverse_curvature)
+        if np.sum(direction * forces) <= 0:
+            steps.clear()
+            force_changes.clear()
+            direction = initial_inverse_curvature * forces
+
+        displacement = _limit_step(direction, max_step)
+        new_positions = positions + displacement
+        new_forces = forces_function(new_positions)
+
+        # The gradient change is y = -(F_new - F); curvature pairs with s·y <= 0 are skipped.
+        gradient_change = forces - new_forces
+        if np.sum(displacement * gradient_change) > 0:
+            steps.append(displacement)
+            force_changes.append(gradient_change)
+            if len(steps) > memory:
+                steps.pop(0)
+                force_changes.pop(0)
+
+        positions, forces = new_positions, new_forces
+
+    return positions, forces, _max_norm(forces) < force_tolerance, max_steps
+
+def _two_loop_direction(forces, steps, gradient_changes, initial_inverse_curvature):
+    """
+    Apply the L-BFGS inverse Hessian approximation to the forces, i.e. to minus the gradient.
+    """
+
+    direction = forces.copy()
+    coefficients = []
+    for step, gradient_change in zip(reversed(steps), reversed(gradient_changes)):
+        rho = 1.0 / np.sum(step * gradient_change)
+        coefficient = rho * np.sum(step * direction)
+        direction -= coefficient * gradient_change
+        coefficients.append((rho, coefficient))
+
+    if steps:
+        direction *= np.sum(steps[-1] * gradient_changes[-1]) / np.sum(gradient_changes[-1] * gradient_changes[-1])
+    else:
+        direction *= initial_inverse_curvature
+
+    for (step, gradient_change), (rho, coefficient) in zip(zip(steps, gradient_changes), reversed(coefficients)):
+        beta = rho * np.sum(gradient_change * direction)
+        direction += (coefficient - beta) * step
+    return direction
@@ -0,0 +1,130 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class SpatialIndex:
+    """k-d tree of particle positions for neighbour and overlap queries, updated incrementally when particles move."""
+
+    def __init__(self, positions: np.ndarray, rebuild_fraction: float = 0.25) -> None:
+        """
+        Build the index of the positions.
+
+        Parameters
+        ----------
+        positions :
+            Positions of shape (N, d).
+        rebuild_fraction :
+            The tree is rebuilt when more than this fraction of the particles moved since it was built.
+            Default is 0.25.
+
+        Notes
+        -----
+        Moving a particle does not rebuild the tree. The particle is marked as moved and kept in a small
+        tree of the moved particles, and queries combine the main tree, without the moved particles, with
+        the small tree. Both queries cost O(log N) per point, so single-particle moves stay cheap until
+        the rebuild.
+        """
+
+        self.rebuild_fraction = rebuild_fraction
+        self.positions = np.array(positions, dtype=np.float64)
+        self._build()
+
+    def __len__(self) -> int:
+        return self.positions.shape[0]
+
+    def _build(self) -> None:
+        self.tree = cKDTree(self.positions)
+        self.moved = np.zeros(self.positions.shape[0], dtype=bool)
+        self._moved_indices = np.empty(0, dtype=np.int64)
+        self._moved_tree = None
+
+    def update(self, index: int, position: np.ndarray) -> None:
+        """
+        Move one particle.
+
+        Parameters
+        ----------
+        index :
+            The index of the particle.
+        position :
+            Its new position.
+        """
+
+        self.positions[index] = position
+        index = index % self.positions.shape[0]
+        if not self.moved[index]:
+            self.moved[index] = True
+            self._moved_indices = np.append(self._moved_indices, index)
+        if self._moved_indices.shape[0] > self.rebuild_fraction * self.positions.shape[0]:
+            self._build()
+        else:
+            self._moved_tree = None
+
+    def _moved_points_tree(self) -> cKDTree:
+        if self._moved_tree is None:
+            self._moved_tree = cKDTree(self.positions[self._moved_indices])
+        return self._moved_tree
+
+    def query_radius(self, points: np.ndarray, radius: float) -> list:
+        """
+        Find the particles within a distance of each point.
+
+        Parameters
+        ----------
+        points :
+            Points of shape (P, d).
+        radius :
+            The distance.
+
+        Returns
+        -------
+        list
+            For each point, the sorted array of the indices of the particles within radius.
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, self.positions.shape[1])
+        neighbours = self.tree.query_ball_point(points, radius)
+        if self._moved_indices.shape[0] == 0:
+            return [np.sort(np.asarray(indices, dtype=np.int64)) for indices in neighbours]
+
+        moved_neighbours = self._moved_points_tree().query_ball_point(points, radius)
+        result = []
+        for indices, moved_indices in zip(neighbours, moved_neighbours):
+            indices = np.asarray(indices, dtype=np.int64)
+            indices = np.concatenate([indices[~self.moved[indices]], self._moved_indices[np.asarray(moved_indices, dtype=np.int64)]])
+            result.append(np.sort(indices))
+        return result
+
+    def query_pairs(self, radius: float) -> np.ndarray:
+        """
+        Find the pairs of particles closer than a distance.
+
+        Parameters
+        ----------
+        radius :
+            The distance.
+
+        Returns
+        -------
+        np.ndarray
+            Integer array of shape (P, 2) of the pairs (i, j) with i < j and |x_i - x_j| <= radius, sorted
+            lexicographically.
+        """
+
+        pairs = self.tree.query_pairs(radius, output_type='ndarray').astype(np.int64)
+        if self._moved_indices.shape[0] > 0:
+            pairs = pairs[~(self.moved[pairs[:, 0]] | self.moved[pairs[:, 1]])]
+            moved_tree = self._moved_points_tree()
+            # Pairs of two moved particles.
+            moved_pairs = self._moved_indices[moved_tree.query_pairs(radius, output_type='ndarray')]
+            # Pairs of a moved particle and a particle that did not move, whose position in the main tree is current.
+            neighbours = self.tree.query_ball_point(self.positions[self._moved_indices], radius)
+            mixed_pairs = []
+            for moved, indices in zip(self._moved_indices, neighbours):
+                indices = np.asarray(indices, dtype=np.int64)
+                indices = indices[~self.moved[indices]]
+                mixed_pairs.append(np.stack([np.full(indices.shape[0], moved), indices], axis=-1))
+            pairs = np.sort(np.concatenate([pairs, moved_pairs.reshape(-1, 2)] + mixed_pairs).astype(np.int64), axis=1)
+        if pairs.shape[0] == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
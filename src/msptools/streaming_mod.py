@@ -0,0 +1,175 @@
+import copy
+import queue
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List
+from .tools.parallel_tools import resolve_num_workers
+
+RESULTS = ("positions", "field", "dipoles", "forces")
+
+_worker_state = {}
+
+def prefetch(iterable: Iterable, buffer_size: int = 2) -> Iterator:
+    """
+    Iterate over an iterable in a background thread, reading ahead of the consumer.
+
+    Parameters
+    ----------
+    iterable :
+        The source, e.g. a generator of configurations or a ResultsReader.
+    buffer_size :
+        The maximum number of items read ahead. Default is 2.
+
+    Yields
+    ------
+    object
+        The items of the iterable, in order. Exceptions raised by the source are raised in the consumer.
+
+    Notes
+    -----
+    The file reads or configuration generation of the next items overlap with the work on the current
+    one, while at most buffer_size items are held in memory. The thread stops when the consumer stops.
+    """
+
+    if buffer_size < 1:
+        raise ValueError(f"buffer_size must be a positive integer, got {buffer_size}.")
+    items = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+        except BaseException as exception:
+            put((False, exception))
+            return
+        put((False, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            is_item, value = items.get()
+            if not is_item:
+                if value is not None:
+                    raise value
+                return
+            yield value
+    finally:
+        stop.set()
+
+def stream_results(system,
+                   configurations: Iterable,
+                   results: List[str] | tuple = ("forces",),
+                   prefetch_size: int = 2,
+                   num_workers: int | None = 1,
+                   max_pending: int | None = None) -> Iterator[dict]:
+    """
+    Compute results for a stream of configurations of the particles of a System, one at a time.
+
+    Parameters
+    ----------
+    system :
+        The base System. Its field, medium, particle types and polarizabilities are used, and it is not modified.
+    configurations :
+        Iterable of positions of shape (N, 3) in the positions unit of the system, or of dicts with a
+        'positions' entry, such as the frames of a ResultsReader. N is the number of particles of the system.
+    results :
+        The results to compute, among 'positions', 'field', 'dipoles' and 'forces'. Default is ('forces',).
+    prefetch_size :
+        Number of configurations read ahead in a background thread. Default is 2.
+    num_workers :
+        Number of worker processes. None uses all the available cores and 1 computes in the current process.
+    max_pending :
+        Maximum number of configurations submitted to the workers and not yet yielded. Default is twice the
+        number of workers.
+
+    Yields
+    ------
+    dict
+        The requested results of each configuration, in the order of the configurations. They can be
+        passed to ResultsWriter.write_frame.
+
+    Notes
+    -----
+    Only the prefetched and pending configurations are held in memory, so arbitrarily long streams are
+    processed in bounded memory. Each process keeps one working copy of the system, so consecutive similar
+    configurations reuse the Green's tensors of the moved particles and warm start the MSP solution.
+    """
+
+    unknown = set(results) - set(RESULTS)
+    if unknown:
+        raise ValueError(f"Unknown results {sorted(unknown)}, expected some of {list(RESULTS)}.")
+    results = tuple(results)
+    num_workers = resolve_num_workers(num_workers)
+    source = prefetch((_configuration_positions(configuration) for configuration in configurations), prefetch_size)
+
+    if num_workers == 1:
+        working_system = _working_copy(system)
+        for positions in source:
+            yield _compute_results(working_system, positions, results)
+        return
+
+    max_pending = 2 * num_workers if max_pending is None else max_pending
+    if max_pending < 1:
+        raise ValueError(f"max_pending must be a positive integer, got {max_pending}.")
+    # The base system is pickled once per worker, and the results are yielded in submission order.
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_initialize_worker, initargs=(system,)) as pool:
+        pending = deque()
+        for positions in source:
+            pending.append(pool.submit(_stream_task, positions, results))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _configuration_positions(configuration) -> np.ndarray:
+    if isinstance(configuration, dict):
+        configuration = configuration["positions"]
+    return np.asarray(configuration, dtype=np.float64)
+
+def _working_copy(system):
+    """
+    Copy of the system with its own particles and cache, so the base system is not modified.
+    """
+
+    working_system = copy.copy(system)
+    working_system.clear_cache()
+    working_system.particles = system.particles.copy()
+    return working_system
+
+def _compute_results(system, positions: np.ndarray, results: tuple) -> dict:
+    from . import ForceCalculator
+
+    if positions.shape != (len(system.particles), 3):
+        raise ValueError(f"Configurations must have shape ({len(system.particles)}, 3), got {positions.shape}.")
+    system.set_positions(positions)
+    output = {}
+    for name in results:
+        if name == "positions":
+            output[name] = positions.copy()
+        elif name == "field":
+            output[name] = system.get_field_in_particles().copy()
+        elif name == "dipoles":
+            output[name] = system.get_dipole_moments().copy()
+        else:
+            output[name] = ForceCalculator(system).compute_forces()
+    return output
+
+def _initialize_worker(system) -> None:
+    _worker_state["system"] = _working_copy(system)
+
+def _stream_task(positions: np.ndarray, results: tuple) -> dict:
+    return _compute_results(_worker_state["system"], positions, results)
@@ -0,0 +1,212 @@
+import itertools
+import copy
+import os
+import sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Sequence
+from .tools.unit_calcs import wavelength_to_nm, get_multiplier_nanometers
+from .tools.parallel_tools import resolve_num_workers
+
+_worker_state = {}
+
+def sweep_forces(system,
+                 positions: np.ndarray | None = None,
+                 wavelengths: Sequence[float] | np.ndarray | None = None,
+                 polarizations: Sequence[List[float]] | np.ndarray | None = None,
+                 medium_permittivities: Sequence[float] | np.ndarray | None = None,
+                 grid: bool = False,
+                 wavelength_unit: str = "nm",
+                 num_workers: int | None = None,
+                 chunksize: int = 1) -> np.ndarray:
+    """
+    Compute the optical forces of a System over a list of configurations or a parameter grid using a process pool.
+
+    Parameters
+    ----------
+    system :
+        The base System. Its particles, field and medium are used for every parameter that is not swept.
+    positions :
+        Stack of configurations of shape (B, N, 3), in the positions unit of the system.
+    wavelengths :
+        Wavelengths of the external field, in wavelength_unit.
+    polarizations :
+        Polarization vectors of the external field.
+    medium_permittivities :
+        Permittivities of the medium.
+    grid :
+        If False, the swept parameters are zipped: they must all have the same length B and task b uses the b-th
+        element of each one. If True, the Cartesian product of the swept parameters is computed.
+    wavelength_unit :
+        The unit of the wavelengths. Default is 'nm'.
+    num_workers :
+        Number of worker processes. None uses all the available cores and 1 runs the sweep in the current process.
+    chunksize :
+        Number of tasks sent to a worker at once.
+
+    Returns
+    -------
+    np.ndarray
+        The forces, stacked in task order. The shape is (B, N, 3) for zipped sweeps and
+        (len(parameter_1), ..., len(parameter_k), N, 3) for grids, in the order of the arguments above.
+
+    Notes
+    -----
+    The base system is sent once to each worker and the stack of configurations is placed in a shared memory
+    block that the workers attach to, so neither is pickled for each task. Sweeps over wavelength or medium
+    permittivity recompute the polarizability of each particle type once, so every particle must have been
+    added with a type.
+    """
+
+    axes = {"positions": None if positions is None else np.asarray(positions, dtype=np.float64),
+            "wavelength": None if wavelengths is None else wavelength_to_nm(np.asarray(wavelengths, dtype=np.float64), wavelength_unit),
+            "polarization": None if polarizations is None else np.asarray(polarizations),
+            "medium_permittivity": None if medium_permittivities is None else np.asarray(medium_permittivities)}
+    axes = {name: values for name, values in axes.items() if values is not None}
+    if not axes:
+        raise ValueError("At least one of 'positions', 'wavelengths', 'polarizations' or 'medium_permittivities' must be specified.")
+    if "positions" in axes and axes["positions"].ndim != 3:
+        raise ValueError("Positions must be a stack of configurations of shape (B, N, 3).")
+    if ("wavelength" in axes or "medium_permittivity" in axes) and np.any(system.particles.type_indices < 0):
+        raise ValueError("Sweeps over wavelength or medium permittivity require every particle to have a type.")
+
+    lengths = [len(values) for values in axes.values()]
+    if grid:
+        index_tuples = list(itertools.product(*[range(length) for length in lengths]))
+        output_shape = tuple(lengths)
+    else:
+        if len(set(lengths)) != 1:
+            raise ValueError(f"Zipped sweep parameters must have the same length, got {lengths}.")
+        index_tuples = [(index,) * len(axes) for index in range(lengths[0])]
+        output_shape = (lengths[0],)
+
+    tasks = []
+    for indices in index_tuples:
+        task = dict.fromkeys(("positions", "wavelength", "polarization", "medium_permittivity"))
+        for name, index in zip(axes, indices):
+            task[name] = index if name == "positions" else axes[name][index]
+        tasks.append(task)
+
+    stacked_positions = axes.get("positions")
+    num_workers = resolve_num_workers(num_workers)
+
+    if num_workers == 1:
+        _store_worker_state(system, stacked_positions)
+        try:
+            results = [_sweep_task(task) for task in tasks]
+        finally:
+            _worker_state.clear()
+    else:
+        shared_block = None
+        shared_spec = None
+        if stacked_positions is not None:
+            shared_block = shared_memory.SharedMemory(create=True, size=max(stacked_positions.nbytes, 1))
+            np.ndarray(stacked_positions.shape, dtype=stacked_positions.dtype, buffer=shared_block.buf)[...] = stacked_positions
+            shared_spec = (shared_block.name, stacked_positions.shape, stacked_positions.dtype.str)
+        try:
+            # The base system is pickled once per worker, not once per task.
+            with ProcessPoolExecutor(max_workers=num_workers,
+                                     initializer=_initialize_worker,
+                                     initargs=(system, shared_spec)) as pool:
+                results = list(pool.map(_sweep_task, tasks, chunksize=chunksize))
+        finally:
+            if shared_block is not None:
+                shared_block.close()
+                shared_block.unlink()
+
+    return np.stack(results).reshape(output_shape + results[0].shape)
+
+def _initialize_worker(system, shared_spec) -> None:
+    """
+    Store the base system and attach the shared stack of configurations in a worker process.
+    """
+
+    if shared_spec is None:
+        _store_worker_state(system, None)
+        return
+    name, shape, dtype = shared_spec
+    # The parent process owns the block and unlinks it, so the workers must not track it.
+    if sys.version_info >= (3, 13):
+        shared_block = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shared_block = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # The resource tracker registers POSIX blocks under their name with a leading slash.
+            resource_tracker.unregister("/" + shared_block.name.lstrip("/"), "shared_memory")
+    _worker_state["shared_block"] = shared_block
+    _store_worker_state(system, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shared_block.buf))
+
+def _store_worker_state(system, positions) -> None:
+    """
+    Store the base system, the stack of configurations and the working copy of the base system of a worker.
+
+    Tasks that only change the positions reuse the working copy, so its cached Green's tensors and warm starts
+    carry over from one configuration to the next.
+    """
+
+    working_system = None
+    if positions is not None:
+        working_system = copy.copy(system)
+        working_system.clear_cache()
+        working_system.particles = system.particles.copy()
+    _worker_state.update(system=system, positions=positions, systems={}, working_system=working_system)
+
+def _sweep_task(task: dict) -> np.ndarray:
+    """
+    Compute the forces for one task of a sweep using the state of the current worker.
+    """
+
+    from . import ForceCalculator
+
+    base_system = _worker_state["system"]
+    key = (task["wavelength"],
+           None if task["polarization"] is None else tuple(task["polarization"]),
+           task["medium_permittivity"])
+    if key == (None, None, None):
+        system = base_system if task["positions"] is None else _worker_state["working_system"]
+    else:
+        if key not in _worker_state["systems"]:
+            _worker_state["systems"][key] = _configured_system(base_system, *key)
+        system = _worker_state["systems"][key]
+
+    if task["positions"] is None:
+        positions_nm = base_system.particles.get_positions()
+    else:
+        positions_nm = _worker_state["positions"][task["positions"]] * get_multiplier_nanometers(base_system.positions_unit)
+
+    if len(system.particles) != len(positions_nm):
+        raise ValueError("The configurations must have the same number of particles as the base system.")
+    system.particles.set_positions(positions_nm)
+
+    return ForceCalculator(system).compute_forces()
+
+def _configured_system(base_system, wavelength_nm, polarization, medium_permittivity):
+    """
+    Build a copy of base_system with the given field wavelength, polarization and medium permittivity.
+    """
+
+    from . import System
+
+    field = base_system.field
+    if not hasattr(field, "polarization"):
+        raise ValueError("Sweeps over field parameters require a field with direction, amplitude and polarization.")
+    field = type(field)(direction=field.direction,
+                        amplitude=field.amplitude,
+                        polarization=field.polarization if polarization is None else polarization,
+                        wavelength=field.get_wavelength() if wavelength_nm is None else wavelength_nm,
+                        wavelength_unit="nm")
+    if medium_permittivity is None:
+        medium_permittivity = base_system.medium_permittivity
+
+    system = System(particle_types=[copy.copy(ptype) for ptype in base_system.particle_types],
+                    field=field,
+                    positions_unit="nm",
+                    medium_permittivity=medium_permittivity,
+                    num_workers=base_system.num_workers)
+
+    system.particles = base_system.particles.copy()
+    if wavelength_nm is not None or medium_permittivity != base_system.medium_permittivity:
+        # The System constructor has already evaluated the types for the new field and medium.
+        system._assign_type_polarizabilities()
+    return system
@@ -0,0 +1,147 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def _g_functions(r, wave_number):
+    """
+    Compute G_0, G_1 and their radial derivatives for a single distance.
+
+    Mirrors G_0_function, G_1_function, G_0_derivative_function and
+    G_1_derivative_function from GreenTensor_Electric.
+    """
+    kr = wave_number * r
+    phase = np.exp(1j * kr) / (4 * np.pi * r)
+
+    g_0 = phase * (1 + 1j / kr - 1 / kr**2)
+    g_1 = -phase * (1 + 3j / kr - 3 / kr**2) / r**2
+    der_g_0 = wave_number * phase * (1j - 2 / kr - 3j / kr**2 + 3 / kr**3)
+    der_g_1 = -wave_number * phase / r**2 * (1j - 6 / kr - 15j / kr**2 + 15 / kr**3)
+
+    return g_0, g_1, der_g_0, der_g_1
+
+
+@njit(cache=True, nogil=True)
+def green_tensor_kernel(positions, wave_number, row_start, row_stop, out):
+    """
+    Fill the Green's tensor blocks of the pairs (i, j), j > i, for rows in [row_start, row_stop).
+
+    Each pair is computed once and mirrored into out[j, i].
+    """
+    num_particles, dimensions = positions.shape
+    R_vec = np.empty(dimensions)
+
+    for i in range(row_start, row_stop):
+        for j in range(i + 1, num_particles):
+            r2 = 0.0
+            for m in range(dimensions):
+                R_vec[m] = positions[i, m] - positions[j, m]
+                r2 += R_vec[m] * R_vec[m]
+            g_0, g_1, _, _ = _g_functions(np.sqrt(r2), wave_number)
+
+            for m in range(dimensions):
+                for n in range(dimensions):
+                    value = g_1 * R_vec[m] * R_vec[n]
+                    if m == n:
+                        value += g_0
+                    out[i, j, m, n] = value
+                    out[j, i, m, n] = value
+
+
+@njit(cache=True, nogil=True)
+def green_tensor_gradient_kernel(positions, wave_number, row_start, row_stop, out):
+    """
+    Fill the Green's tensor derivative blocks of the pairs (i, j), j > i, for rows in [row_start, row_stop).
+
+    Each pair is computed once and mirrored, with opposite sign, into out[j, i].
+    """
+    num_particles, dimensions = positions.shape
+    R_vec = np.empty(dimensions)
+
+    for i in range(row_start, row_stop):
+        for j in range(i + 1, num_particles):
+            r2 = 0.0
+            for m in range(dimensions):
+                R_vec[m] = positions[i, m] - positions[j, m]
+                r2 += R_vec[m] * R_vec[m]
+            r = np.sqrt(r2)
+            _, g_1, der_g_0, der_g_1 = _g_functions(r, wave_number)
+
+            for c in range(dimensions):
+                radial = R_vec[c] / r
+                for m in range(dimensions):
+                    for n in range(dimensions):
+                        value = der_g_1 * radial * R_vec[m] * R_vec[n]
+                        if m == n:
+                            value += der_g_0 * radial
+                        if m == c:
+                            value += g_1 * R_vec[n]
+                        if n == c:
+                            value += g_1 * R_vec[m]
+                        out[i, j, c, m, n] = value
+                        out[j, i, c, m, n] = -value
+
+
+@njit(cache=True, nogil=True)
+def green_tensor_matvec_kernel(positions, dipole_moments, wave_number, row_start, row_stop, out):
+    """
+    Compute out[i] = sum_j G_ij p_j for rows in [row_start, row_stop) without storing G.
+    """
+    num_particles, dimensions = positions.shape
+    R_vec = np.empty(dimensions)
+
+    for i in range(row_start, row_stop):
+        for m in range(dimensions):
+            out[i, m] = 0j
+        for j in range(num_particles):
+            if j == i:
+                continue
+            r2 = 0.0
+            for m in range(dimensions):
+                R_vec[m] = positions[i, m] - positions[j, m]
+                r2 += R_vec[m] * R_vec[m]
+            g_0, g_1, _, _ = _g_functions(np.sqrt(r2), wave_number)
+
+            projection = 0j
+            for m in range(dimensions):
+                projection += R_vec[m] * dipole_moments[j, m]
+            for m in range(dimensions):
+                out[i, m] += g_0 * dipole_moments[j, m] + g_1 * R_vec[m] * projection
+
+
+@njit(cache=True, nogil=True)
+def green_tensor_gradient_rows_kernel(positions, rows, wave_number, row_start, row_stop, out):
+    """
+    Fill the full Green's tensor derivative rows out[r, j] = dG(positions[rows[r]] - positions[j]) for r in [row_start, row_stop).
+    """
+    num_particles, dimensions = positions.shape
+    R_vec = np.empty(dimensions)
+
+    for r_index in range(row_start, row_stop):
+        i = rows[r_index]
+        for j in range(num_particles):
+            if j == i:
+                for c in range(dimensions):
+                    for m in range(dimensions):
+                        for n in range(dimensions):
+                            out[r_index, j, c, m, n] = 0j
+                continue
+            r2 = 0.0
+            for m in range(dimensions):
+                R_vec[m] = positions[i, m] - positions[j, m]
+                r2 += R_vec[m] * R_vec[m]
+            r = np.sqrt(r2)
+            _, g_1, der_g_0, der_g_1 = _g_functions(r, wave_number)
+
+            for c in range(dimensions):
+                radial = R_vec[c] / r
+                for m in range(dimensions):
+                    for n in range(dimensions):
+                        value = der_g_1 * radial * R_vec[m] * R_vec[n]
+                        if m == n:
+                            value += der_g_0 * radial
+                        if m == c:
+                            value += g_1 * R_vec[n]
+                        if n == c:
+                            value += g_1 * R_vec[m]
+                        out[r_index, j, c, m, n] = value
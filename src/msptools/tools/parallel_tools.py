@@ -0,0 +1,85 @@
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+
+def resolve_num_workers(num_workers: int | None) -> int:
+    """
+    Resolve the number of worker threads.
+
+    Parameters
+    ----------
+    num_workers :
+        Requested number of workers. None uses all the available cores.
+
+    Returns
+    -------
+    int
+        The number of workers to use.
+    """
+
+    if num_workers is None:
+        return os.cpu_count() or 1
+    if num_workers < 1:
+        raise ValueError(f"num_workers must be a positive integer, got {num_workers}.")
+    return int(num_workers)
+
+def row_blocks(num_rows: int, num_blocks: int, triangular: bool = False) -> List[Tuple[int, int]]:
+    """
+    Split the rows [0, num_rows) into contiguous blocks of similar cost.
+
+    Parameters
+    ----------
+    num_rows :
+        The number of rows to split.
+    num_blocks :
+        The maximum number of blocks.
+    triangular :
+        If True, row i is assumed to cost num_rows - 1 - i (upper triangle of a pair matrix).
+        Otherwise all rows have the same cost.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        The (start, stop) bounds of the non-empty blocks.
+    """
+
+    num_blocks = max(1, min(num_blocks, num_rows))
+    if triangular:
+        cost = np.cumsum(num_rows - 1 - np.arange(num_rows))
+        targets = cost[-1] * np.arange(1, num_blocks) / num_blocks if num_rows > 0 else []
+        bounds = np.searchsorted(cost, targets, side='left') + 1
+    else:
+        bounds = (num_rows * np.arange(1, num_blocks)) // num_blocks
+    bounds = np.unique(np.concatenate(([0], np.clip(bounds, 0, num_rows), [num_rows])))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+def run_row_blocks(function: Callable[[int, int], None], num_rows: int, num_workers: int | None = 1, triangular: bool = False) -> None:
+    """
+    Run function(row_start, row_stop) over row blocks, concurrently when num_workers > 1.
+
+    The function must write its results in place and release the GIL (NumPy operations on large arrays
+    or nogil compiled kernels) for the threads to run in parallel.
+
+    Parameters
+    ----------
+    function :
+        Callable computing the rows [row_start, row_stop).
+    num_rows :
+        The total number of rows.
+    num_workers :
+        Number of worker threads. None uses all the available cores.
+    triangular :
+        Whether the row cost decreases linearly as in the upper triangle of a pair matrix.
+    """
+
+    num_workers = resolve_num_workers(num_workers)
+    if num_workers == 1 or num_rows < 2:
+        function(0, num_rows)
+        return
+
+    blocks = row_blocks(num_rows, num_workers, triangular=triangular)
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        for future in [pool.submit(function, start, stop) for start, stop in blocks]:
+            future.result()
@@ -0,0 +1,49 @@
+import pytest
+import msptools as msp
+
+
+class ConstantPolarizabilityType(msp.ParticleType):
+    """Particle type with a polarizability that only depends on the frequency, without material data."""
+
+    def __init__(self, polarizability):
+        self.base_polarizability = polarizability
+
+    def compute_polarizability(self, frequency, medium_permittivity):
+        self.polarizability = self.base_polarizability * frequency / medium_permittivity
+
+
+@pytest.fixture(scope="session")
+def constant_type():
+    """Factory of ConstantPolarizabilityType."""
+    return ConstantPolarizabilityType
+
+@pytest.fixture(scope="session")
+def create_field():
+    """Factory of plane waves of 532 nm propagating along z."""
+
+    def create(amplitude=1.0, polarization=(1.0, 0.0, 0.0), wavelength=532):
+        return msp.PlaneWaveField(direction=[0, 0, 1], wavelength=wavelength, wavelength_unit="nm", amplitude=amplitude, polarization=list(polarization))
+    return create
+
+@pytest.fixture(scope="session")
+def create_type():
+    """Factory of gold spheres with a fixed polarizability, which needs no material data."""
+
+    def create(radius=10.0, polarizability=2000 + 1500j):
+        return msp.SphereType(radius=radius, material="Au", radius_unit="nm", polarizability=polarizability)
+    return create
+
+@pytest.fixture(scope="session")
+def create_system(create_field, create_type):
+    """
+    Factory of Systems in a plane wave of create_field, with positions in nanometers. The particles have the
+    first of particle_types, by default one type of create_type.
+    """
+
+    def create(positions, amplitude=1.0, particle_types=None, polarization=(1.0, 0.0, 0.0), wavelength=532, medium_permittivity=1.0):
+        system = msp.System(field=create_field(amplitude, polarization, wavelength), particle_types=create_type() if particle_types is None else particle_types,
+                            positions_unit="nm", medium_permittivity=medium_permittivity)
+        if len(positions) > 0:
+            system.add_particles(positions, particle_type=system.particle_types[0])
+        return system
+    return create
@@ -207,3 +207,130 @@ class Test_ConstructGreenTensorGradient:
         anti_transpose = -self.green_tensor_gradient.transpose(1, 0, 2, 3, 4)
         assert np.allclose(self.green_tensor_gradient, anti_transpose), "Green tensor gradient is not antisymmetric with respect to particle indices."
 
+
+
+def reference_green_tensors(positions, wave_number):
+    num_particles, dimensions = positions.shape
+    green_tensor = np.zeros((num_particles, num_particles, dimensions, dimensions), dtype=np.complex128)
+    green_tensor_derivative = np.zeros((num_particles, num_particles, dimensions, dimensions, dimensions), dtype=np.complex128)
+    for i in range(num_particles):
+        for j in range(i + 1, num_particles):
+            green_tensor[i, j] = pair_green_tensor(positions[i], positions[j], wave_number)
+            green_tensor[j, i] = green_tensor[i, j]
+            for coord in range(dimensions):
+                green_tensor_derivative[i, j, coord] = pair_green_tensor_derivative(positions[i], positions[j], coord, wave_number)
+                green_tensor_derivative[j, i, coord] = -green_tensor_derivative[i, j, coord]
+    return green_tensor, green_tensor_derivative
+
+@pytest.mark.parametrize("backend", [
+    'numpy',
+    pytest.param('numba', marks=pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba is not installed"))])
+class Test_Backends:
+
+    rng = np.random.default_rng(7)
+    positions = rng.random((12, 3)) * 40
+    dipole_moments = rng.random((12, 3)) + 1j * rng.random((12, 3))
+    wave_number = 0.05
+    green_tensor, green_tensor_derivative = reference_green_tensors(positions, wave_number)
+
+    def test_green_tensor(self, backend):
+        green_tensor = construct_green_tensor(self.positions, self.wave_number, backend=backend)
+        assert np.allclose(green_tensor, self.green_tensor, rtol=1e-12, atol=0), f"Green tensor from the {backend} backend does not match the reference."
+
+    def test_green_tensor_gradient(self, backend):
+        green_tensor_derivative = construct_green_tensor_gradient(self.positions, self.wave_number, backend=backend)
+        assert np.allclose(green_tensor_derivative, self.green_tensor_derivative, rtol=1e-12, atol=0), f"Green tensor gradient from the {backend} backend does not match the reference."
+
+    def test_matvec(self, backend):
+        product = green_tensor_matvec(self.positions, self.dipole_moments, self.wave_number, backend=backend)
+        expected = np.einsum('ijmn,jn->im', self.green_tensor, self.dipole_moments)
+        assert np.allclose(product, expected, rtol=1e-12, atol=0), f"Green tensor product from the {backend} backend does not match the reference."
+
+    def test_matvec_pair_blocks(self, backend, monkeypatch):
+        import msptools.GreenTensor_Electric as green_tensor_module
+        monkeypatch.setattr(green_tensor_module, "MATVEC_BLOCK_PAIRS", 2 * self.positions.shape[0] + 1)
+        product = green_tensor_matvec(self.positions, self.dipole_moments, self.wave_number, backend=backend)
+        expected = np.einsum('ijmn,jn->im', self.green_tensor, self.dipole_moments)
+        assert np.allclose(product, expected, rtol=1e-12, atol=0), f"Blocked Green tensor product from the {backend} backend does not match the reference."
+
+    @pytest.mark.parametrize("num_workers", [2, 5])
+    def test_threaded_row_blocks(self, backend, num_workers):
+        green_tensor = construct_green_tensor(self.positions, self.wave_number, backend=backend, num_workers=num_workers)
+        green_tensor_derivative = construct_green_tensor_gradient(self.positions, self.wave_number, backend=backend, num_workers=num_workers)
+        product = green_tensor_matvec(self.positions, self.dipole_moments, self.wave_number, backend=backend, num_workers=num_workers)
+
+        assert np.array_equal(green_tensor, construct_green_tensor(self.positions, self.wave_number, backend=backend)), "Threaded Green tensor differs from the serial one."
+        assert np.array_equal(green_tensor_derivative, construct_green_tensor_gradient(self.positions, self.wave_number, backend=backend)), "Threaded Green tensor gradient differs from the serial one."
+        assert np.allclose(product, green_tensor_matvec(self.positions, self.dipole_moments, self.wave_number, backend=backend), rtol=1e-14, atol=0), "Threaded Green tensor product differs from the serial one."
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        resolve_backend('fortran')
+
+
+class Test_BatchedGreenTensors:
+
+    rng = np.random.default_rng(3)
+    positions = rng.random((4, 5, 3)) * 30
+    wave_number = 0.1
+
+    def test_batched_green_tensor(self):
+        green_tensor = construct_green_tensor_batched(self.positions, self.wave_number)
+        for b, configuration in enumerate(self.positions):
+            assert np.allclose(green_tensor[b], construct_green_tensor(configuration, self.wave_number, backend='numpy')), f"Batched Green tensor {b} does not match."
+
+    def test_batched_green_tensor_gradient(self):
+        green_tensor_derivative = construct_green_tensor_gradient_batched(self.positions, self.wave_number)
+        for b, configuration in enumerate(self.positions):
+            assert np.allclose(green_tensor_derivative[b], construct_green_tensor_gradient(configuration, self.wave_number, backend='numpy')), f"Batched Green tensor gradient {b} does not match."
+
+
+@pytest.mark.parametrize("backend", [
+    'numpy',
+    pytest.param('numba', marks=pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba is not installed"))])
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_green_tensor_gradient_rows(backend, num_workers):
+    positions = np.random.default_rng(5).random((9, 3)) * 20
+    rows = np.array([4, 0, 8])
+    full = construct_green_tensor_gradient(positions, 0.2, backend='numpy')
+    selected = construct_green_tensor_gradient(positions, 0.2, backend=backend, num_workers=num_workers, rows=rows)
+
+    assert selected.shape == (3, 9, 3, 3, 3), "Selected rows should have shape (M, N, d, d, d)."
+    assert np.allclose(selected, full[rows], rtol=1e-12, atol=0), "Selected rows do not match the full Green tensor gradient."
+
+
+@pytest.mark.parametrize("backend", [
+    'numpy',
+    pytest.param('numba', marks=pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba is not installed"))])
+def test_green_tensor_gradient_negative_rows(backend):
+    positions = np.random.default_rng(5).random((9, 3)) * 20
+    full = construct_green_tensor_gradient(positions, 0.2, backend='numpy')
+    selected = construct_green_tensor_gradient(positions, 0.2, backend=backend, rows=[-1, -9])
+
+    assert np.allclose(selected, full[[8, 0]], rtol=1e-12, atol=0), "Negative rows should count from the last particle."
+    with pytest.raises(IndexError):
+        construct_green_tensor_gradient(positions, 0.2, backend=backend, rows=[9])
+
+
+class Test_UpdateGreenTensors:
+
+    rng = np.random.default_rng(7)
+    positions = rng.random((8, 3)) * 20
+    moved = np.array([1, 6])
+    wave_number = 0.2
+
+    def new_positions(self):
+        positions = self.positions.copy()
+        positions[self.moved] += self.rng.random((self.moved.shape[0], 3))
+        return positions
+
+    def test_update_green_tensor(self):
+        positions = self.new_positions()
+        green_tensor = update_green_tensor(construct_green_tensor(self.positions, self.wave_number), positions, self.moved, self.wave_number)
+        assert np.allclose(green_tensor, construct_green_tensor(positions, self.wave_number), rtol=1e-12, atol=0), "Updated Green tensor does not match the rebuilt one."
+
+    def test_update_green_tensor_gradient(self):
+        positions = self.new_positions()
+        green_tensor_derivative = update_green_tensor_gradient(construct_green_tensor_gradient(self.positions, self.wave_number), positions, self.moved, self.wave_number)
+        assert np.allclose(green_tensor_derivative, construct_green_tensor_gradient(positions, self.wave_number), rtol=1e-12, atol=0), "Updated Green tensor gradient does not match the rebuilt one."
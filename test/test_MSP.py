@@ -108,6 +108,23 @@ class Test_MSP_iterative:
 
         assert np.allclose(total_field, new_iteration_field, rtol=self.tolerance), "Total field did not converge to expected value with specified tolerance."
 
+    def test_warm_start(self):
+        small_green_tensor = 0.1 * self.green_tensor
+        total_field = array_MSP_iterative(self.polarizability, self.external_field, self.wave_number, small_green_tensor, tolerance=1e-10)
+        warm_field = array_MSP_iterative(self.polarizability, self.external_field, self.wave_number, small_green_tensor, num_iterations=2, initial_field=total_field)
+
+        assert np.allclose(warm_field, total_field, rtol=1e-8), "A converged initial field should be returned after one iteration."
+
+    def test_zero_external_component(self):
+        positions = np.array([[0, 0, 0], [3, 4, 0], [1, 6, 2]], dtype=float)
+        green_tensor = construct_green_tensor(positions, self.wave_number)
+        external_field = np.zeros((3, 3), dtype=complex)
+        external_field[:, 0] = 1.0
+        total_field = array_MSP_iterative(0.5, external_field, self.wave_number, green_tensor)
+        expected_field = array_MSP_inverse(0.5, external_field, self.wave_number, green_tensor)
+
+        assert np.allclose(total_field, expected_field, rtol=1e-5), "Scattering into a zero component of the external field is not a divergence."
+
 class Test_MSP_inverse:
     num_particles = 3
     dimension = 3
@@ -182,4 +199,55 @@ class Test_MSP_gradient_from_arrays:
         
         assert np.allclose(gradient, external_gradient), "Gradient should equal external gradient when green tensor derivative is zero."
     
-    
\ No newline at end of file
+    
+class Test_MSP_matrix_free:
+
+    positions = np.array([[0, 0, 0], [5, 0, 0], [0, 7, 1], [3, 3, 3]], dtype=float)
+    polarizability = 1.0 + 0.5j
+    external_field = np.random.rand(4, 3)
+    wave_number = 1.0
+
+    def test_consistency_with_iterative(self):
+        green_tensor = construct_green_tensor(self.positions, self.wave_number)
+        iterative_field = array_MSP_iterative(self.polarizability, self.external_field, self.wave_number, green_tensor)
+        matrix_free_field = array_MSP_matrix_free(self.polarizability, self.external_field, self.wave_number, self.positions)
+
+        assert np.allclose(iterative_field, matrix_free_field), "Fields from iterative and matrix-free methods did not match."
+
+class Test_MSP_inverse_batched:
+
+    polarizability = np.array([1.0 + 0.5j, 0.5 + 0.2j, 2.0 + 1.0j])
+    external_field = np.random.rand(4, 3, 3) + 1j * np.random.rand(4, 3, 3)
+    wave_number = 1.0
+    green_tensor = (np.random.rand(4, 3, 3, 3, 3) + 1j * np.random.rand(4, 3, 3, 3, 3)) * 1e-2
+
+    def test_consistency_with_inverse(self):
+        total_field = array_MSP_inverse_batched(self.polarizability, self.external_field, self.wave_number, self.green_tensor)
+        for b in range(self.external_field.shape[0]):
+            expected = array_MSP_inverse(self.polarizability, self.external_field[b], self.wave_number, self.green_tensor[b])
+            assert np.allclose(total_field[b], expected), f"Batched solution {b} does not match the inverse method."
+
+
+class Test_MSP_tensor_polarizabilities:
+
+    external_field = np.random.rand(3, 3) + 1j * np.random.rand(3, 3)
+    wave_number = 1.0
+    green_tensor = (np.random.rand(3, 3, 3, 3) + 1j * np.random.rand(3, 3, 3, 3)) * 1e-2
+    tensors = (np.random.rand(3, 3, 3) + 1j * np.random.rand(3, 3, 3))
+
+    def test_isotropic_tensors_match_scalars(self):
+        polarizability = np.array([1.0 + 0.5j, 0.5 + 0.2j, 2.0 + 1.0j])
+        tensors = polarizability[:, None, None] * np.eye(3)
+        scalar_field = array_MSP_inverse(polarizability, self.external_field, self.wave_number, self.green_tensor)
+        tensor_field = array_MSP_inverse(tensors, self.external_field, self.wave_number, self.green_tensor)
+        assert np.allclose(scalar_field, tensor_field), "Isotropic tensors should give the solution of the scalar polarizabilities."
+
+    def test_inverse_matches_dense_matrix(self):
+        total_field = array_MSP_inverse(self.tensors, self.external_field, self.wave_number, self.green_tensor)
+        matrix = np.eye(9) - self.wave_number**2 * self.green_tensor.swapaxes(1, 2).reshape(9, 9) @ polarizability_to_matrix(self.tensors, 3, 3)
+        assert np.allclose(matrix @ total_field.reshape(-1), self.external_field.reshape(-1)), "The solution should satisfy (I - k^2 G alpha) E = E0."
+
+    def test_iterative_matches_inverse(self):
+        expected = array_MSP_inverse(self.tensors, self.external_field, self.wave_number, self.green_tensor)
+        total_field = array_MSP_iterative(self.tensors, self.external_field, self.wave_number, self.green_tensor, num_iterations=200, tolerance=1e-12)
+        assert np.allclose(total_field, expected), "The iterative solver should match the inverse method with tensors."
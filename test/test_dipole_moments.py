@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from msptools.dipole_moments import calculate_dipole_moments_linear, polarizability_to_matrix
+from msptools.dipole_moments import calculate_dipole_moments_linear, polarizability_to_matrix, polarizability_array, apply_polarizability
 
 
 class TestDipoleMomentsLin:
@@ -49,4 +49,65 @@ class TestPolarizabilityToMatrix:
     def test_different_scalar_polarizabilities(self, num_particles):
         polarizability = np.random.rand(num_particles) + 1j * np.random.rand(num_particles)
         result = polarizability_to_matrix(polarizability, num_particles, self.dimensions)
-        assert np.allclose(np.diag(result[:self.dimensions, :self.dimensions]), polarizability[0].repeat(self.dimensions)), "Diagonal elements should match the polarizability values."
\ No newline at end of file
+        assert np.allclose(np.diag(result[:self.dimensions, :self.dimensions]), polarizability[0].repeat(self.dimensions)), "Diagonal elements should match the polarizability values."
+
+class TestPolarizabilityArray:
+
+    def test_scalar(self):
+        result = polarizability_array(2.0, 4)
+        assert result.shape == (4,) and result.dtype == np.complex128
+
+    def test_shared_tensor(self):
+        tensor = np.diag([1.0, 2.0, 3.0])
+        result = polarizability_array(tensor, 4)
+        assert result.shape == (4, 3, 3), "A (3, 3) array is a tensor shared by all the particles."
+        assert np.allclose(result[3], tensor)
+
+    def test_shared_tensor_as_many_particles_as_dimensions(self):
+        tensor = np.diag([1.0, 2.0, 3.0])
+        with pytest.raises(ValueError):
+            polarizability_array(tensor, 3)
+        result = polarizability_array(np.broadcast_to(tensor, (3, 3, 3)), 3)
+        assert np.allclose(result[1], tensor), "Explicit (N, d, d) tensors should be accepted when N == d."
+
+    def test_mixed_list(self):
+        result = polarizability_array([2.0, np.diag([1.0, 2.0, 3.0])], 2)
+        assert result.shape == (2, 3, 3)
+        assert np.allclose(result[0], 2.0 * np.eye(3)), "Scalars should be promoted to isotropic tensors."
+
+    def test_wrong_number(self):
+        with pytest.raises(ValueError):
+            polarizability_array([1.0, 2.0], 3)
+
+
+class TestTensorDipoleMoments:
+
+    electric_field = np.array([[1, 0, 0], [0, 1+2j, -3 + 5j], [0, 0, 1]])
+    tensors = np.random.default_rng(1).random((3, 3, 3)) + 1j * np.random.default_rng(2).random((3, 3, 3))
+
+    def test_tensor_polarizabilities(self):
+        dipole_moments = calculate_dipole_moments_linear(self.tensors, self.electric_field)
+        for i in range(3):
+            assert np.allclose(dipole_moments[i], self.tensors[i] @ self.electric_field[i]), f"Dipole moment {i} should be alpha_i E_i."
+
+    def test_isotropic_tensors_match_scalars(self):
+        polarizabilities = np.array([1 + 0j, 2 + 0j, 6j])
+        tensors = polarizabilities[:, None, None] * np.eye(3)
+        assert np.allclose(calculate_dipole_moments_linear(tensors, self.electric_field),
+                           calculate_dipole_moments_linear(polarizabilities, self.electric_field))
+
+    def test_batched_fields(self):
+        fields = np.stack([self.electric_field, 2 * self.electric_field])
+        dipole_moments = calculate_dipole_moments_linear(self.tensors, fields)
+        assert dipole_moments.shape == (2, 3, 3)
+        assert np.allclose(dipole_moments[1], 2 * calculate_dipole_moments_linear(self.tensors, self.electric_field))
+
+    def test_tensor_matrix(self):
+        matrix = polarizability_to_matrix(self.tensors, 3, 3)
+        assert np.allclose(matrix[3:6, 3:6], self.tensors[1]), "Diagonal blocks should be the tensors."
+        assert np.allclose(matrix[0:3, 3:6], 0), "Off-diagonal blocks should be zero."
+
+    def test_apply_polarizability(self):
+        green_tensor = np.random.default_rng(3).random((3, 3, 3, 3))
+        product = apply_polarizability(green_tensor, self.tensors)
+        assert np.allclose(product[0, 2], green_tensor[0, 2] @ self.tensors[2])
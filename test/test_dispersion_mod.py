@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import msptools as msp
+import msptools.permittivity as permittivity
+
+
+frequencies = np.linspace(1.0, 5.0, 400)
+metal = msp.DrudeLorentzModel(5.9, 8.9, 0.07, [1.3, 0.8], [2.8, 4.0], [0.6, 1.0])
+critical_point_metal = msp.DrudeLorentzModel(1.5, 8.9, 0.07, critical_point_amplitudes=[1.2, 1.0], critical_point_frequencies=[2.6, 3.8],
+                                             critical_point_phases=[-0.8, -0.8], critical_point_widths=[0.3, 0.8])
+
+
+class TestDrudeLorentzModel:
+
+    def test_drude_term_matches_permittivity_Drude(self):
+        model = msp.DrudeLorentzModel(9.5, 8.9, 0.07)
+        assert np.allclose(model(frequencies), msp.permittivity_Drude(frequencies, 8.9, 0.07, 9.5)), "The Drude term should match permittivity_Drude"
+        assert isinstance(model(2.0), complex), "Scalar frequencies should give a scalar permittivity"
+
+    @pytest.mark.parametrize("model", [metal, critical_point_metal])
+    def test_analytic_derivative(self, model):
+        step = 1e-6
+        numerical = (model(frequencies + step) - model(frequencies - step)) / (2 * step)
+        assert np.allclose(model.derivative(frequencies), numerical, rtol=1e-6, atol=1e-6), "Analytic derivative does not match finite differences"
+
+    def test_absorption_is_positive(self):
+        assert np.all(metal(frequencies).imag > 0), "Absorbing models should have a positive imaginary part"
+
+
+class TestFitDispersionModel:
+
+    def test_recovers_drude_lorentz_model(self):
+        model = msp.fit_dispersion_model(frequencies, metal(frequencies), num_lorentz=2)
+        assert model.rms_error < 1e-8, f"Fit error {model.rms_error} is too large"
+        assert np.allclose(model.parameters(), metal.parameters(), rtol=1e-5), "The fitted parameters should be recovered"
+        assert model.frequency_range == (1.0, 5.0)
+
+    def test_recovers_critical_point_model(self):
+        model = msp.fit_dispersion_model(frequencies, critical_point_metal(frequencies), num_lorentz=0, num_critical_points=2)
+        assert model.max_error < 1e-6, f"Fit error {model.max_error} is too large"
+
+    def test_reports_error_of_insufficient_model(self):
+        model = msp.fit_dispersion_model(frequencies, metal(frequencies), num_lorentz=0)
+        assert model.rms_error > 1e-3, "A Drude model alone cannot reproduce interband oscillators"
+
+    def test_fit_material_table(self, tmp_path):
+        previous = permittivity.get_material_cache_dir()
+        msp.set_material_cache_dir(str(tmp_path))
+        msp.clear_material_cache()
+        try:
+            wavelengths_um = np.linspace(0.25, 1.3, 300)
+            refractive_index = np.sqrt(metal(msp.nm_to_eV(1000.0 * wavelengths_um)))
+            msp.MaterialTable(wavelengths_um, refractive_index.real, wavelengths_um, refractive_index.imag).save(
+                permittivity._material_cache_file(("main", "Au", "Babar")))
+
+            model = msp.fit_material("Au", (1.2, 4.5), num_lorentz=2)
+            assert model.rms_error < 1e-3, f"Fit error {model.rms_error} of the tabulated data is too large"
+        finally:
+            msp.clear_material_cache()
+            msp.set_material_cache_dir(previous)
+
+    def test_model_as_permittivity_source(self):
+        model = msp.fit_dispersion_model(frequencies, metal(frequencies), num_lorentz=2)
+        sphere = msp.SphereType(material=model, radius=20.0, radius_unit="nm")
+        expected = msp.Mie_electric_dipole_polarizability(20.0, 1.77, metal(2.4), msp.frequency_to_wavenumber_nm(2.4))
+        assert np.isclose(sphere.compute_polarizability(2.4, 1.77), expected), "The model should be usable as the material of a SphereType"
+
+        tabulated = msp.SphereType(material=model, radius=20.0, radius_unit="nm", use_table=True)
+        assert np.isclose(tabulated.compute_polarizability(2.4, 1.77), expected, rtol=1e-3), "Polarizability tables should accept models"
+        msp.clear_polarizability_tables()
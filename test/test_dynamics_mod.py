@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+class TestVelocityVerletIntegrator:
+
+    def test_constant_force(self, create_system):
+        system = create_system([[0.0, 0.0, 0.0]])
+        force = msp.ForceCalculator(create_system([[0.0, 0.0, 0.0]])).compute_forces()[0]
+        integrator = msp.VelocityVerletIntegrator(system, time_step=0.5, masses=2.0)
+        trajectory = integrator.run(20)
+
+        expected = force * trajectory["time"][:, None]**2 / (2 * 2.0)
+        assert np.allclose(trajectory["positions"][:, 0], expected), "A single particle should accelerate uniformly under radiation pressure."
+        assert np.allclose(trajectory["velocities"][-1, 0], force * 10.0 / 2.0)
+
+    def test_harmonic_extra_forces_conserve_energy(self, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [500.0, 0.0, 0.0]], amplitude=0.0)
+        stiffness = 4.0
+        integrator = msp.VelocityVerletIntegrator(system, time_step=0.01, masses=1.0,
+                                                  velocities=[[0.0, 1.0, 0.0], [0.0, 0.0, 0.0]],
+                                                  extra_forces=lambda positions: -stiffness * (positions - [[0.0, 0.0, 0.0], [500.0, 0.0, 0.0]]))
+        trajectory = integrator.run(300, stride=10)
+
+        displacement = trajectory["positions"] - np.array([[0.0, 0.0, 0.0], [500.0, 0.0, 0.0]])
+        energy = 0.5 * np.sum(trajectory["velocities"]**2, axis=(1, 2)) + 0.5 * stiffness * np.sum(displacement**2, axis=(1, 2))
+        assert np.allclose(energy, 0.5, rtol=1e-3), "Velocity Verlet should conserve the energy of a harmonic oscillator."
+        assert np.allclose(trajectory["positions"][:, 0, 1], 0.5 * np.sin(2.0 * trajectory["time"]), atol=1e-3)
+
+    def test_invalid_masses(self, create_system):
+        with pytest.raises(ValueError):
+            msp.VelocityVerletIntegrator(create_system([[0.0, 0.0, 0.0]]), time_step=1.0, masses=0.0)
+
+
+class TestBrownianIntegrator:
+
+    def test_drift_without_noise(self, create_system):
+        system = create_system([[0.0, 0.0, 0.0]])
+        force = msp.ForceCalculator(create_system([[0.0, 0.0, 0.0]])).compute_forces()[0]
+        integrator = msp.BrownianIntegrator(system, time_step=2.0, friction=5.0)
+        trajectory = integrator.run(10)
+
+        assert np.allclose(trajectory["positions"][:, 0], force * trajectory["time"][:, None] / 5.0), "Overdamped drift should be F t / gamma."
+
+    def test_seed_reproducibility(self, create_system):
+        positions = [[0.0, 0.0, 0.0], [300.0, 0.0, 0.0]]
+        first = msp.BrownianIntegrator(create_system(positions), time_step=1.0, friction=1.0, thermal_energy=1.0, seed=3).run(5)
+        second = msp.BrownianIntegrator(create_system(positions), time_step=1.0, friction=1.0, thermal_energy=1.0, seed=3).run(5)
+
+        assert np.array_equal(first["positions"], second["positions"]), "The same seed should give the same trajectory."
+
+    def test_fixed_particles(self, create_system):
+        positions = [[0.0, 0.0, 0.0], [300.0, 0.0, 0.0], [0.0, 300.0, 0.0]]
+        system = create_system(positions)
+        integrator = msp.BrownianIntegrator(system, time_step=1.0, friction=1.0, thermal_energy=1.0, fixed=[0, 2], seed=0)
+        trajectory = integrator.run(5)
+
+        assert np.allclose(trajectory["positions"][:, [0, 2]], np.array(positions)[[0, 2]]), "Fixed particles should not move."
+        assert np.allclose(trajectory["forces"][:, [0, 2]], 0), "The forces on fixed particles should not be computed."
+        assert not np.allclose(trajectory["positions"][:, 1], positions[1])
+
+        reference = create_system(trajectory["positions"][-1])
+        assert np.allclose(trajectory["forces"][-1, 1], msp.ForceCalculator(reference).compute_forces()[1]), "The forces should match a fresh computation."
+
+    def test_system_follows_integrator(self, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [300.0, 0.0, 0.0]])
+        integrator = msp.BrownianIntegrator(system, time_step=1.0, friction=1.0, thermal_energy=1.0, seed=0)
+        integrator.run(3)
+
+        assert np.allclose(system.particles.get_positions(), integrator.positions)
+
+
+class TestTrajectoryChunks:
+
+    def test_writer_receives_chunks(self, create_system):
+        positions = [[0.0, 0.0, 0.0], [300.0, 0.0, 0.0]]
+        chunks = []
+        integrator = msp.BrownianIntegrator(create_system(positions), time_step=1.0, friction=1.0, thermal_energy=1.0, seed=2)
+        assert integrator.run(25, stride=2, chunk_size=5, writer=chunks.append) is None
+
+        assert [len(chunk["time"]) for chunk in chunks] == [5, 5, 2], "Frames should be written in chunks of chunk_size."
+        trajectory = msp.BrownianIntegrator(create_system(positions), time_step=1.0, friction=1.0, thermal_energy=1.0, seed=2).run(25, stride=2)
+        assert np.allclose(np.concatenate([chunk["positions"] for chunk in chunks]), trajectory["positions"])
+        assert np.allclose(trajectory["time"], np.arange(2, 26, 2))
@@ -1,3 +1,5 @@
+import pickle
+import pytest
 import numpy as np
 import msptools as msp
 
@@ -84,3 +86,22 @@ class Test_Plane_Wave_Field():
         assert np.allclose(computed_gradient, expected_gradient, atol=1e-4), f"Expected {expected_gradient}, got {computed_gradient}"
 
 
+
+
+class Test_Field_Pickling():
+
+    @pytest.mark.parametrize("field_class", [msp.PlaneWaveField, msp.StandingWaveField])
+    def test_pickle_roundtrip(self, field_class):
+        field = field_class(direction=[0, 1, 1], amplitude=2.0, polarization=[1.0, 0.0, 0.0], wavelength=500.0, wavelength_unit="nm")
+        field.set_medium_permittivity(1.33**2)
+        restored = pickle.loads(pickle.dumps(field))
+
+        positions = np.array([[0.0, 0.0, 0.0], [10.0, 20.0, 30.0]])
+        assert np.allclose(restored.external_field_function(positions), field.external_field_function(positions)), "Restored field should evaluate the same external field."
+        assert np.allclose(restored.external_gradient_function(positions), field.external_gradient_function(positions)), "Restored field should evaluate the same external gradient."
+
+    def test_medium_wave_number(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], amplitude=1.0, polarization=[1.0, 0.0, 0.0], wavelength=500.0, wavelength_unit="nm")
+        field.set_medium_permittivity(2.25)
+        positions = np.array([[0.0, 0.0, 125.0 / 1.5]])
+        assert np.allclose(field.external_field_function(positions), [[1.0j, 0.0, 0.0]]), "The field should propagate with the wave number in the medium."
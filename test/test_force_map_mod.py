@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+structure = [[0.0, 0.0, 0.0], [60.0, 0.0, 0.0], [0.0, 70.0, 20.0], [100.0, 100.0, 0.0]]
+
+@pytest.fixture
+def create_types(create_type):
+    def create():
+        return create_type(), create_type(radius=5.0, polarizability=300 + 100j)
+    return create
+
+@pytest.fixture
+def full_solution(create_system, create_types):
+    def solve(probe_position):
+        structure_type, probe_type = create_types()
+        system = create_system([], particle_types=[structure_type, probe_type])
+        system.particles.add_particles(positions=structure, polarizabilities=structure_type.polarizability)
+        system.particles.add_particles(positions=[list(probe_position)], polarizabilities=probe_type.polarizability)
+        force = msp.ForceCalculator(system).compute_forces()[-1]
+        probe_field = system.get_field_in_particles()[-1]
+        energy = -0.25 * np.real(probe_type.polarizability) * np.sum(np.abs(probe_field)**2)
+        return force, energy
+    return solve
+
+
+class TestProbeForceMap:
+
+    grid = np.stack(np.meshgrid(np.linspace(-50, 150, 4), np.linspace(-40, 140, 3), [30.0, -25.0], indexing="ij"), axis=-1)
+
+    def test_shapes(self, create_system, create_types):
+        forces, energy = msp.probe_force_map(create_system(structure), create_types()[1], self.grid)
+
+        assert forces.shape == (4, 3, 2, 3), "Forces should have the shape of the grid."
+        assert energy.shape == (4, 3, 2), "The energy should have the shape of the grid without the last axis."
+
+    @pytest.mark.parametrize("batch_size", [1, 5, 1024])
+    def test_matches_full_solution(self, batch_size, create_system, create_types, full_solution):
+        forces, energy = msp.probe_force_map(create_system(structure), create_types()[1], self.grid, batch_size=batch_size)
+
+        for index in [(0, 0, 0), (1, 2, 1), (3, 1, 0), (2, 0, 1)]:
+            force, point_energy = full_solution(self.grid[index])
+            assert np.allclose(forces[index], force, rtol=1e-6, atol=0), f"Probe force at {self.grid[index]} does not match the full MSP."
+            assert np.isclose(energy[index], point_energy, rtol=1e-6), f"Probe energy at {self.grid[index]} does not match the full MSP."
+
+    def test_empty_structure(self, create_system, create_types):
+        _, probe_type = create_types()
+        forces, energy = msp.probe_force_map(create_system([]), probe_type, [[0.0, 0.0, 0.0], [10.0, 20.0, 30.0]])
+
+        single = create_system([])
+        single.particles.add_particles(positions=[[0.0, 0.0, 0.0]], polarizabilities=probe_type.polarizability)
+        assert np.allclose(forces, msp.ForceCalculator(single).compute_forces()[0]), "Without a structure the probe feels the radiation pressure only."
+        assert np.allclose(energy, -0.25 * np.real(probe_type.polarizability))
+
+    def test_invalid_grid(self, create_system, create_types):
+        with pytest.raises(ValueError):
+            msp.probe_force_map(create_system(structure), create_types()[1], np.zeros((4, 2)))
+
+def test_anisotropic_probe(create_system, create_types):
+    structure_type, _ = create_types()
+    tensor = np.array([[600 + 200j, 100, 0], [100, 300 + 100j, 0], [0, 0, 200 + 50j]])
+    probe_type = msp.SpheroidType(material="Au", axial_semi_axis=15.0, transverse_semi_axis=5.0, semi_axes_unit="nm", polarizability=tensor)
+    probe_position = [40.0, 30.0, 25.0]
+    forces, _ = msp.probe_force_map(create_system(structure), probe_type, [probe_position])
+
+    system = create_system([], particle_types=[structure_type, probe_type])
+    system.particles.add_particles(positions=structure, polarizabilities=structure_type.polarizability)
+    system.particles.add_particles(positions=[probe_position], polarizabilities=[tensor])
+    assert np.allclose(forces[0], msp.ForceCalculator(system).compute_forces()[-1], rtol=1e-6, atol=0), "The anisotropic probe force does not match the full MSP."
+
+def test_probe_type_without_return_value(create_system, full_solution):
+    class ConstantType(msp.ParticleType):
+        def compute_polarizability(self, frequency, medium_permittivity):
+            self.polarizability = 300 + 100j
+
+    forces, energy = msp.probe_force_map(create_system(structure), ConstantType(), [[40.0, 30.0, 25.0]])
+
+    force, point_energy = full_solution([40.0, 30.0, 25.0])
+    assert np.allclose(forces[0], force, rtol=1e-6, atol=0), "The polarizability should be read from the probe type."
+    assert np.isclose(energy[0], point_energy, rtol=1e-6)
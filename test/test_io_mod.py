@@ -0,0 +1,148 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+formats = [".npz", pytest.param(".h5", marks=pytest.mark.skipif(not msp.H5PY_AVAILABLE, reason="h5py is not installed"))]
+
+positions = np.random.default_rng(0).random((1000, 3)) * 10
+type_indices = np.random.default_rng(1).integers(0, 2, 1000)
+
+
+class TestConfigurationFiles:
+
+    @pytest.mark.parametrize("extension", formats)
+    def test_roundtrip(self, tmp_path, extension):
+        filename = str(tmp_path / f"configuration{extension}")
+        msp.save_configuration(filename, positions, type_indices, positions_unit="um", type_names=["gold", "silica"])
+        configuration = msp.load_configuration(filename)
+
+        assert np.array_equal(configuration["positions"], positions), "Positions should be restored"
+        assert np.array_equal(configuration["type_indices"], type_indices), "Type indices should be restored"
+        assert configuration["positions_unit"] == "um"
+        assert configuration["type_names"] == ["gold", "silica"]
+        assert isinstance(configuration["positions"], np.memmap), "Positions should be memory-mapped"
+        assert not configuration["positions"].flags.writeable, "Memory maps should be read-only"
+
+    @pytest.mark.parametrize("extension", formats)
+    def test_without_mmap(self, tmp_path, extension):
+        filename = str(tmp_path / f"configuration{extension}")
+        msp.save_configuration(filename, positions)
+        configuration = msp.load_configuration(filename, mmap=False)
+
+        assert not isinstance(configuration["positions"], np.memmap)
+        assert np.array_equal(configuration["type_indices"], np.zeros(1000)), "The default type index should be 0"
+
+    def test_npy(self, tmp_path):
+        filename = str(tmp_path / "positions.npy")
+        msp.save_configuration(filename, positions, type_indices)
+        configuration = msp.load_configuration(filename, positions_unit="um")
+
+        assert np.array_equal(configuration["positions"], positions)
+        assert configuration["positions_unit"] == "um", ".npy files should take the given unit"
+        assert isinstance(configuration["positions"], np.memmap)
+
+    def test_compressed_npz(self, tmp_path):
+        filename = str(tmp_path / "compressed.npz")
+        np.savez_compressed(filename, positions=positions, type_indices=type_indices, positions_unit=np.array("nm"), type_names=np.array([], dtype=str))
+        configuration = msp.load_configuration(filename)
+
+        assert np.array_equal(configuration["positions"], positions), "Compressed archives should be read instead of mapped"
+
+    def test_unknown_extension(self, tmp_path):
+        with pytest.raises(ValueError):
+            msp.save_configuration(str(tmp_path / "configuration.txt"), positions)
+
+
+@pytest.mark.parametrize("extension", formats)
+def test_system_roundtrip(tmp_path, extension):
+    field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+    types = [msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=1.0),
+             msp.SphereType(radius=10.0, material="SiO2", radius_unit="nm", polarizability=2.0)]
+    system = msp.System(field=field, particle_types=types, positions_unit="um")
+    system.add_particles(positions, type_indices=type_indices)
+    filename = str(tmp_path / f"system{extension}")
+    system.save_particles(filename)
+
+    restored = msp.System(field=field, particle_types=types, positions_unit="nm")
+    restored.load_particles(filename)
+    assert np.allclose(restored.particles.get_positions(), system.particles.get_positions()), "Positions should be converted to the unit of the system"
+    assert np.array_equal(restored.particles.get_polarizabilities(), system.particles.get_polarizabilities()), "Types should be restored"
+
+
+def results_path(tmp_path, extension):
+    return str(tmp_path / "results") + extension
+
+results_formats = ["", pytest.param(".h5", marks=pytest.mark.skipif(not msp.H5PY_AVAILABLE, reason="h5py is not installed"))]
+
+def make_frame(index):
+    return {"time": np.float64(index), "forces": np.full((4, 3), index, dtype=np.float64), "dipoles": np.full((4, 3), 1j * index)}
+
+
+class TestResults:
+
+    @pytest.mark.parametrize("extension", results_formats)
+    def test_frames_roundtrip(self, tmp_path, extension):
+        path = results_path(tmp_path, extension)
+        with msp.ResultsWriter(path, chunk_size=4) as writer:
+            for index in range(10):
+                writer.write_frame(make_frame(index))
+            assert writer._num_buffered == 2, "Only the frames of the last partial chunk should be buffered"
+
+        with msp.ResultsReader(path) as reader:
+            assert len(reader) == 10
+            for index, frame in enumerate(reader):
+                assert np.array_equal(frame["forces"], make_frame(index)["forces"]), f"Frame {index} should be read back in order"
+            assert np.array_equal(reader[-3]["dipoles"], make_frame(7)["dipoles"])
+            assert np.array_equal(reader.read("time", 3, 9), np.arange(3, 9)), "Ranges should span several chunks"
+            assert [chunk["time"].shape[0] for chunk in reader.iter_chunks(["time"])] == [4, 4, 2]
+
+    @pytest.mark.parametrize("extension", results_formats)
+    def test_append(self, tmp_path, extension):
+        path = results_path(tmp_path, extension)
+        with msp.ResultsWriter(path, chunk_size=3) as writer:
+            writer.write_chunk({name: np.stack([make_frame(i)[name] for i in range(5)]) for name in make_frame(0)})
+        with msp.ResultsWriter(path, chunk_size=3, mode='a') as writer:
+            assert writer.num_frames == 5
+            writer.write_frame(make_frame(5))
+        with msp.ResultsReader(path) as reader:
+            assert np.array_equal(reader.read("time"), np.arange(6)), "Appended frames should follow the existing ones"
+        with msp.ResultsWriter(path, chunk_size=3) as writer:
+            writer.write_frame(make_frame(0))
+        with msp.ResultsReader(path) as reader:
+            assert len(reader) == 1, "Mode 'w' should replace the existing results"
+
+    def test_inconsistent_frames(self, tmp_path):
+        with msp.ResultsWriter(results_path(tmp_path, ""), chunk_size=3) as writer:
+            writer.write_frame(make_frame(0))
+            with pytest.raises(ValueError):
+                writer.write_frame({"forces": np.zeros((4, 3))})
+
+    def test_integrator_writer(self, tmp_path):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        system = msp.System(field=field, particle_types=msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j), positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [400.0, 0.0, 0.0]])
+        path = results_path(tmp_path, "")
+        with msp.ResultsWriter(path, chunk_size=4) as writer:
+            msp.BrownianIntegrator(system, time_step=1.0, friction=1.0).run(10, chunk_size=3, writer=writer)
+
+        reader = msp.ResultsReader(path)
+        assert len(reader) == 10, "Every frame of the run should be written"
+        assert np.allclose(reader[-1]["positions"], system.particles.get_positions()), "The last frame should be the final state"
+
+
+@pytest.mark.parametrize("extension", formats)
+def test_system_roundtrip_untyped(tmp_path, extension):
+    field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+    types = [msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=1.0)]
+    system = msp.System(field=field, particle_types=types, positions_unit="nm")
+    system.add_particles(positions[:3])
+    system.particles.add_particles(positions[3:5], polarizabilities=[3.0 + 1j, 4.0])
+    filename = str(tmp_path / f"system{extension}")
+    system.save_particles(filename)
+
+    restored = msp.System(field=field, particle_types=types, positions_unit="nm")
+    restored.load_particles(filename)
+    assert np.array_equal(restored.particles.type_indices, [0, 0, 0, -1, -1]), "Particles without a type should stay untyped"
+    assert np.array_equal(restored.particles.get_polarizabilities(), [1.0, 1.0, 1.0, 3.0 + 1j, 4.0]), "Polarizabilities of untyped particles should be restored"
+    assert np.allclose(restored.particles.get_positions(), system.particles.get_positions())
@@ -1,3 +1,5 @@
+import pytest
+import pickle
 import msptools as msp
 import numpy as np
 
@@ -24,8 +26,41 @@ class TestSystem:
         system.add_particles(positions, particle_type=type1)
         
         assert len(system.particles.positions) == 2, "There should be two particles in the system"
-        assert all(isinstance(pos, list) for pos in system.particles.positions), "Positions should be stored as lists"
+        assert isinstance(system.particles.get_positions(), np.ndarray) and system.particles.get_positions().shape == (2, 3), "Positions should be stored as an (N, 3) array"
     
+    def test_add_particles_multi_type(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        type2 = msp.SphereType(radius=5.0, material="SiO2", radius_unit="nm", polarizability=50 + 1j)
+        system = msp.System(field=field, particle_types=[type1, type2], positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0]], particle_type=type2)
+        system.add_particles([0.0, 50.0, 0.0], particle_type=type1)
+
+        assert np.array_equal(system.particles.type_indices, [1, 1, 0]), "Particles should store the index of their type"
+        assert np.allclose(system.particles.get_polarizabilities(), [50 + 1j, 50 + 1j, 2000 + 1500j]), "Particles should have the polarizability of their type"
+        with pytest.raises(ValueError):
+            system.add_particles([[0.0, 0.0, 0.0]])
+        with pytest.raises(ValueError):
+            system.add_particles([[0.0, 0.0, 0.0]], particle_type=msp.SphereType(radius=5.0, material="Au", radius_unit="nm", polarizability=1.0))
+
+    def test_update_polarizabilities(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        type2 = msp.SpheroidType(material="Au", axial_semi_axis=20.0, transverse_semi_axis=10.0, semi_axes_unit="nm", polarizability=np.diag([1.0, 2.0, 3.0]))
+        system = msp.System(field=field, particle_types=[type1, type2], positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0]], particle_type=type1)
+        system.particles.add_particles([[0.0, 50.0, 0.0]], 7.0)
+        system.add_particles([[0.0, 90.0, 0.0]], particle_type=type2)
+        type1.fixed_polarizability = 10.0
+        version = system.particles.polarizabilities_version
+        system.update_polarizabilities()
+
+        polarizabilities = system.particles.get_polarizabilities()
+        assert np.allclose(polarizabilities[:2], 10.0 * np.eye(3)), "Typed particles should get the new polarizability of their type"
+        assert np.allclose(polarizabilities[2], 7.0 * np.eye(3)), "Particles without a type should keep their polarizability"
+        assert np.allclose(polarizabilities[3], np.diag([1.0, 2.0, 3.0]))
+        assert system.particles.polarizabilities_version > version, "Updating the polarizabilities should invalidate the cache"
+
     def test_get_field_in_particles(self):
         field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=1.0, wavelength_unit="um", amplitude= 1.0, polarization=np.array([1.0, 0.0, 0.0]))
         type1 = msp.SphereType(radius=1.0, material="Au", radius_unit="nm")
@@ -40,4 +75,217 @@ class TestSystem:
         # assert np.allclose(field_values[0], field.external_field_function(np.array([1.369, 0.0, 0.0]))), "Field at first particle position should match evaluation"
         # assert np.allclose(field_values[1], field.external_field_function(np.array([2.0, 0.0, 0.0]))), "Field at second particle position should match evaluation"
     
-    
\ No newline at end of file
+    
+    def test_pickle_roundtrip(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        system = msp.System(field=field, medium_permittivity=self.medium_permittivity, particle_types=type1, positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0]])
+
+        restored = pickle.loads(pickle.dumps(system))
+
+        assert np.allclose(msp.ForceCalculator(restored).compute_forces(), msp.ForceCalculator(system).compute_forces()), "Restored system should give the same forces."
+
+
+class TestForceCalculator:
+
+    def test_batched_forces_match_loop(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.3, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        system = msp.System(field=field, particle_types=type1, positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0], [0.0, 50.0, 0.0]])
+        calculator = msp.ForceCalculator(system)
+
+        rng = np.random.default_rng(0)
+        positions = system.particles.get_positions()[None] + rng.normal(0, 5, (6, 3, 3)) * [1, 1, 0]
+        forces = calculator.compute_forces_batched(positions)
+
+        expected = []
+        for configuration in positions:
+            for index, position in enumerate(configuration):
+                system.set_position(index, position)
+            expected.append(calculator.compute_forces())
+
+        assert forces.shape == (6, 3, 3), "Batched forces should have shape (B, N, 3)."
+        assert np.allclose(forces, expected, rtol=1e-5), "Batched forces should match the compute_forces loop."
+
+    def test_batched_wrong_number_of_particles(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        system = msp.System(field=field, particle_types=type1, positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0]])
+        with pytest.raises(ValueError):
+            msp.ForceCalculator(system).compute_forces_batched(np.zeros((2, 3, 3)))
+
+    def test_isotropic_tensor_matches_scalar(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.3, 0.0])
+        positions = [[0.0, 0.0, 0.0], [40.0, 0.0, 0.0], [0.0, 50.0, 0.0]]
+        sphere = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        spheroid = msp.SpheroidType(material="Au", axial_semi_axis=10.0, transverse_semi_axis=10.0, semi_axes_unit="nm", polarizability=(2000 + 1500j) * np.eye(3))
+        forces = []
+        for particle_type in [sphere, spheroid]:
+            system = msp.System(field=field, particle_types=particle_type, positions_unit="nm")
+            system.add_particles(positions)
+            forces.append(msp.ForceCalculator(system).compute_forces())
+
+        assert np.allclose(forces[0], forces[1]), "An isotropic tensor should give the forces of the scalar polarizability."
+
+    def test_anisotropic_batched_forces_match_loop(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.3, 0.0])
+        rod = msp.SpheroidType(material="Au", axial_semi_axis=30.0, transverse_semi_axis=10.0, semi_axes_unit="nm", axis=[1.0, 1.0, 0.0],
+                               polarizability=np.diag([6000 + 4000j, 1000 + 500j, 1000 + 500j]))
+        system = msp.System(field=field, particle_types=rod, positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [60.0, 0.0, 0.0], [0.0, 70.0, 0.0]])
+        calculator = msp.ForceCalculator(system)
+
+        positions = system.particles.get_positions()[None] + np.random.default_rng(1).normal(0, 5, (4, 3, 3)) * [1, 1, 0]
+        forces = calculator.compute_forces_batched(positions)
+
+        expected = []
+        for configuration in positions:
+            system.set_positions(configuration)
+            expected.append(calculator.compute_forces())
+
+        assert np.allclose(forces, expected, rtol=1e-5), "Batched anisotropic forces should match the compute_forces loop."
+
+
+class TestSystemCache:
+
+    def create_system(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        type1 = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+        system = msp.System(field=field, particle_types=type1, positions_unit="nm")
+        system.add_particles([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0], [90.0, 0.0, 0.0]])
+        return system
+
+    def count_calls(self, monkeypatch, name):
+        calls = []
+        original = getattr(msp, name)
+        def counted(*args, **kwargs):
+            calls.append(name)
+            return original(*args, **kwargs)
+        monkeypatch.setattr(msp, name, counted)
+        return calls
+
+    def test_repeated_queries_solve_once(self, monkeypatch):
+        system = self.create_system()
+        green_calls = self.count_calls(monkeypatch, "construct_green_tensor")
+        solve_calls = self.count_calls(monkeypatch, "solve_MSP_from_arrays")
+
+        forces = msp.ForceCalculator(system).compute_forces()
+        system.get_dipole_moments()
+        system.get_field_in_particles()
+        assert np.allclose(msp.ForceCalculator(system).compute_forces(), forces)
+
+        assert len(green_calls) == 1, "The Green tensor should be built once."
+        assert len(solve_calls) == 1, "The MSP should be solved once."
+
+    def test_amplitude_change_rescales(self, monkeypatch):
+        system = self.create_system()
+        forces = msp.ForceCalculator(system).compute_forces()
+        field = system.get_field_in_particles()
+        solve_calls = self.count_calls(monkeypatch, "solve_MSP_from_arrays")
+
+        system.field.amplitude = 3.0
+
+        assert np.allclose(system.get_field_in_particles(), 3.0 * field), "The field should scale with the amplitude."
+        assert np.allclose(msp.ForceCalculator(system).compute_forces(), 9.0 * forces), "The forces should scale with the squared amplitude."
+        assert len(solve_calls) == 0, "An amplitude change should not trigger a new MSP solve."
+
+    def test_position_change_invalidates(self, monkeypatch):
+        system = self.create_system()
+        msp.ForceCalculator(system).compute_forces()
+        green_calls = self.count_calls(monkeypatch, "construct_green_tensor")
+        update_calls = self.count_calls(monkeypatch, "update_green_tensor")
+
+        system.set_position(1, [45.0, 0.0, 0.0])
+        forces = msp.ForceCalculator(system).compute_forces()
+        assert len(green_calls) + len(update_calls) == 1, "The Green tensor should be recomputed after moving a particle."
+
+        fresh = self.create_system()
+        fresh.set_position(1, [45.0, 0.0, 0.0])
+        assert np.allclose(forces, msp.ForceCalculator(fresh).compute_forces()), "Forces should be recomputed after moving a particle."
+
+    def test_few_moved_particles_update_green_tensors(self, monkeypatch):
+        system = self.create_system()
+        msp.ForceCalculator(system).compute_forces()
+        green_calls = self.count_calls(monkeypatch, "construct_green_tensor")
+        update_calls = self.count_calls(monkeypatch, "update_green_tensor")
+
+        system.set_position(2, [90.0, 10.0, 5.0])
+        positions = system.particles.get_positions()
+        wave_number = system.medium_wave_number_nm
+
+        assert np.allclose(system.get_green_tensor(), msp.construct_green_tensor(positions, wave_number), rtol=1e-12, atol=0)
+        assert np.allclose(system.get_green_tensor_gradient(), msp.construct_green_tensor_gradient(positions, wave_number), rtol=1e-12, atol=0)
+        assert len(update_calls) == 1, "Moving one of three particles should update the Green tensor."
+        assert len(green_calls) == 1, "Only the reference Green tensor should be constructed."
+
+    def test_many_moved_particles_rebuild_green_tensor(self, monkeypatch):
+        system = self.create_system()
+        msp.ForceCalculator(system).compute_forces()
+        green_calls = self.count_calls(monkeypatch, "construct_green_tensor")
+        update_calls = self.count_calls(monkeypatch, "update_green_tensor")
+
+        system.set_positions([[0.0, 0.0, 5.0], [45.0, 0.0, 0.0], [90.0, 0.0, 0.0]])
+        system.get_green_tensor()
+
+        assert len(green_calls) == 1 and len(update_calls) == 0, "Moving most particles should rebuild the Green tensor."
+
+    def test_solve_is_warm_started(self, monkeypatch):
+        system = self.create_system()
+        previous_field = system.get_field_in_particles()
+        initial_fields = []
+        original = msp.solve_MSP_from_arrays
+        def recorded(*args, **kwargs):
+            initial_fields.append(kwargs.get("initial_field"))
+            return original(*args, **kwargs)
+        monkeypatch.setattr(msp, "solve_MSP_from_arrays", recorded)
+
+        system.set_position(1, [41.0, 0.0, 0.0])
+        system.get_field_in_particles()
+
+        assert np.allclose(initial_fields[0], previous_field), "The previous solution should be the initial guess."
+
+    def test_cached_results_are_read_only(self):
+        system = self.create_system()
+        field = system.get_field_in_particles()
+        with pytest.raises(ValueError):
+            field *= 2
+        with pytest.raises(ValueError):
+            system.get_green_tensor()[0, 1] = 0
+        assert np.array_equal(system.get_field_in_particles(), self.create_system().get_field_in_particles()), "Cached results should not be modified"
+
+    def test_polarization_change_keeps_green_tensor(self, monkeypatch):
+        system = self.create_system()
+        msp.ForceCalculator(system).compute_forces()
+        green_calls = self.count_calls(monkeypatch, "construct_green_tensor")
+        solve_calls = self.count_calls(monkeypatch, "solve_MSP_from_arrays")
+
+        system.field.polarization = np.array([0.0, 1.0, 0.0])
+        field = system.get_field_in_particles()
+
+        assert np.allclose(field[:, 0], 0), "The field should follow the new polarization."
+        assert len(green_calls) == 0, "A polarization change should not rebuild the Green tensor."
+        assert len(solve_calls) == 1, "A polarization change should trigger a new MSP solve."
+
+    @pytest.mark.parametrize("indices", [[1], [2, 0], np.array([0, 1, 2]), [-1], [-3, 1]])
+    def test_forces_on_subset(self, indices):
+        system = self.create_system()
+        all_forces = msp.ForceCalculator(self.create_system()).compute_forces()
+        forces = msp.ForceCalculator(system).compute_forces(indices=indices)
+
+        assert forces.shape == (len(indices), 3), "Subset forces should have shape (M, 3)."
+        assert np.allclose(forces, all_forces[indices]), "Subset forces should match the corresponding full forces."
+
+    def test_forces_on_out_of_range_subset(self):
+        with pytest.raises(IndexError):
+            msp.ForceCalculator(self.create_system()).compute_forces(indices=[3])
+
+    def test_subset_does_not_build_full_gradient(self, monkeypatch):
+        system = self.create_system()
+        gradient_calls = self.count_calls(monkeypatch, "construct_green_tensor_gradient")
+        msp.ForceCalculator(system).compute_forces(indices=[1])
+
+        assert len(gradient_calls) == 1
+        assert "green_tensor_gradient" not in system._cache, "Only the selected rows of the gradient should be built."
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+@pytest.fixture(scope="class")
+def table(create_type, create_field):
+    return msp.PairForceTable(create_type(), create_field(), max_distance=2000, min_distance=100, num_distances=81, num_angles=8)
+
+
+class TestPairForceTable:
+
+    @pytest.mark.parametrize("axial_index", [80, 95, 120, 40])
+    def test_grid_points_are_exact(self, axial_index, table, create_system):
+        radial_distance, axial_distance, angle = table.radial_distances[23], table.axial_distances[axial_index], table.angles[5]
+        separation = [radial_distance * np.cos(angle), radial_distance * np.sin(angle), axial_distance]
+        system = create_system([[0.0, 0.0, 0.0], separation])
+        approximate = msp.PairForceCalculator(system, table).compute_forces()
+
+        assert np.allclose(approximate, msp.ForceCalculator(system).compute_forces(), rtol=1e-10, atol=1e-12), "Tabulated dimer forces should match the full MSP at grid points."
+
+    def test_dilute_cluster(self, table, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [900.0, 150.0, 0.0], [-200.0, 1000.0, 0.0], [650.0, 1150.0, 0.0]])
+        full = msp.ForceCalculator(system).compute_forces()
+        approximate = msp.PairForceCalculator(system, table).compute_forces()
+        interaction_scale = np.abs(full - table.single_force).max()
+
+        assert np.abs(full - approximate).max() < 0.01 * interaction_scale, "Pairwise forces should approximate a dilute cluster."
+
+    @pytest.mark.parametrize("separation", [[0.0, 0.0, 300.0], [210.0, 0.0, 310.0], [-450.0, 800.0, -1200.0]])
+    def test_axially_offset_pair(self, separation, table, create_system):
+        system = create_system([[0.0, 0.0, 0.0], separation])
+        full = msp.ForceCalculator(system).compute_forces()
+        approximate = msp.PairForceCalculator(system, table).compute_forces()
+        interaction_scale = np.abs(full - table.single_force).max()
+
+        assert np.abs(full - approximate).max() < 0.05 * interaction_scale, "Pairs offset along the propagation should match the full MSP."
+
+    def test_cutoff(self, table, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [1500.0, 0.0, 1500.0]])
+        forces = msp.PairForceCalculator(system, table).compute_forces()
+
+        assert np.allclose(forces, table.single_force), "Pairs beyond the cutoff should not interact."
+
+    def test_amplitude_scaling_and_indices(self, table, create_system):
+        positions = [[0.0, 0.0, 0.0], [700.0, 300.0, 0.0], [0.0, 900.0, 0.0]]
+        reference = msp.PairForceCalculator(create_system(positions), table).compute_forces()
+        forces = msp.PairForceCalculator(create_system(positions, amplitude=2.0), table).compute_forces(indices=[2, 0])
+
+        assert np.allclose(forces, 4.0 * reference[[2, 0]]), "Forces should scale with the squared amplitude."
+
+    def test_field_mismatch(self, table, create_field, create_type):
+        system = msp.System(field=create_field(polarization=[0.0, 1.0, 0.0]), particle_types=create_type(), positions_unit="nm")
+        with pytest.raises(ValueError):
+            msp.PairForceCalculator(system, table)
+
+    def test_brownian_dynamics(self, table, create_system):
+        system = create_system(np.c_[np.random.default_rng(0).random((50, 2)) * 20000, np.zeros(50)])
+        integrator = msp.BrownianIntegrator(system, time_step=1.0, friction=1.0, force_calculator=msp.PairForceCalculator(system, table))
+        trajectory = integrator.run(3)
+
+        expected = msp.PairForceCalculator(system, table).compute_forces()
+        assert np.allclose(trajectory["forces"][-1], expected), "The integrator should use the tabulated forces."
+
+
+def test_requires_plane_wave(create_type):
+    field = msp.StandingWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        msp.PairForceTable(create_type(), field, max_distance=1000, min_distance=50)
@@ -0,0 +1,30 @@
+import pytest
+import numpy as np
+from msptools.tools.parallel_tools import row_blocks, run_row_blocks, resolve_num_workers
+
+
+@pytest.mark.parametrize("triangular", [False, True])
+@pytest.mark.parametrize(["num_rows", "num_blocks"], [(10, 3), (7, 7), (3, 8), (1, 4), (100, 6)])
+def test_row_blocks_cover_rows(num_rows, num_blocks, triangular):
+    blocks = row_blocks(num_rows, num_blocks, triangular=triangular)
+    covered = [row for start, stop in blocks for row in range(start, stop)]
+    assert covered == list(range(num_rows)), "Row blocks should cover every row exactly once and in order."
+    assert len(blocks) <= num_blocks, "There should be at most num_blocks blocks."
+
+def test_triangular_blocks_balanced():
+    num_rows = 1000
+    blocks = row_blocks(num_rows, 4, triangular=True)
+    costs = [sum(num_rows - 1 - row for row in range(start, stop)) for start, stop in blocks]
+    assert max(costs) / min(costs) < 1.02, "Triangular row blocks should have similar pair counts."
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_run_row_blocks(num_workers):
+    result = np.zeros(20)
+    def fill(row_start, row_stop):
+        result[row_start:row_stop] = np.arange(row_start, row_stop)
+    run_row_blocks(fill, 20, num_workers=num_workers)
+    assert np.array_equal(result, np.arange(20)), "Every row block should be computed."
+
+def test_invalid_num_workers():
+    with pytest.raises(ValueError):
+        resolve_num_workers(0)
@@ -19,4 +19,141 @@ class TestParticles:
         polarizabilities = [1.0, 2.0]
         particles.add_particles(positions, polarizabilities)
         assert len(particles.positions) == 2, "There should be two particles in the system"
-        assert particles.polarizabilities == polarizabilities, "Polarizabilities should match the input" 
\ No newline at end of file
+        assert np.array_equal(particles.polarizabilities, polarizabilities), "Polarizabilities should match the input"
+
+    def test_growth_keeps_particles(self):
+        particles = msp.Particles()
+        rng = np.random.default_rng(0)
+        positions = rng.random((100, 3))
+        for position in positions:
+            particles.add_particles([position], 2.0)
+        particles.add_particles(rng.random((37, 3)), np.arange(37))
+
+        assert len(particles) == 137, "There should be 137 particles in the system"
+        assert np.array_equal(particles.get_positions()[:100], positions), "Growing the storage should keep the positions"
+        assert particles._positions.shape[0] < 2 * 137, "The capacity should grow geometrically"
+
+    def test_views_are_read_only(self):
+        particles = msp.Particles()
+        particles.add_particles([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], 1.0)
+        positions = particles.get_positions()
+        with pytest.raises(ValueError):
+            positions[0, 0] = 5.0
+        particles.set_position(1, [2.0, 0.0, 0.0])
+        assert positions[1, 0] == 2.0, "Positions should be a view of the storage"
+
+    def test_remove_particles(self):
+        particles = msp.Particles()
+        particles.add_particles(np.arange(15.0).reshape(5, 3), [1.0, 2.0, 3.0, 4.0, 5.0])
+        version = particles.positions_version
+        particles.remove_particles([0, 3])
+
+        assert np.array_equal(particles.get_positions(), [[3.0, 4.0, 5.0], [6.0, 7.0, 8.0], [12.0, 13.0, 14.0]]), "Removing should keep the order of the remaining particles"
+        assert np.array_equal(particles.get_polarizabilities(), [2.0, 3.0, 5.0])
+        assert particles.positions_version > version, "Removing particles should change the positions version"
+
+    def test_mixed_polarizabilities(self):
+        particles = msp.Particles()
+        particles.add_particles([[0.0, 0.0, 0.0]], 2.0)
+        particles.add_particles([[1.0, 0.0, 0.0]], np.diag([1.0, 2.0, 3.0]))
+
+        polarizabilities = particles.get_polarizabilities()
+        assert polarizabilities.shape == (2, 3, 3), "Adding a tensor should promote the polarizabilities to tensors"
+        assert np.allclose(polarizabilities[0], 2.0 * np.eye(3))
+
+    def test_copy_is_independent(self):
+        particles = msp.Particles()
+        particles.add_particles([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], 1.0)
+        copied = particles.copy()
+        copied.set_position(0, [5.0, 5.0, 5.0])
+
+        assert np.array_equal(particles.get_position(0), [0.0, 0.0, 0.0]), "Changing a copy should not change the original"
+        assert copied._positions.shape[0] == 2, "Copies should not keep the spare capacity"
+
+    def test_type_polarizabilities_are_gathered(self):
+        particles = msp.Particles()
+        type_indices = np.random.default_rng(0).integers(0, 3, 1000)
+        particles.add_particles(np.zeros((1000, 3)), 0.0, type_indices=type_indices)
+        particles.add_particles([[1.0, 1.0, 1.0]], 9.0)
+        particles._calculate_polarizabilities([1.0, 2.0, 3.0])
+
+        assert np.array_equal(particles.get_polarizabilities()[:1000], type_indices + 1.0), "Particles should get the polarizability of their type"
+        assert particles.get_polarizabilities()[-1] == 9.0, "Particles without a type should keep their polarizability"
+        particles.remove_particles(np.arange(500))
+        assert np.array_equal(particles.type_indices[:-1], type_indices[500:]), "Removing particles should keep the type indices aligned"
+
+
+def overlaps(positions, radii, min_gap=0.0, tolerance=1e-9):
+    distances = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+    contact = radii[:, None] + radii[None, :] + min_gap - tolerance
+    return np.triu(distances < contact, k=1).sum()
+
+
+class TestConfigurationGenerators:
+
+    small = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=1.0)
+    large = msp.SphereType(radius=0.02, material="Au", radius_unit="um", polarizability=2.0)
+
+    def test_random_sequential_addition(self):
+        positions, type_indices = msp.random_sequential_addition(500, [1000, 1000, 500], [self.small, self.large], fractions=[0.3, 0.7], min_gap=2.0, seed=0)
+
+        assert positions.shape == (500, 3) and type_indices.shape == (500,)
+        assert np.all((positions >= 0) & (positions <= [1000, 1000, 500])), "Particles should be inside the box"
+        assert overlaps(positions, np.array([10.0, 20.0])[type_indices], min_gap=2.0) == 0, "Particles should not overlap"
+        assert 0.55 < np.mean(type_indices == 1) < 0.85, "Types should follow the fractions"
+
+    def test_radii_follow_positions_unit(self):
+        positions, type_indices = msp.random_sequential_addition(200, [1.0, 1.0, 0.0], [self.large], positions_unit="um", seed=1)
+
+        assert np.all(positions[:, 2] == 0), "A zero box length should give a plane"
+        assert overlaps(positions, np.full(200, 0.02)) == 0, "Radii should be converted to the positions unit"
+
+    def test_too_dense(self):
+        with pytest.raises(ValueError):
+            msp.random_sequential_addition(1000, [100, 100, 100], self.small, seed=0, max_attempts=5)
+
+    def test_poisson_disk_sampling(self):
+        positions, type_indices = msp.poisson_disk_sampling([400, 400, 0], [self.small, self.large], seed=0)
+        radii = np.array([10.0, 20.0])[type_indices]
+
+        assert overlaps(positions, radii) == 0, "Particles should not overlap"
+        covered = np.sum(np.pi * radii**2) / 400**2
+        assert covered > 0.4, "Poisson-disk sampling should fill the plane densely"
+
+    def test_jittered_lattice(self):
+        positions, type_indices = msp.jittered_lattice((4, 4, 4), 100.0, [self.small, self.large], lattice="fcc", jitter=10.0, seed=0)
+
+        assert positions.shape == (256, 3)
+        assert overlaps(positions, np.array([10.0, 20.0])[type_indices]) == 0, "Particles should not overlap"
+        reference, _ = msp.jittered_lattice((4, 4, 4), 100.0, self.small, lattice="fcc")
+        assert np.all(np.linalg.norm(positions - reference, axis=-1) <= 10.0), "Displacements should be bounded by the jitter"
+        with pytest.raises(ValueError):
+            msp.jittered_lattice((4, 4, 4), 50.0, self.large, lattice="fcc", jitter=5.0)
+
+    def test_diffusion_limited_aggregate(self):
+        positions, type_indices = msp.diffusion_limited_aggregate(300, [self.small, self.large], seed=0, num_walkers=64)
+        radii = np.array([10.0, 20.0])[type_indices]
+        distances = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+        contact = radii[:, None] + radii[None, :]
+
+        assert overlaps(positions, radii, tolerance=0.03) == 0, "Particles should not overlap"
+        touching = np.abs(distances - contact) < 0.03
+        np.fill_diagonal(touching, False)
+        assert np.all(touching[1:].any(axis=1)), "Every particle should touch the aggregate"
+
+    @pytest.mark.parametrize("seed", [0, 2])
+    def test_diffusion_limited_aggregate_radius_ratio(self, seed):
+        tiny = msp.SphereType(radius=1.0, material="Au", radius_unit="nm", polarizability=1.0)
+        positions, type_indices = msp.diffusion_limited_aggregate(1000, [tiny, self.large], seed=seed)
+
+        assert overlaps(positions, np.array([1.0, 20.0])[type_indices], tolerance=0.03) == 0, "Particles of very different radii should not overlap"
+
+    def test_system_type_indices(self):
+        field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+        system = msp.System(field=field, particle_types=[self.small, self.large], positions_unit="um")
+        positions, type_indices = msp.random_sequential_addition(50, [2.0, 2.0, 2.0], system.particle_types, positions_unit="um", seed=0)
+        system.add_particles(positions, type_indices=type_indices)
+
+        assert np.array_equal(system.particles.type_indices, type_indices)
+        assert np.allclose(system.particles.get_polarizabilities(), np.array([1.0, 2.0])[type_indices])
+        system.validate_configuration()
@@ -1,6 +1,9 @@
 import pytest
 import numpy as np
-from msptools.permittivity import permittivity_Drude, permittivity_ridx
+import scipy.interpolate
+import msptools.permittivity as permittivity
+from msptools.tools.unit_calcs import eV_to_nm
+from msptools.permittivity import permittivity_Drude, permittivity_ridx, MaterialTable, get_material, material_wavelength_range_um
 
 
 @pytest.mark.parametrize("frequency", [1e2, 1e3, 1e4, 1e5])
@@ -48,3 +51,104 @@ class Test_RidxPermittivity():
         resonance_wavelength_nm = 1240 / resonance_energy  # Convert eV to nm
         expected_wavelength_nm = 497  # Approximate known resonance wavelength for gold nanoparticles
         assert np.isclose(resonance_wavelength_nm, expected_wavelength_nm, rtol=1e-2), f"Expected resonance wavelength around {expected_wavelength_nm} nm, got {resonance_wavelength_nm} nm"
+
+
+class FakeRidxMaterial:
+    """Stand-in for ridx.RefractiveIndexMaterial with tabulated n and k, without the database."""
+
+    def __init__(self):
+        wavelengths = np.linspace(0.3, 1.2, 50)
+        self._wl_range = (0.3, 1.2)
+        self._n_func = scipy.interpolate.interp1d(wavelengths, 0.2 + 0.5 * wavelengths**2, bounds_error=False)
+        self._k_func = scipy.interpolate.interp1d(wavelengths[::2], 2.0 + 5.0 * wavelengths[::2], bounds_error=False)
+
+    def get_refractive_index(self, wavelength_nm):
+        return self._n_func(np.asarray(wavelength_nm) / 1000.0)
+
+    def get_epsilon(self, wavelength_nm):
+        if self._k_func is None:
+            raise permittivity.ridx.NoExtinctionCoefficient()
+        wavelength_um = np.asarray(wavelength_nm) / 1000.0
+        return (self._n_func(wavelength_um) + 1j * self._k_func(wavelength_um)) ** 2
+
+
+def formula_material():
+    material = FakeRidxMaterial()
+    material._n_func = lambda wavelength_um: np.sqrt(1 + 1.1 * wavelength_um**2 / (wavelength_um**2 - 0.01))
+    material._k_func = None
+    return material
+
+
+@pytest.fixture
+def material_cache_dir(tmp_path):
+    previous = permittivity._material_cache_dir
+    permittivity.set_material_cache_dir(str(tmp_path))
+    permittivity.clear_material_cache()
+    yield tmp_path
+    permittivity.clear_material_cache()
+    permittivity.set_material_cache_dir(previous)
+
+
+class Test_MaterialTable():
+
+    def test_matches_ridx_interpolation(self):
+        material = FakeRidxMaterial()
+        table = MaterialTable.from_ridx(material)
+        wavelengths_nm = np.linspace(310, 1180, 200)
+        assert np.allclose(table.get_epsilon(wavelengths_nm), material.get_epsilon(wavelengths_nm), rtol=1e-12), "Table should reproduce the ridx interpolation"
+        assert np.isnan(table.get_epsilon(2000.0)), "Permittivity outside of the tabulated range should be NaN"
+
+    def test_formula_material_is_not_tabulated(self):
+        with pytest.raises(ValueError):
+            MaterialTable.from_ridx(formula_material())
+
+    def test_formula_material_is_evaluated_exactly(self, material_cache_dir, monkeypatch):
+        material = formula_material()
+        monkeypatch.setattr(permittivity.ridx, "RefractiveIndexMaterial", lambda **key: material)
+        frequencies = np.linspace(1.2, 3.5, 50)
+
+        expected = material._n_func(eV_to_nm(frequencies) / 1000.0) ** 2
+        assert np.array_equal(permittivity_ridx(frequencies, "SiO2"), expected), "Formula materials should be evaluated exactly"
+        assert get_material("SiO2") is material, "The constructed material should be cached"
+        assert material_wavelength_range_um("SiO2") == (0.3, 1.2)
+        assert not any(material_cache_dir.iterdir()), "Formula materials should not be stored on disk"
+
+    def test_tabulated_material_stored_on_disk(self, material_cache_dir, monkeypatch):
+        material = FakeRidxMaterial()
+        monkeypatch.setattr(permittivity.ridx, "RefractiveIndexMaterial", lambda **key: material)
+
+        assert get_material("Ag") is material, "The constructed material should be cached in memory"
+        permittivity.clear_material_cache()
+        table = get_material("Ag")
+        wavelengths_nm = np.linspace(310, 1180, 200)
+        assert isinstance(table, MaterialTable), "Tabulated data should be loaded from the on-disk cache"
+        assert np.allclose(table.get_epsilon(wavelengths_nm), material.get_epsilon(wavelengths_nm), rtol=1e-12)
+        assert material_wavelength_range_um("Ag") == (0.3, material._k_func.x[-1]), "The range should be where both n and k are tabulated"
+
+    def test_disk_cache_serves_permittivity(self, material_cache_dir):
+        table = MaterialTable.from_ridx(FakeRidxMaterial())
+        table.save(permittivity._material_cache_file(("main", "Au", "Babar")))
+
+        epsilon = permittivity_ridx(2.0, "Au")
+        assert np.isclose(epsilon, table.get_epsilon(eV_to_nm(2.0))), "Permittivity should come from the on-disk table"
+        assert get_material("Au") is get_material("Au"), "Repeated lookups should hit the in-memory cache"
+
+    def test_vectorized_spectrum_matches_scalar_calls(self, material_cache_dir):
+        MaterialTable.from_ridx(FakeRidxMaterial()).save(permittivity._material_cache_file(("main", "Au", "Babar")))
+        frequencies = np.linspace(1.1, 4.0, 5000)
+
+        spectrum = permittivity_ridx(frequencies, "Au")
+        expected = np.array([permittivity_ridx(frequency, "Au") for frequency in frequencies[::50]])
+        assert spectrum.shape == frequencies.shape, "Spectrum should have the shape of the frequencies"
+        assert np.allclose(spectrum[::50], expected, rtol=1e-12), "Vectorized permittivity should match scalar calls"
+        assert np.allclose(permittivity_ridx(list(frequencies[:3]), "Au"), spectrum[:3]), "Lists of frequencies should be accepted"
+
+    def test_lru_eviction(self, material_cache_dir, monkeypatch):
+        monkeypatch.setattr(permittivity, "MATERIAL_CACHE_SIZE", 1)
+        for key in [("main", "Au", "Babar"), ("main", "Ag", "Babar")]:
+            MaterialTable.from_ridx(FakeRidxMaterial()).save(permittivity._material_cache_file(key))
+
+        gold = get_material("Au")
+        get_material("Ag")
+        assert list(permittivity._material_cache) == [("main", "Ag", "Babar")], "Least recently used material should be evicted"
+        assert get_material("Au") is not gold, "Evicted materials should be loaded again"
@@ -64,3 +64,103 @@ def test_Mie_dipole_for_small_radius():
 
     assert np.isclose(alpha_mie_approx.real, alpha_mie.real, rtol=5e-4, atol=size_parameter**4), f"Mie dipole approx real part {alpha_mie_approx.real:.2f} not close to Mie electric dipole {alpha_mie.real:.2f}. rerror: {abs(alpha_mie_approx.real - alpha_mie.real)/abs(alpha_mie.real):.2e}, aerror: {abs(alpha_mie_approx.real - alpha_mie.real):.2e}, size_param^4: {size_parameter**4:.2e}"
     assert np.isclose(alpha_mie_approx.imag, alpha_mie.imag, rtol=5e-4, atol=size_parameter**4), f"Mie dipole approx imag part {alpha_mie_approx.imag:.2f} not close to Mie electric dipole {alpha_mie.imag:.2f}. rerror: {abs(alpha_mie_approx.imag - alpha_mie.imag)/abs(alpha_mie.imag):.2e}, aerror: {abs(alpha_mie_approx.imag - alpha_mie.imag):.2e}, size_param^4: {size_parameter**4:.2e}"
+
+def test_spheroid_depolarization_factors():
+    assert np.allclose(mspt.spheroid_depolarization_factors(10.0, 10.0), (1 / 3, 1 / 3))
+    for axial, transverse in [(30.0, 10.0), (10.0, 30.0), (10.001, 10.0), (10.0, 10.001)]:
+        axial_factor, transverse_factor = mspt.spheroid_depolarization_factors(axial, transverse)
+        assert np.isclose(axial_factor + 2 * transverse_factor, 1.0), "Depolarization factors should add up to 1."
+    assert np.isclose(mspt.spheroid_depolarization_factors(30.0, 10.0)[0], 0.1087, atol=1e-4), "Known value for a prolate spheroid of aspect ratio 3."
+    assert np.isclose(mspt.spheroid_depolarization_factors(10.001, 10.0)[0], 1 / 3, atol=1e-4), "Nearly spherical spheroids should be continuous."
+    assert mspt.spheroid_depolarization_factors(10.0, 30.0)[0] > 1 / 3, "Disks depolarize more along their axis."
+
+def test_quasistatic_spheroid_sphere_limit():
+    wave_number = 2 * np.pi / 532
+    particle_permittivity = -10.0 + 1.0j
+    alpha_0 = mspt.Clausius_Mossotti(10.0, 1.5, particle_permittivity)
+    k_m = wave_number * np.sqrt(1.5)
+    expected = alpha_0 / (1 - 1j * k_m**3 * alpha_0 / (6 * np.pi))
+
+    axial, transverse = mspt.quasistatic_spheroid_polarizability(10.0, 10.0, 1.5, particle_permittivity, wave_number)
+    assert np.isclose(axial, expected) and np.isclose(transverse, expected), "A sphere should have the corrected Clausius-Mossotti polarizability."
+    assert np.isclose(axial, mspt.Mie_electric_dipole_polarizability(10.0, 1.5, particle_permittivity, wave_number), rtol=0.05)
+
+def reference_Mie_electric_dipole(radius, medium_permittivity, particle_permittivity, wave_number):
+    """Scalar electric dipole polarizability written with the derivatives of the Bessel functions."""
+    hankel = mspt.polarizability_mod.hankel_plus
+    k_m = wave_number * medium_permittivity**0.5
+    x_p = wave_number * particle_permittivity**0.5 * radius
+    x_m = k_m * radius
+    t11 = particle_permittivity * sph_jn(1, x_p) * (sph_jn(1, x_m) + x_m * sph_jn(1, x_m, derivative=True))
+    t12 = medium_permittivity * sph_jn(1, x_m) * (sph_jn(1, x_p) + x_p * sph_jn(1, x_p, derivative=True))
+    t21 = medium_permittivity * hankel(1, x_m) * (sph_jn(1, x_p) + x_p * sph_jn(1, x_p, derivative=True))
+    t22 = particle_permittivity * sph_jn(1, x_p) * (hankel(1, x_m) + x_m * hankel(1, x_m, derivative=True))
+    return 6 * np.pi / k_m**3 * (t11 - t12) / (t21 - t22)
+
+def test_Mie_broadcast_over_radii_and_frequencies():
+    rng = np.random.default_rng(0)
+    radii = rng.uniform(5.0, 150.0, 40)
+    wave_numbers = 2 * np.pi / np.linspace(400.0, 900.0, 30)
+    particle_permittivities = mspt.permittivity_Drude(mspt.nm_to_eV(2 * np.pi / wave_numbers), 8.9, 0.07, 9.5)
+
+    alpha = mspt.Mie_electric_dipole_polarizability(radii[:, None], 1.77, particle_permittivities, wave_numbers)
+    assert alpha.shape == (40, 30), "Radii of shape (N, 1) and frequencies of shape (M,) should give shape (N, M)."
+    for i in range(0, 40, 7):
+        for j in range(0, 30, 6):
+            expected = reference_Mie_electric_dipole(radii[i], 1.77, particle_permittivities[j], wave_numbers[j])
+            assert np.isclose(alpha[i, j], expected, rtol=1e-10), f"Broadcast polarizability {(i, j)} does not match the scalar calculation."
+
+    approximation = mspt.Mie_size_dipole_approximation(radii[:, None], 1.77, particle_permittivities, wave_numbers)
+    assert approximation.shape == (40, 30), "The size approximation should broadcast like the Mie polarizability."
+
+def test_Mie_polydisperse_real_permittivity_array():
+    radii = np.linspace(10.0, 50.0, 1000)
+    particle_permittivities = np.full(radii.shape, -5.0)
+    alpha = mspt.Mie_electric_dipole_polarizability(radii, 1.0, particle_permittivities, 2 * np.pi / 600)
+    assert np.all(np.isfinite(alpha)), "Negative real permittivities in arrays should be handled as complex numbers."
+    assert np.isclose(alpha[0], reference_Mie_electric_dipole(10.0, 1.0, -5.0 + 0j, 2 * np.pi / 600), rtol=1e-10)
+    assert np.isclose(mspt.Mie_electric_dipole_polarizability(10.0, 1.0, -5.0 + 0j, 2 * np.pi / 600), alpha[0]), "Scalar arguments should give a scalar."
+
+def reference_Mie_coefficients(size_parameter, relative_index, order):
+    """Mie coefficients of one order from the scipy spherical Bessel functions and their derivatives."""
+    x, mx, m = size_parameter, relative_index * size_parameter, relative_index
+    psi = lambda z: z * sph_jn(order, z)
+    dpsi = lambda z: sph_jn(order, z) + z * sph_jn(order, z, derivative=True)
+    xi = lambda z: z * (sph_jn(order, z) + 1j * sph_yn(order, z))
+    dxi = lambda z: sph_jn(order, z) + 1j * sph_yn(order, z) + z * (sph_jn(order, z, derivative=True) + 1j * sph_yn(order, z, derivative=True))
+    a = (m * psi(mx) * dpsi(x) - psi(x) * dpsi(mx)) / (m * psi(mx) * dxi(x) - xi(x) * dpsi(mx))
+    b = (psi(mx) * dpsi(x) - m * psi(x) * dpsi(mx)) / (psi(mx) * dxi(x) - m * xi(x) * dpsi(mx))
+    return a, b
+
+def test_Mie_coefficients_match_special_functions():
+    for particle_permittivity in [2.25, -10.0 + 1.0j, 16.0 + 0.5j]:
+        for size_parameter in [0.3, 1.0, 5.0, 20.0, 60.0]:
+            a, b = mspt.Mie_coefficients(size_parameter, 1.0, particle_permittivity, 1.0, n_max=4)
+            for order in range(1, 5):
+                expected_a, expected_b = reference_Mie_coefficients(size_parameter, np.sqrt(particle_permittivity + 0j), order)
+                assert np.isclose(a[order - 1], expected_a, rtol=1e-9, atol=0), f"a_{order} at x={size_parameter}, eps={particle_permittivity} does not match."
+                assert np.isclose(b[order - 1], expected_b, rtol=1e-9, atol=0), f"b_{order} at x={size_parameter}, eps={particle_permittivity} does not match."
+
+def test_Mie_coefficients_dipole_and_broadcast():
+    radii = np.linspace(5.0, 120.0, 50)
+    wave_number = 2 * np.pi / 600
+    particle_permittivity = -9.0 + 1.5j
+    a, b = mspt.Mie_coefficients(radii, 1.77, particle_permittivity, wave_number, n_max=3)
+    assert a.shape == (3, 50) and b.shape == (3, 50), "Coefficients should have shape (n_max,) + broadcast shape."
+
+    k_m = wave_number * np.sqrt(1.77)
+    alpha = mspt.Mie_electric_dipole_polarizability(radii, 1.77, particle_permittivity, wave_number)
+    assert np.allclose(6 * np.pi * 1j * a[0] / k_m**3, alpha, rtol=1e-9), "a_1 should give the electric dipole polarizability."
+    assert np.all(np.abs(a[1, :5]) < np.abs(a[0, :5])) and np.all(np.abs(b[0, :5]) < np.abs(a[0, :5])), "Small spheres should be dominated by the electric dipole."
+
+def test_Mie_efficiencies():
+    extinction, scattering = mspt.Mie_efficiencies(np.array([1.0, 10.0, 100.0]), 1.0, 2.25, 1.0)
+    assert np.allclose(extinction, scattering, rtol=1e-12), "A lossless sphere should not absorb."
+
+    x = 0.01
+    relative_polarizability = (2.25 - 1) / (2.25 + 2)
+    _, scattering = mspt.Mie_efficiencies(x, 1.0, 2.25, 1.0)
+    assert np.isclose(scattering, 8 / 3 * x**4 * relative_polarizability**2, rtol=1e-3), "Small spheres should follow Rayleigh scattering."
+
+    extinction, _ = mspt.Mie_efficiencies(2000.0, 1.0, 2.25 + 0.1j, 1.0)
+    assert np.isclose(extinction, 2.0, rtol=0.02), "Large spheres should approach the extinction paradox value of 2."
@@ -0,0 +1,95 @@
+import os
+import pytest
+import numpy as np
+import msptools as msp
+import msptools.permittivity as permittivity
+
+
+def drude_gold_table():
+    """Material table of a Drude metal with a plasmon resonance near 2.6 eV in vacuum."""
+    wavelengths_um = np.linspace(0.3, 1.2, 400)
+    frequencies = msp.nm_to_eV(1000.0 * wavelengths_um)
+    refractive_index = np.sqrt(msp.permittivity_Drude(frequencies, plasma_frequency=8.9, collision_frequency=0.07, epsilon_inf=9.5))
+    return msp.MaterialTable(wavelengths_um, refractive_index.real, wavelengths_um, refractive_index.imag)
+
+
+@pytest.fixture
+def gold_cache(tmp_path):
+    previous = permittivity.get_material_cache_dir()
+    msp.set_material_cache_dir(str(tmp_path))
+    msp.clear_material_cache()
+    msp.clear_polarizability_tables()
+    drude_gold_table().save(permittivity._material_cache_file(("main", "Au", "Babar")))
+    yield tmp_path
+    msp.clear_material_cache()
+    msp.clear_polarizability_tables()
+    msp.set_material_cache_dir(previous)
+
+
+class TestPolarizabilityTable:
+
+    def test_interpolation_accuracy(self, gold_cache):
+        table = msp.PolarizabilityTable.compute("Au", 20.0, 1.77, tolerance=1e-4)
+        frequencies = np.random.default_rng(0).uniform(table.frequencies[0], table.frequencies[-1], 500)
+        exact = msp.PolarizabilityTable.evaluate("Au", 20.0, 1.77, frequencies)
+        error = np.abs(table(frequencies) - exact).max() / np.abs(exact).max()
+        assert error < 1e-3, f"Interpolation error {error} is too large"
+        assert len(table) < 2000, "The adaptive grid should stay small"
+
+    def test_grid_refined_near_resonance(self, gold_cache):
+        table = msp.PolarizabilityTable.compute("Au", 20.0, 1.0)
+        resonance = table.frequencies[np.argmax(np.abs(table.polarizabilities))]
+        spacing = np.diff(table.frequencies)
+        near = spacing[np.abs(table.frequencies[:-1] - resonance) < 0.1]
+        far = spacing[table.frequencies[:-1] < resonance - 1.0]
+        assert near.min() < far.min() / 4, "The grid should be denser around the plasmon resonance"
+
+    def test_outside_range_is_nan(self, gold_cache):
+        table = msp.PolarizabilityTable.compute("Au", 20.0, 1.0)
+        assert np.isnan(table(table.frequencies[-1] + 1.0)), "Frequencies outside of the table should give NaN"
+        assert not table.contains(table.frequencies[-1] + 1.0)
+
+    def test_persisted_to_disk(self, gold_cache):
+        table = msp.get_polarizability_table("Au", 20.0, 1.0)
+        assert msp.get_polarizability_table("Au", 20.0, 1.0) is table, "Tables should be cached in memory"
+        assert any(name.startswith("polarizability_Au") for name in os.listdir(gold_cache)), "Tables should be stored on disk"
+
+        msp.clear_polarizability_tables()
+        loaded = msp.get_polarizability_table("Au", 20.0, 1.0)
+        assert loaded is not table
+        assert np.array_equal(loaded.frequencies, table.frequencies), "Stored frequencies should be restored"
+        assert np.array_equal(loaded.polarizabilities, table.polarizabilities), "Stored polarizabilities should be restored"
+        assert loaded.material == "Au" and loaded.radius_nm == 20.0
+
+    def test_compute_parameters_in_key(self, gold_cache):
+        coarse = msp.get_polarizability_table("Au", 20.0, 1.0)
+        fine = msp.get_polarizability_table("Au", 20.0, 1.0, tolerance=1e-6)
+        narrow = msp.get_polarizability_table("Au", 20.0, 1.0, frequency_range=(2.0, 3.0))
+
+        assert len(fine) > len(coarse), "A smaller tolerance should give its own, finer table"
+        assert narrow.frequencies[0] == 2.0 and narrow.frequencies[-1] == 3.0, "The frequency range should give its own table"
+        assert len([name for name in os.listdir(gold_cache) if name.startswith("polarizability_Au")]) == 3, "Each table should have its own file"
+
+    def test_memory_cache_is_bounded(self, gold_cache, monkeypatch):
+        monkeypatch.setattr(msp.polarizability_table_mod, "POLARIZABILITY_TABLE_CACHE_SIZE", 2)
+        first = msp.get_polarizability_table("Au", 20.0, 1.0, initial_points=9, tolerance=1e-2)
+        msp.get_polarizability_table("Au", 21.0, 1.0, initial_points=9, tolerance=1e-2)
+        msp.get_polarizability_table("Au", 22.0, 1.0, initial_points=9, tolerance=1e-2)
+
+        assert len(msp.polarizability_table_mod._polarizability_tables) == 2, "Only the most recent tables should be kept"
+        assert msp.get_polarizability_table("Au", 20.0, 1.0, initial_points=9, tolerance=1e-2) is not first, "The oldest table should be evicted"
+
+    def test_sphere_type_served_from_table(self, gold_cache):
+        frequency = 2.3
+        direct = msp.SphereType(material="Au", radius=0.02, radius_unit="um").compute_polarizability(frequency, 1.0)
+        tabulated = msp.SphereType(material="Au", radius=20.0, radius_unit="nm", use_table=True).compute_polarizability(frequency, 1.0)
+        assert np.isclose(tabulated, direct, rtol=1e-3), "Tabulated polarizability should match the Mie polarizability"
+
+    def test_model_without_frequency_range(self):
+        model = msp.DrudeLorentzModel(9.0, 9.0, 0.07)
+        with pytest.raises(ValueError):
+            msp.PolarizabilityTable.compute(model, 20.0, 1.77)
+
+        tabulated = msp.SphereType(material=model, radius=20.0, radius_unit="nm", use_table=True).compute_polarizability(2.3, 1.77)
+        direct = msp.SphereType(material=model, radius=20.0, radius_unit="nm").compute_polarizability(2.3, 1.77)
+        assert tabulated == direct, "Models without a frequency range should be evaluated directly"
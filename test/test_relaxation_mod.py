@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+trap_centers = np.array([[0.0, 0.0, 0.0], [300.0, 0.0, 0.0], [0.0, 300.0, 0.0]])
+
+def trap(positions):
+    return -0.01 * (positions - trap_centers)
+
+
+@pytest.mark.parametrize("method", ["FIRE", "LBFGS"])
+class TestRelax:
+
+    def test_optically_bound_dimer(self, method, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [0.0, 480.0, 0.0]])
+        result = system.relax(method=method, force_tolerance=1e-7, max_step=20.0, remove_net_force=True)
+
+        separation = result["positions"][1] - result["positions"][0]
+        assert result["converged"], "The relaxation should converge."
+        assert np.allclose(separation, [0.0, 503.34, 0.0], atol=0.05), "The dimer should bind at the transverse equilibrium distance."
+        assert np.allclose(system.particles.get_positions(), result["positions"]), "The system should be left at the relaxed positions."
+        assert result["num_force_evaluations"] == result["num_steps"] + 1
+
+    def test_harmonic_traps(self, method, create_system):
+        system = create_system([[5.0, 3.0, 0.0], [300.0, 0.0, 0.0], [0.0, 320.0, 10.0]], amplitude=0.0)
+        result = msp.relax(system, method=method, force_tolerance=1e-8, max_step=5.0, extra_forces=trap)
+
+        assert result["converged"]
+        assert np.allclose(result["positions"], trap_centers, atol=1e-5), "Without light the particles should relax to the trap centers."
+
+    def test_fixed_particles(self, method, create_system):
+        positions = [[5.0, 3.0, 0.0], [300.0, 0.0, 0.0], [0.0, 320.0, 10.0]]
+        system = create_system(positions, amplitude=0.0)
+        result = system.relax(method=method, force_tolerance=1e-8, max_step=5.0, extra_forces=trap, fixed=[2])
+
+        assert np.allclose(result["positions"][2], positions[2]), "Fixed particles should not move."
+        assert np.allclose(result["positions"][:2], trap_centers[:2], atol=1e-5)
+
+    def test_not_converged(self, method, create_system):
+        system = create_system([[0.0, 0.0, 0.0], [0.0, 400.0, 0.0]])
+        result = system.relax(method=method, force_tolerance=1e-12, max_steps=2, remove_net_force=True)
+
+        assert not result["converged"]
+        assert result["num_steps"] == 2
+
+
+def test_lbfgs_needs_few_force_evaluations(create_system):
+    system = create_system([[5.0, 3.0, 0.0], [300.0, 0.0, 0.0], [0.0, 320.0, 10.0]], amplitude=0.1)
+    result = system.relax(method="LBFGS", force_tolerance=1e-6, max_step=5.0, extra_forces=trap)
+
+    assert result["converged"]
+    assert result["num_force_evaluations"] < 20, "L-BFGS should converge in a few full solves."
+
+def test_unknown_method(create_system):
+    with pytest.raises(ValueError):
+        create_system([[0.0, 0.0, 0.0]]).relax(method="CG")
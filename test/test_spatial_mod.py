@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+def brute_force_pairs(positions, radius):
+    distances = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+    i, j = np.nonzero(np.triu(distances <= radius, k=1))
+    return np.stack([i, j], axis=-1)
+
+
+class TestSpatialIndex:
+
+    positions = np.random.default_rng(0).random((300, 3)) * 100
+
+    def test_pairs_match_brute_force(self):
+        index = msp.SpatialIndex(self.positions)
+        assert np.array_equal(index.query_pairs(10.0), brute_force_pairs(self.positions, 10.0)), "Pairs should match the brute force search."
+
+    def test_incremental_updates(self):
+        index = msp.SpatialIndex(self.positions, rebuild_fraction=0.5)
+        positions = self.positions.copy()
+        rng = np.random.default_rng(1)
+        for moved in rng.choice(300, 40, replace=False):
+            positions[moved] = rng.random(3) * 100
+            index.update(moved, positions[moved])
+
+        assert index.moved.sum() == 40, "Moving particles should not rebuild the tree before the rebuild fraction."
+        assert np.array_equal(index.query_pairs(10.0), brute_force_pairs(positions, 10.0)), "Pairs should follow the moved particles."
+        points = rng.random((5, 3)) * 100
+        for point, neighbours in zip(points, index.query_radius(points, 15.0)):
+            expected = np.flatnonzero(np.linalg.norm(positions - point, axis=-1) <= 15.0)
+            assert np.array_equal(neighbours, expected), "Neighbours should follow the moved particles."
+
+    def test_rebuild(self):
+        index = msp.SpatialIndex(self.positions[:20], rebuild_fraction=0.1)
+        index.update(0, [1.0, 2.0, 3.0])
+        index.update(1, [1.0, 2.0, 4.0])
+        index.update(2, [1.0, 2.0, 5.0])
+        assert not index.moved.any(), "The tree should be rebuilt when too many particles moved."
+        assert np.array_equal(index.query_pairs(1.5), brute_force_pairs(index.positions, 1.5))
+
+
+class TestParticlesQueries:
+
+    def test_set_position_updates_index(self):
+        particles = msp.Particles()
+        particles.add_particles([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0], [50.0, 0.0, 0.0]], 1.0)
+        index = particles.get_spatial_index()
+        particles.set_position(2, [12.0, 0.0, 0.0])
+
+        assert particles.get_spatial_index() is index, "Moving one particle should update the index instead of rebuilding it."
+        assert np.array_equal(particles.query_pairs(5.0), [[1, 2]]), "The moved particle should be found near its new neighbour."
+        particles.add_particles([[0.0, 1.0, 0.0]], 1.0)
+        assert np.array_equal(particles.query_neighbours([[0.0, 0.0, 0.0]], 2.0)[0], [0, 3]), "Adding particles should rebuild the index."
+
+    def test_find_overlaps(self):
+        particles = msp.Particles()
+        particles.add_particles([[0.0, 0.0, 0.0], [15.0, 0.0, 0.0], [40.0, 0.0, 0.0], [40.0, 0.0, 0.0]], 1.0)
+
+        assert np.array_equal(particles.find_overlaps([10.0, 6.0, 0.0, 0.0]), [[0, 1], [2, 3]]), "Overlapping and coincident particles should be found."
+        assert np.array_equal(particles.find_overlaps([5.0, 5.0, 0.0, 0.0], min_gap=6.0), [[0, 1], [2, 3]]), "Particles closer than the gap should be found."
+        assert np.array_equal(particles.find_overlaps([5.0, 5.0, 0.0, 0.0]), [[2, 3]])
+
+
+def test_validate_configuration():
+    field = msp.PlaneWaveField(direction=[0, 0, 1], wavelength=532, wavelength_unit="nm", amplitude=1.0, polarization=[1.0, 0.0, 0.0])
+    gold = msp.SphereType(radius=10.0, material="Au", radius_unit="nm", polarizability=2000 + 1500j)
+    rod = msp.SpheroidType(material="Au", axial_semi_axis=0.03, transverse_semi_axis=0.01, semi_axes_unit="um", polarizability=1000.0)
+    system = msp.System(field=field, particle_types=[gold, rod], positions_unit="um")
+    system.add_particles([[0.0, 0.0, 0.0]], particle_type=gold)
+    system.add_particles([[0.05, 0.0, 0.0]], particle_type=rod)
+
+    assert np.allclose(system.get_bounding_radii(), [10.0, 30.0]), "Bounding radii should be converted to nanometers."
+    system.validate_configuration()
+    with pytest.raises(ValueError):
+        system.validate_configuration(min_gap=0.02)
+    system.set_position(1, [0.035, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        system.validate_configuration()
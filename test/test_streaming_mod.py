@@ -0,0 +1,89 @@
+import threading
+import pytest
+import numpy as np
+import msptools as msp
+
+
+base_positions = np.array([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0], [0.0, 60.0, 0.0]])
+
+@pytest.fixture
+def streaming_system(create_system, constant_type):
+    def create():
+        return create_system(base_positions, particle_types=constant_type(500.0 + 300.0j))
+    return create
+
+def configurations(num_configurations=6):
+    rng = np.random.default_rng(0)
+    for _ in range(num_configurations):
+        yield base_positions + rng.normal(scale=5.0, size=base_positions.shape)
+
+@pytest.fixture
+def serial_results(streaming_system):
+    def compute(positions):
+        system = streaming_system()
+        system.set_positions(positions)
+        return {"forces": msp.ForceCalculator(system).compute_forces(), "dipoles": system.get_dipole_moments()}
+    return compute
+
+
+class TestPrefetch:
+
+    def test_order_and_values(self):
+        assert list(msp.prefetch(range(100), buffer_size=3)) == list(range(100)), "Prefetching should keep the order"
+
+    def test_bounded_read_ahead(self):
+        produced = []
+        def source():
+            for i in range(50):
+                produced.append(i)
+                yield i
+
+        iterator = msp.prefetch(source(), buffer_size=2)
+        assert next(iterator) == 0
+        threading.Event().wait(0.2)
+        assert len(produced) <= 4, "The background thread should read at most buffer_size items ahead"
+        iterator.close()
+
+    def test_source_errors_are_raised(self):
+        def source():
+            yield 1
+            raise RuntimeError("broken source")
+
+        iterator = msp.prefetch(source())
+        assert next(iterator) == 1
+        with pytest.raises(RuntimeError, match="broken source"):
+            next(iterator)
+
+
+class TestStreamResults:
+
+    @pytest.mark.parametrize("num_workers", [1, 2])
+    def test_matches_serial_loop(self, num_workers, streaming_system, serial_results):
+        system = streaming_system()
+        original_positions = system.particles.get_positions().copy()
+        results = list(msp.stream_results(system, configurations(), results=("forces", "dipoles"), num_workers=num_workers, max_pending=2))
+        expected = [serial_results(positions) for positions in configurations()]
+
+        assert len(results) == len(expected), "There should be one result per configuration"
+        for result, reference in zip(results, expected):
+            assert set(result) == {"forces", "dipoles"}, "Only the requested results should be computed"
+            assert np.allclose(result["forces"], reference["forces"]), "Streamed forces do not match the serial loop"
+            assert np.allclose(result["dipoles"], reference["dipoles"]), "Streamed dipoles do not match the serial loop"
+        assert np.array_equal(system.particles.get_positions(), original_positions), "The base system should not be modified"
+
+    def test_results_reader_frames(self, tmp_path, streaming_system, serial_results):
+        with msp.ResultsWriter(str(tmp_path / "frames"), chunk_size=4) as writer:
+            for positions in configurations():
+                writer.write_frame({"positions": positions})
+
+        reader = msp.ResultsReader(str(tmp_path / "frames"))
+        results = list(msp.stream_results(streaming_system(), reader, results=("positions", "forces")))
+        for result, positions in zip(results, configurations()):
+            assert np.allclose(result["positions"], positions), "Frames should be streamed in order"
+            assert np.allclose(result["forces"], serial_results(positions)["forces"]), "Forces of the frames do not match"
+
+    def test_invalid_arguments(self, streaming_system):
+        with pytest.raises(ValueError):
+            next(msp.stream_results(streaming_system(), configurations(), results=("torques",)))
+        with pytest.raises(ValueError):
+            next(msp.stream_results(streaming_system(), [np.zeros((2, 3))]))
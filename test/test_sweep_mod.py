@@ -0,0 +1,99 @@
+import pytest
+import numpy as np
+import msptools as msp
+
+
+@pytest.fixture
+def create_dimer_system(create_system, constant_type):
+    def create(polarization=(1.0, 0.0, 0.0)):
+        return create_system([[0.0, 0.0, 0.0], [40.0, 0.0, 0.0]], particle_types=constant_type(500.0 + 300.0j), polarization=polarization)
+    return create
+
+@pytest.fixture
+def serial_forces(create_system, constant_type):
+    def compute(positions, polarization=(1.0, 0.0, 0.0), wavelength=532, medium_permittivity=1.0):
+        system = create_system(positions, particle_types=constant_type(500.0 + 300.0j), polarization=polarization,
+                               wavelength=wavelength, medium_permittivity=medium_permittivity)
+        return msp.ForceCalculator(system).compute_forces()
+    return compute
+
+
+class Test_SweepForces:
+
+    distances = np.linspace(30, 90, 5)
+    positions = np.array([[[0.0, 0.0, 0.0], [d, 0.0, 0.0]] for d in distances])
+
+    @pytest.mark.parametrize("num_workers", [1, 2])
+    def test_positions_sweep_matches_loop(self, num_workers, create_dimer_system, serial_forces):
+        forces = msp.sweep_forces(create_dimer_system(), positions=self.positions, num_workers=num_workers)
+        expected = np.array([serial_forces(configuration) for configuration in self.positions])
+
+        assert forces.shape == (len(self.distances), 2, 3), "Forces should be stacked in task order."
+        assert np.allclose(forces, expected), "Sweep forces do not match the serial loop."
+
+    @pytest.mark.parametrize("num_workers", [1, 2])
+    def test_parameter_grid(self, num_workers, create_dimer_system, serial_forces):
+        wavelengths = [500, 600]
+        polarizations = [[1, 0, 0], [0, 1, 0], [1, 1, 0]]
+        forces = msp.sweep_forces(create_dimer_system(), positions=self.positions[:2], wavelengths=wavelengths,
+                                  polarizations=polarizations, grid=True, num_workers=num_workers)
+
+        assert forces.shape == (2, 2, 3, 2, 3), "Grid forces should have the shape of the grid followed by (N, 3)."
+        for p, configuration in enumerate(self.positions[:2]):
+            for w, wavelength in enumerate(wavelengths):
+                for q, polarization in enumerate(polarizations):
+                    expected = serial_forces(configuration, polarization=polarization, wavelength=wavelength)
+                    assert np.allclose(forces[p, w, q], expected), f"Grid point {(p, w, q)} does not match the serial calculation."
+
+    def test_zipped_medium_sweep(self, create_dimer_system, serial_forces):
+        medium_permittivities = [1.0, 1.33**2, 2.25]
+        forces = msp.sweep_forces(create_dimer_system(), positions=self.positions[:3], medium_permittivities=medium_permittivities, num_workers=1)
+        for b, medium_permittivity in enumerate(medium_permittivities):
+            assert np.allclose(forces[b], serial_forces(self.positions[b], medium_permittivity=medium_permittivity)), "Medium sweep does not match the serial calculation."
+
+    def test_base_system_unchanged(self, create_dimer_system):
+        system = create_dimer_system()
+        before = msp.ForceCalculator(system).compute_forces()
+        msp.sweep_forces(system, positions=self.positions, wavelengths=np.linspace(500, 600, 5), num_workers=1)
+        assert np.allclose(msp.ForceCalculator(system).compute_forces(), before), "The base system should not be modified by a sweep."
+
+    def test_positions_sweep_keeps_base_positions(self, create_dimer_system):
+        system = create_dimer_system()
+        before = system.particles.get_positions()
+        msp.sweep_forces(system, positions=self.positions, num_workers=1)
+        assert np.array_equal(system.particles.get_positions(), before), "A positions sweep should move a working copy, not the base system."
+
+    def test_mismatched_zip_lengths(self, create_dimer_system):
+        with pytest.raises(ValueError):
+            msp.sweep_forces(create_dimer_system(), positions=self.positions, wavelengths=[500, 600], num_workers=1)
+
+def test_multi_type_wavelength_sweep(create_system, constant_type):
+    def multi_type_system(wavelength):
+        types = [constant_type(500.0 + 300.0j), constant_type(100.0 + 20.0j)]
+        system = create_system([[0.0, 0.0, 0.0]], particle_types=types, wavelength=wavelength)
+        system.add_particles([[40.0, 0.0, 0.0], [0.0, 50.0, 0.0]], particle_type=types[1])
+        return system
+
+    forces = msp.sweep_forces(multi_type_system(532), wavelengths=[500, 600], num_workers=1)
+    for w, wavelength in enumerate([500, 600]):
+        expected = msp.ForceCalculator(multi_type_system(wavelength)).compute_forces()
+        assert np.allclose(forces[w], expected), f"Multi-type sweep at {wavelength} nm does not match the serial calculation."
+
+def test_wavelength_sweep_evaluates_each_type_once(create_dimer_system, constant_type, monkeypatch):
+    calls = []
+    compute_polarizability = constant_type.compute_polarizability
+    def counted(self, frequency, medium_permittivity):
+        calls.append(frequency)
+        compute_polarizability(self, frequency, medium_permittivity)
+    monkeypatch.setattr(constant_type, "compute_polarizability", counted)
+
+    system = create_dimer_system()
+    calls.clear()
+    msp.sweep_forces(system, wavelengths=[500, 600], num_workers=1)
+    assert len(calls) == 2, "Each particle type should be evaluated once per wavelength."
+
+def test_untyped_particles_wavelength_sweep(create_dimer_system):
+    system = create_dimer_system()
+    system.particles.add_particles([[0.0, 60.0, 0.0]], 100.0)
+    with pytest.raises(ValueError):
+        msp.sweep_forces(system, wavelengths=[500, 600], num_workers=1)
@@ -1,3 +1,4 @@
+import pickle
 import msptools as msp
 import numpy as np 
 
@@ -12,3 +13,30 @@ class TestSphereType:
         assert sphere.radius == 2.5, "Radius should be set to 2.5"
         assert sphere.radius_unit == "nm"
         assert sphere.material == "custom_material", "Material should be set to 'custom_material'"
+
+    def test_fixed_polarizability(self):
+        sphere = msp.SphereType(radius=2.5, material="custom_material", radius_unit="nm", polarizability=3.0 + 1.0j)
+        assert sphere.compute_polarizability(frequency=2.0, medium_permittivity=1.0) == 3.0 + 1.0j
+        assert sphere.polarizability == 3.0 + 1.0j, "Fixed polarizability should be stored on the type."
+
+    def test_pickle_roundtrip(self):
+        sphere = msp.SphereType(radius=2.5, material="custom_material", radius_unit="nm", polarizability=3.0 + 1.0j)
+        restored = pickle.loads(pickle.dumps(sphere))
+        assert restored.compute_polarizability(frequency=2.0, medium_permittivity=1.0) == 3.0 + 1.0j
+        assert restored.radius == 2.5 and restored.material == "custom_material"
+
+class TestSpheroidType:
+
+    def test_fixed_polarizability(self):
+        tensor = np.diag([1.0, 2.0, 3.0 + 1.0j])
+        rod = msp.SpheroidType(material="custom_material", axial_semi_axis=30.0, transverse_semi_axis=10.0, semi_axes_unit="nm", polarizability=tensor)
+        assert np.array_equal(rod.compute_polarizability(frequency=2.0, medium_permittivity=1.0), tensor)
+
+    def test_polarizability_tensor(self):
+        rod = msp.SpheroidType(material="custom_material", axial_semi_axis=30.0, transverse_semi_axis=10.0, semi_axes_unit="nm", axis=[1.0, 1.0, 0.0])
+        tensor = rod.polarizability_tensor(5.0, 2.0)
+        axis = np.array([1.0, 1.0, 0.0]) / np.sqrt(2)
+
+        assert np.allclose(tensor @ axis, 5.0 * axis), "The symmetry axis should be an eigenvector with the axial polarizability."
+        assert np.allclose(tensor @ [0.0, 0.0, 1.0], [0.0, 0.0, 2.0]), "Transverse directions should have the transverse polarizability."
+        assert np.allclose(tensor, tensor.T)